@@ -1,7 +1,32 @@
+import logging
 import os
 import httpx
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende do ambiente
+    msgpack = None
 
 STORAGE_BASE_URL = os.getenv("STORAGE_BASE_URL", "http://storage:8001")
+# Formato pedido ao storage: "json" ou "msgpack" (requer o pacote msgpack nos dois serviços).
+# O storage responde JSON a quem não pede msgpack, então os dois lados podem ser atualizados em qualquer ordem.
+STORAGE_WIRE_FORMAT = os.getenv("STORAGE_WIRE_FORMAT", "json").lower()
+
+MSGPACK = "application/msgpack"
+# Para rotas que repassam o corpo do storage ao navegador
+ACCEPT_JSON = {"Accept": "application/json"}
+
+logger = logging.getLogger("gateway")
+
+
+def storage_accept() -> str:
+    """Cabeçalho Accept das chamadas ao storage conforme STORAGE_WIRE_FORMAT."""
+    if STORAGE_WIRE_FORMAT == "msgpack":
+        if msgpack is not None:
+            return f"{MSGPACK}, application/json;q=0.5"
+        logger.warning("STORAGE_WIRE_FORMAT=msgpack sem o pacote msgpack instalado; usando JSON")
+    return "application/json"
 
 
 def get_http_client():
@@ -9,9 +34,18 @@ def get_http_client():
         base_url=STORAGE_BASE_URL,
         timeout=5.0,
         limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
+        headers={"Accept": storage_accept()},
     )
 
 
+def parse_json(r: httpx.Response):
+    """Decodifica o corpo de uma resposta do storage: JSON com orjson, ou msgpack se foi o negociado."""
+    corpo = r.content
+    if msgpack is not None and r.headers.get("content-type", "").startswith(MSGPACK):
+        return msgpack.unpackb(corpo)
+    return orjson.loads(corpo)
+
+
 def post_login(email: str, senha: str) -> httpx.Response:
     client = get_http_client()
     return client.post("/login", json={"email": email, "senha": senha})
@@ -0,0 +1,194 @@
+"""Cache dos clientes lidos do storage (`GET /clients/{id}`).
+
+`get_client`, `score_credito`, as rotas de `/calculos/*` e `analise_carteira`
+partem do mesmo registro do cliente, muitas vezes várias vezes na mesma
+página. O gateway guarda os últimos `CLIENT_CACHE_SIZE` clientes (LRU):
+
+- até `CLIENT_CACHE_TTL_SECONDS` depois da leitura, a entrada é usada sem
+  falar com o storage;
+- depois disso, é revalidada com `If-None-Match` e o ETag do storage
+  (`W/"c<id>v<versao>"`, versão publicada em `clients.versao`): `304` custa só
+  a leitura da versão no storage e renova a entrada. É o que mantém vários
+  gateways coerentes com as escritas feitas pelos outros;
+- as escritas feitas por este gateway (cliente e investimentos) invalidam a
+  entrada na hora (`invalidate`);
+- com a assinatura dos eventos de mudança do storage ativa (ver
+  gateway/events.py), as escritas de qualquer instância também invalidam na
+  hora, e a janela sem revalidação passa a `CLIENT_CACHE_EVENTS_TTL_SECONDS`.
+  Ao (re)conectar, o cache é esvaziado: eventos podem ter sido perdidos.
+
+Uma leitura que estava em andamento durante uma invalidação não fica como
+entrada fresca: é guardada para revalidar no próximo uso. O mesmo vale para
+uma leitura com versão (do ETag) menor que a última anunciada por um evento:
+o storage pode ter respondido de uma réplica atrasada, e a entrada é
+revalidada a cada uso até chegar a versão anunciada.
+
+`CLIENT_CACHE_SIZE=0` desliga o cache. Acertos, revalidações e faltas ficam em
+`stats()` (`GET /metrics/client-cache`).
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import httpx
+
+from . import client as client_module
+
+CLIENT_CACHE_SIZE = int(os.getenv("CLIENT_CACHE_SIZE", "1024"))
+CLIENT_CACHE_TTL_SECONDS = float(os.getenv("CLIENT_CACHE_TTL_SECONDS", "5"))
+# Janela sem revalidação enquanto os eventos de mudança do storage chegam
+CLIENT_CACHE_EVENTS_TTL_SECONDS = float(os.getenv("CLIENT_CACHE_EVENTS_TTL_SECONDS", "300"))
+
+
+@dataclass(frozen=True)
+class CachedClient:
+    dados: dict
+    # JSON como veio do storage (repassado sem recodificar) e o ETag dele
+    corpo: bytes
+    etag: Optional[str]
+    lido_em: float
+
+
+_lock = threading.Lock()
+_entradas: "OrderedDict[int, CachedClient]" = OrderedDict()
+_contadores = {"hits": 0, "revalidated": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+# Incrementada a cada invalidação: leituras iniciadas antes dela não voltam frescas ao cache
+_geracao = 0
+_eventos_conectados = False
+# Última versão anunciada pelos eventos de mudança, por cliente (no máximo CLIENT_CACHE_SIZE)
+_versoes_anunciadas: "OrderedDict[int, int]" = OrderedDict()
+
+_VERSAO_ETAG = re.compile(r'c\d+v(\d+)"$')
+
+
+def _versao(etag: Optional[str]) -> Optional[int]:
+    """Versão do cliente no ETag do storage (`W/"c7v12"` → 12)."""
+    achado = _VERSAO_ETAG.search(etag) if etag else None
+    return int(achado.group(1)) if achado else None
+
+
+def _contar(nome: str):
+    with _lock:
+        _contadores[nome] += 1
+
+
+def _guardar(cliente_id: int, entrada: CachedClient, geracao: int):
+    with _lock:
+        anunciada = _versoes_anunciadas.get(cliente_id)
+        versao = _versao(entrada.etag)
+        if geracao != _geracao or (anunciada is not None and (versao is None or versao < anunciada)):
+            entrada = replace(entrada, lido_em=float("-inf"))
+        _entradas[cliente_id] = entrada
+        _entradas.move_to_end(cliente_id)
+        while len(_entradas) > CLIENT_CACHE_SIZE:
+            _entradas.popitem(last=False)
+            _contadores["evictions"] += 1
+
+
+def _entrada(r: httpx.Response) -> CachedClient:
+    return CachedClient(
+        dados=client_module.parse_json(r),
+        corpo=r.content,
+        etag=r.headers.get("etag"),
+        lido_em=time.monotonic(),
+    )
+
+
+def get(client: httpx.Client, cliente_id: int) -> Optional[CachedClient]:
+    """Cliente do cache ou do storage; None se o storage responde 404.
+
+    Outros erros do storage sobem como `httpx.HTTPStatusError` (`raise_for_status`).
+    """
+    if CLIENT_CACHE_SIZE <= 0:
+        r = client.get(f"/clients/{cliente_id}", headers=client_module.ACCEPT_JSON)
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+        return _entrada(r)
+
+    with _lock:
+        entrada = _entradas.get(cliente_id)
+        if entrada is not None:
+            _entradas.move_to_end(cliente_id)
+        geracao = _geracao
+        ttl = CLIENT_CACHE_EVENTS_TTL_SECONDS if _eventos_conectados else CLIENT_CACHE_TTL_SECONDS
+    agora = time.monotonic()
+    if entrada is not None and agora - entrada.lido_em < ttl:
+        _contar("hits")
+        return entrada
+
+    headers = dict(client_module.ACCEPT_JSON)
+    if entrada is not None and entrada.etag:
+        headers["If-None-Match"] = entrada.etag
+    r = client.get(f"/clients/{cliente_id}", headers=headers)
+    if r.status_code == 304 and entrada is not None:
+        _contar("revalidated")
+        entrada = CachedClient(entrada.dados, entrada.corpo, entrada.etag, agora)
+        _guardar(cliente_id, entrada, geracao)
+        return entrada
+    _contar("misses")
+    if r.status_code == 404:
+        invalidate(cliente_id)
+        return None
+    r.raise_for_status()
+    entrada = _entrada(r)
+    _guardar(cliente_id, entrada, geracao)
+    return entrada
+
+
+def invalidate(cliente_id: Optional[int] = None, versao: Optional[int] = None):
+    """Remove um cliente do cache (todos, sem `cliente_id`).
+
+    `versao` é a versão anunciada pelo evento de mudança: leituras com versão
+    menor não voltam ao cache como frescas.
+    """
+    global _geracao
+    with _lock:
+        _geracao += 1
+        if cliente_id is not None and versao is not None and versao > _versoes_anunciadas.get(cliente_id, -1):
+            _versoes_anunciadas[cliente_id] = versao
+            _versoes_anunciadas.move_to_end(cliente_id)
+            while len(_versoes_anunciadas) > max(CLIENT_CACHE_SIZE, 1):
+                _versoes_anunciadas.popitem(last=False)
+        if cliente_id is None:
+            _contadores["invalidations"] += len(_entradas)
+            _entradas.clear()
+        elif _entradas.pop(cliente_id, None) is not None:
+            _contadores["invalidations"] += 1
+
+
+def set_events_connected(conectado: bool):
+    """Estado da assinatura dos eventos do storage; ao conectar, esvazia o cache (eventos perdidos)."""
+    global _eventos_conectados
+    if conectado:
+        invalidate()
+    with _lock:
+        _eventos_conectados = conectado
+
+
+def stats() -> dict:
+    """Contadores do cache e taxa de acerto (acertos + revalidações sobre o total de leituras)."""
+    with _lock:
+        leituras = _contadores["hits"] + _contadores["revalidated"] + _contadores["misses"]
+        return {
+            **_contadores,
+            "size": len(_entradas),
+            "max_size": CLIENT_CACHE_SIZE,
+            "events_connected": _eventos_conectados,
+            "hit_ratio": round((_contadores["hits"] + _contadores["revalidated"]) / leituras, 4) if leituras else 0.0,
+        }
+
+
+def reset():
+    """Esvazia o cache e zera os contadores."""
+    global _eventos_conectados
+    with _lock:
+        _eventos_conectados = False
+        _entradas.clear()
+        _versoes_anunciadas.clear()
+        for nome in _contadores:
+            _contadores[nome] = 0
@@ -0,0 +1,223 @@
+"""Compressão gzip/brotli das respostas HTTP (middleware ASGI).
+
+Comprime só o que vale a pena: tipos de conteúdo textuais (COMPRESSIBLE_TYPES)
+a partir de COMPRESSION_MIN_SIZE bytes, no melhor formato aceito pelo
+cliente (`Accept-Encoding`). brotli é opcional: sem o pacote, só gzip.
+Respostas que já têm Content-Encoding (arquivos pré-comprimidos) passam
+intactas, assim como streams de eventos.
+
+Para o frontend, `precompress` gera ao lado de cada arquivo as versões `.br`
+(qualidade máxima, se houver brotli) e `.gz` (nível 9) uma única vez, no
+build da imagem; `gateway/static_pages.py` carrega essas versões e serve a
+que o cliente aceita:
+
+    python -m gateway.compression gateway/frontend
+
+O storage tem o mesmo middleware em `storage/compression.py` (as imagens dos
+dois serviços não compartilham código).
+"""
+import gzip
+import mimetypes
+import os
+import sys
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+# 0/false desliga (ex.: gateway e storage no mesmo host, onde comprimir só gasta CPU)
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1").lower() not in ("0", "false", "no")
+# Abaixo disso o ganho não paga o custo (cabeçalhos + CPU)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# Qualidade baixa para respostas dinâmicas; os arquivos pré-comprimidos usam a máxima
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = frozenset({
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/msgpack",
+    "image/svg+xml",
+})
+
+
+def _qualidades(accept_encoding: str) -> dict:
+    """Mapeia encoding -> q a partir de um cabeçalho Accept-Encoding."""
+    qualidades = {}
+    for parte in accept_encoding.split(","):
+        nome, *params = [p.strip() for p in parte.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if nome:
+            qualidades[nome.lower()] = q
+    return qualidades
+
+
+def choose_encoding(accept_encoding: Optional[str], available=None) -> Optional[str]:
+    """"br", "gzip" ou None conforme o Accept-Encoding (q=0 recusa).
+
+    `available` restringe aos encodings já prontos (ex.: versões pré-comprimidas);
+    sem ele, brotli só se o pacote estiver instalado.
+    """
+    if not accept_encoding:
+        return None
+    if available is None:
+        available = ("br", "gzip") if brotli is not None else ("gzip",)
+    qualidades = _qualidades(accept_encoding)
+    curinga = qualidades.get("*", 0.0)
+    q_br = qualidades.get("br", curinga) if "br" in available else 0.0
+    q_gzip = qualidades.get("gzip", curinga) if "gzip" in available else 0.0
+    if q_br > 0 and q_br >= q_gzip:
+        return "br"
+    if q_gzip > 0:
+        return "gzip"
+    return None
+
+
+def compressible(headers: Headers) -> bool:
+    """True se o tipo de conteúdo está na allowlist e a resposta ainda não está codificada."""
+    if "content-encoding" in headers:
+        return False
+    tipo = headers.get("content-type", "").split(";")[0].strip().lower()
+    return tipo in COMPRESSIBLE_TYPES
+
+
+class _Compressor:
+    """Compressão incremental (corpo inteiro ou em pedaços) no formato escolhido."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":  # pragma: no cover - requer brotli
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._br = None
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, dados: bytes) -> bytes:
+        if self._br is not None:  # pragma: no cover - requer brotli
+            return self._br.process(dados)
+        return self._gzip.compress(dados)
+
+    def finish(self) -> bytes:
+        if self._br is not None:  # pragma: no cover - requer brotli
+            return self._br.finish()
+        return self._gzip.flush()
+
+
+class CompressionMiddleware:
+    """Middleware ASGI que comprime as respostas elegíveis.
+
+    Com o corpo inteiro numa mensagem (caso das respostas JSON), o limite de
+    tamanho é aplicado ao corpo; em respostas em pedaços (arquivos grandes),
+    ao Content-Length quando informado. Um ETag forte vira fraco na versão
+    comprimida, que não é byte a byte a mesma representação.
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None, gzip_level: Optional[int] = None,
+                 brotli_quality: Optional[int] = None):
+        self.app = app
+        self.minimum_size = COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.gzip_level = COMPRESSION_GZIP_LEVEL if gzip_level is None else gzip_level
+        self.brotli_quality = COMPRESSION_BROTLI_QUALITY if brotli_quality is None else brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio = None
+        compressor = None
+        repassar = False
+
+        async def enviar(message):
+            nonlocal inicio, compressor, repassar
+            if message["type"] == "http.response.start":
+                inicio = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if repassar:
+                await send(message)
+                return
+
+            corpo = message.get("body", b"")
+            mais = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=inicio["headers"])
+                if compressible(headers):
+                    headers.add_vary_header("Accept-Encoding")
+                tamanho = len(corpo) if not mais else int(headers.get("content-length", self.minimum_size))
+                if not compressible(headers) or tamanho < self.minimum_size or (not corpo and not mais):
+                    repassar = True
+                    await send(inicio)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if mais:
+                    del headers["content-length"]
+                else:
+                    comprimido = compressor.compress(corpo) + compressor.finish()
+                    headers["Content-Length"] = str(len(comprimido))
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": comprimido})
+                    return
+                await send(inicio)
+
+            parte = compressor.compress(corpo)
+            if not mais:
+                parte += compressor.finish()
+            await send({"type": "http.response.body", "body": parte, "more_body": mais})
+
+        await self.app(scope, receive, enviar)
+
+
+def precompress(diretorio) -> list:
+    """Gera `<arquivo>.gz` (e `.br` com brotli) para os arquivos comprimíveis do diretório.
+
+    Só arquivos a partir de COMPRESSION_MIN_SIZE bytes; devolve os caminhos gerados.
+    """
+    gerados = []
+    for arquivo in sorted(Path(diretorio).rglob("*")):
+        if not arquivo.is_file() or arquivo.suffix in (".gz", ".br"):
+            continue
+        tipo, _ = mimetypes.guess_type(arquivo.name)
+        dados = arquivo.read_bytes()
+        if tipo not in COMPRESSIBLE_TYPES or len(dados) < COMPRESSION_MIN_SIZE:
+            continue
+        # mtime=0: o mesmo conteúdo gera sempre os mesmos bytes (build reprodutível)
+        destino = arquivo.with_name(arquivo.name + ".gz")
+        destino.write_bytes(gzip.compress(dados, compresslevel=9, mtime=0))
+        gerados.append(destino)
+        if brotli is not None:  # pragma: no cover - requer brotli
+            destino = arquivo.with_name(arquivo.name + ".br")
+            destino.write_bytes(brotli.compress(dados, quality=11))
+            gerados.append(destino)
+    return gerados
+
+
+if __name__ == "__main__":
+    for gerado in precompress(sys.argv[1] if len(sys.argv) > 1 else Path(__file__).parent / "frontend"):
+        print(gerado)
@@ -0,0 +1,88 @@
+"""Assinatura dos eventos de mudança do storage (`GET /events`, SSE).
+
+Uma thread em segundo plano mantém a conexão com o storage e, a cada evento
+(`{"cliente_id", "entidade", "versao"}`, ver storage/events.py), invalida o
+cliente no cache do gateway (gateway/client_cache.py); `"entidade": "todos"`
+invalida tudo. Enquanto conectada, o cache usa a janela longa
+(`CLIENT_CACHE_EVENTS_TTL_SECONDS`); sem conexão, volta à curta com
+revalidação pelo ETag, e a thread tenta de novo a cada
+`STORAGE_EVENTS_RETRY_SECONDS`.
+
+`STORAGE_EVENTS=false` desliga a assinatura (o cache continua coerente pela
+revalidação, só com a janela curta).
+"""
+import logging
+import os
+import threading
+from typing import Optional
+
+import httpx
+import orjson
+
+from . import client as client_module
+from . import client_cache
+
+STORAGE_EVENTS = os.getenv("STORAGE_EVENTS", "true").lower() == "true"
+STORAGE_EVENTS_RETRY_SECONDS = float(os.getenv("STORAGE_EVENTS_RETRY_SECONDS", "5"))
+# Sem nenhum byte por este tempo (o storage manda um comentário a cada 15s), a conexão é dada como perdida
+STORAGE_EVENTS_READ_TIMEOUT = float(os.getenv("STORAGE_EVENTS_READ_TIMEOUT", "45"))
+
+logger = logging.getLogger("gateway")
+
+_thread: Optional[threading.Thread] = None
+_parar = threading.Event()
+
+
+def handle(evento: dict):
+    """Aplica um evento ao cache de clientes."""
+    cliente_id = evento.get("cliente_id")
+    if evento.get("entidade") == "todos" or cliente_id is None:
+        client_cache.invalidate()
+    else:
+        # A versão anunciada impede que uma leitura de réplica atrasada volte ao cache como fresca
+        versao = evento.get("versao")
+        client_cache.invalidate(int(cliente_id), int(versao) if versao is not None else None)
+
+
+def listen(client: httpx.Client, parar: threading.Event):
+    """Consome `GET /events` até a conexão cair ou `parar` ser sinalizado."""
+    timeout = httpx.Timeout(5.0, read=STORAGE_EVENTS_READ_TIMEOUT)
+    with client.stream("GET", "/events", headers={"Accept": "text/event-stream"}, timeout=timeout) as r:
+        r.raise_for_status()
+        client_cache.set_events_connected(True)
+        try:
+            for linha in r.iter_lines():
+                if parar.is_set():
+                    break
+                if linha.startswith("data:"):
+                    handle(orjson.loads(linha[5:]))
+        finally:
+            client_cache.set_events_connected(False)
+
+
+def _executar():
+    client = client_module.get_http_client()
+    while not _parar.is_set():
+        try:
+            listen(client, _parar)
+        except Exception as e:
+            logger.warning(f"events: assinatura do storage falhou ({e}); nova tentativa em {STORAGE_EVENTS_RETRY_SECONDS}s")
+        _parar.wait(STORAGE_EVENTS_RETRY_SECONDS)
+    client.close()
+
+
+def start():
+    """Inicia a assinatura em segundo plano (uma vez por processo)."""
+    global _thread
+    if not STORAGE_EVENTS or _thread is not None:
+        return
+    _parar.clear()
+    _thread = threading.Thread(target=_executar, name="gateway-events", daemon=True)
+    _thread.start()
+
+
+def stop():
+    """Encerra a assinatura (a thread sai no próximo evento, comentário ou timeout da conexão)."""
+    global _thread
+    _parar.set()
+    _thread = None
@@ -0,0 +1,441 @@
+        let currentUser = null;
+
+        async function init() {
+            // Recupera dados do usuário do localStorage
+            const userData = localStorage.getItem('cliente');
+            
+            if (!userData) {
+                window.location.href = '/login';
+                return;
+            }
+
+            // Confere a sessão assinada emitida no login (sem novo bcrypt no storage)
+            const sessao = await fetch('/session');
+            if (!sessao.ok) {
+                localStorage.clear();
+                window.location.href = '/login';
+                return;
+            }
+
+            // O cliente é o da sessão; dados locais de outro cliente são descartados
+            const { cliente_id } = await sessao.json();
+            currentUser = JSON.parse(userData);
+            if (currentUser.id !== cliente_id) {
+                const resp = await fetch(`/clients/${cliente_id}`, { cache: 'no-cache' });
+                if (!resp.ok) {
+                    localStorage.clear();
+                    window.location.href = '/login';
+                    return;
+                }
+                currentUser = await resp.json();
+                localStorage.setItem('cliente', JSON.stringify(currentUser));
+            }
+            displayUserData();
+            setupBalanceInput();
+        }
+
+        function setupBalanceInput() {
+            const input = document.getElementById('newBalance');
+            input.addEventListener('input', formatCurrency);
+        }
+
+        function formatCurrency(event) {
+            let value = event.target.value.replace(/\D/g, '');
+            
+            if (value.length > 10) {
+                value = value.slice(0, 10);
+            }
+            
+            if (value.length === 0) {
+                event.target.value = '';
+                return;
+            }
+            
+            // Garantir pelo menos 3 dígitos (para centavos)
+            value = value.padStart(3, '0');
+            
+            // Separar inteiros e centavos
+            const centavos = value.slice(-2);
+            let inteiros = value.slice(0, -2);
+            
+            // Remover zeros desnecessários da frente
+            inteiros = inteiros.replace(/^0+/, '') || '0';
+            
+            // Formatar inteiros com separador de milhares
+            const inteirosFormatados = inteiros.replace(/\B(?=(\d{3})+(?!\d))/g, '.');
+            
+            event.target.value = `R$ ${inteirosFormatados},${centavos}`;
+        }
+
+        function displayUserData() {
+            if (!currentUser) return;
+
+            // Exibir resposta completa da API
+            document.getElementById('apiResponse').textContent = JSON.stringify(currentUser, null, 2);
+
+            // Nome
+            document.getElementById('userGreeting').textContent = `Bem-vindo, ${currentUser.nome}!`;
+            document.getElementById('userName').textContent = currentUser.nome;
+            document.getElementById('userEmail').textContent = currentUser.email || 'N/A';
+            document.getElementById('userPhone').textContent = currentUser.telefone || 'N/A';
+            document.getElementById('userBirthDate').textContent = formatISOToPtBr(currentUser.data_nascimento);
+            document.getElementById('userID').textContent = `#${currentUser.id}`;
+            document.getElementById('userStatus').textContent = currentUser.correntista ? '✅ Sim' : '❌ Não';
+
+            // Saldo e Score
+            updateBalanceDisplay();
+        }
+
+        function updateBalanceDisplay() {
+            const balance = parseFloat(currentUser.saldo_cc || 0);
+            const score = balance * 0.1;
+
+            // Atualizar score_credito no objeto currentUser
+            currentUser.score_credito = Math.floor(score);
+
+            // Atualizar resposta da API
+            document.getElementById('apiResponse').textContent = JSON.stringify(currentUser, null, 2);
+
+            // Exibir saldo
+            document.getElementById('balanceValue').textContent = `R$ ${balance.toFixed(2)}`;
+            document.getElementById('transferSaldoAtual').textContent = `R$ ${balance.toLocaleString('pt-BR', {minimumFractionDigits: 2, maximumFractionDigits: 2})}`;
+            
+            // Exibir score (sem decimais)
+            document.getElementById('scoreValue').textContent = Math.floor(score);
+
+            // Categoria do score
+            let category = '';
+            if (score >= 1000) {
+                category = '⭐ Platina';
+            } else if (score >= 500) {
+                category = '🥇 Ouro';
+            } else if (score >= 200) {
+                category = '🥈 Prata';
+            } else if (score > 0) {
+                category = '🥉 Bronze';
+            } else {
+                category = '❌ Sem Score';
+            }
+
+            document.getElementById('scoreCategory').textContent = category;
+        }
+
+        async function transferirParaInvestimentos(event) {
+            event.preventDefault();
+            const valor = parseFloat(document.getElementById('valorTransferencia').value);
+            const descricao = document.getElementById('descricaoTransferencia').value || 'Transferência para investimentos';
+            const saldoAtual = parseFloat(currentUser.saldo_cc || 0);
+            const patrimonioAtual = parseFloat(currentUser.patrimonio_investimento || 0);
+
+            if (valor <= 0 || isNaN(valor)) {
+                showTransferMessage('❌ Informe um valor válido maior que zero', 'error');
+                return;
+            }
+
+            if (valor > saldoAtual) {
+                showTransferMessage(`❌ Saldo insuficiente. Você tem R$ ${saldoAtual.toFixed(2)} disponível`, 'error');
+                return;
+            }
+
+            const confirmar = confirm(`Confirmar transferência de R$ ${valor.toFixed(2)} para investimentos?\n\nSaldo atual: R$ ${saldoAtual.toFixed(2)}\nSaldo após transferência: R$ ${(saldoAtual - valor).toFixed(2)}\nPatrimônio em investimentos: R$ ${(patrimonioAtual + valor).toFixed(2)}`);
+            
+            if (!confirmar) {
+                return;
+            }
+
+            try {
+                const novoSaldo = saldoAtual - valor;
+                const novoPatrimonio = patrimonioAtual + valor;
+                
+                const payload = {
+                    saldo_cc: novoSaldo,
+                    patrimonio_investimento_delta: valor
+                };
+                
+                const response = await fetch(`/clients/${currentUser.id}`, {
+                    method: 'PUT',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify(payload)
+                });
+
+                if (response.ok) {
+                    currentUser = await response.json();
+                    localStorage.setItem('cliente', JSON.stringify(currentUser));
+                    updateBalanceDisplay();
+                    showTransferMessage(`✅ Transferência realizada com sucesso!\n\nR$ ${valor.toFixed(2)} transferidos para investimentos\nNovo saldo: R$ ${novoSaldo.toFixed(2)}\nPatrimônio em investimentos: R$ ${novoPatrimonio.toFixed(2)}`, 'success');
+                    document.getElementById('valorTransferencia').value = '';
+                    document.getElementById('descricaoTransferencia').value = '';
+                } else {
+                    const error = await response.json();
+                    showTransferMessage(`❌ Erro: ${error.detail || 'Falha ao realizar transferência'}`, 'error');
+                }
+            } catch (err) {
+                showTransferMessage(`❌ Erro: ${err.message}`, 'error');
+            }
+        }
+
+        function showTransferMessage(message, type) {
+            const msgElement = document.getElementById('transferMessage');
+            msgElement.textContent = message;
+            msgElement.className = `message ${type}`;
+            
+            setTimeout(() => {
+                msgElement.className = 'message';
+            }, 5000);
+        }
+
+        async function updateBalance(event) {
+            event.preventDefault();
+            const inputValue = document.getElementById('newBalance').value.replace(/\D/g, '');
+            const newBalance = parseFloat(inputValue) / 100;
+
+            if (newBalance < 0 || isNaN(newBalance)) {
+                showMessage('❌ O saldo não pode ser negativo', 'error');
+                return;
+            }
+
+            try {
+                const response = await fetch(`/clients/${currentUser.id}`, {
+                    method: 'PUT',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        saldo_cc: newBalance
+                    })
+                });
+
+                if (response.ok) {
+                    currentUser = await response.json();
+                    localStorage.setItem('cliente', JSON.stringify(currentUser));
+                    updateBalanceDisplay();
+                    showMessage('✅ Saldo atualizado com sucesso!', 'success');
+                    document.getElementById('newBalance').value = '';
+                } else {
+                    const error = await response.json();
+                    showMessage(`❌ Erro: ${error.detail || 'Falha ao atualizar saldo'}`, 'error');
+                }
+            } catch (err) {
+                showMessage(`❌ Erro: ${err.message}`, 'error');
+            }
+        }
+
+        function showMessage(message, type) {
+            const msgElement = document.getElementById('message');
+            msgElement.textContent = message;
+            msgElement.className = `message ${type}`;
+            
+            setTimeout(() => {
+                msgElement.className = 'message';
+            }, 5000);
+        }
+
+        function sanitizePhone(value) {
+            return (value || '').replace(/\D/g, '').slice(0, 11);
+        }
+
+        function formatDateMask(value) {
+            const digits = (value || '').replace(/\D/g, '').slice(0, 8);
+            const parts = [];
+            if (digits.length >= 2) parts.push(digits.slice(0, 2));
+            else if (digits.length) parts.push(digits);
+            if (digits.length >= 4) parts.push(digits.slice(2, 4));
+            else if (digits.length > 2) parts.push(digits.slice(2));
+            if (digits.length > 4) parts.push(digits.slice(4));
+            return parts.join('/');
+        }
+
+        function shouldBlockDateKey(event) {
+            const allowedKeys = ['Backspace', 'Delete', 'ArrowLeft', 'ArrowRight', 'Tab', 'Home', 'End'];
+            if (allowedKeys.includes(event.key)) return false;
+            if (!/\d/.test(event.key)) return true;
+            const input = event.target;
+            const selectionLength = input.selectionEnd - input.selectionStart;
+            const digits = input.value.replace(/\D/g, '');
+            return selectionLength === 0 && digits.length >= 8;
+        }
+
+        function parseBRDate(str) {
+            const match = /^(\d{2})\/(\d{2})\/(\d{4})$/.exec(str || '');
+            if (!match) return null;
+            const [, dd, mm, yyyy] = match;
+            const date = new Date(Number(yyyy), Number(mm) - 1, Number(dd));
+            const isValid = date.getFullYear() === Number(yyyy) && date.getMonth() === Number(mm) - 1 && date.getDate() === Number(dd);
+            return isValid ? date : null;
+        }
+
+        function toISODate(date) {
+            const year = date.getFullYear();
+            const month = String(date.getMonth() + 1).padStart(2, '0');
+            const day = String(date.getDate()).padStart(2, '0');
+            return `${year}-${month}-${day}`;
+        }
+
+        function formatISOToPtBr(str){
+            if(!str) return 'N/A';
+            const [y,m,d]=str.split('-');
+            if(!y||!m||!d) return str;
+            return `${d.padStart(2,'0')}/${m.padStart(2,'0')}/${y}`;
+        }
+
+        function setupBirthDateInput() {
+            const input = document.getElementById('editBirthDate');
+            if (!input) return;
+            input.addEventListener('input', (e) => {
+                e.target.value = formatDateMask(e.target.value);
+            });
+            input.addEventListener('blur', (e) => {
+                e.target.value = formatDateMask(e.target.value);
+            });
+            input.addEventListener('keydown', (e) => {
+                if (shouldBlockDateKey(e)) {
+                    e.preventDefault();
+                }
+            });
+        }
+
+        const phoneInput = document.getElementById('editPhone');
+        if (phoneInput) {
+            phoneInput.addEventListener('input', () => {
+                phoneInput.value = sanitizePhone(phoneInput.value);
+            });
+        }
+
+        setupBirthDateInput();
+
+        async function logout() {
+            await fetch('/logout', { method: 'POST' }).catch(() => {});
+            localStorage.clear();
+            window.location.href = '/login';
+        }
+
+        async function deleteAccount() {
+            // Primeira confirmação
+            const confirm1 = confirm('⚠️ ATENÇÃO! Você está prestes a excluir sua conta permanentemente.\n\nTodos os seus dados serão apagados e não poderão ser recuperados.\n\nDeseja realmente continuar?');
+            
+            if (!confirm1) {
+                return;
+            }
+
+            // Segunda confirmação para segurança extra
+            const confirm2 = confirm('🚨 ÚLTIMA CONFIRMAÇÃO!\n\nEsta é sua última chance. Ao confirmar:\n\n• Sua conta será excluída\n• Todos os seus dados serão apagados\n• Você não terá mais acesso ao sistema\n• Esta ação é IRREVERSÍVEL\n\nTem certeza absoluta que deseja excluir sua conta?');
+            
+            if (!confirm2) {
+                showMessage('✅ Exclusão cancelada. Sua conta está segura.', 'success');
+                return;
+            }
+
+            try {
+                showMessage('⏳ Excluindo conta...', 'success');
+                
+                const response = await fetch(`/clients/${currentUser.id}`, {
+                    method: 'DELETE'
+                });
+
+                if (response.ok || response.status === 204) {
+                    // Limpar dados locais
+                    localStorage.clear();
+                    sessionStorage.clear();
+                    
+                    // Mensagem de confirmação
+                    alert('✅ Conta excluída com sucesso!\n\nSeus dados foram removidos permanentemente.\n\nVocê será redirecionado para a página de login.');
+                    
+                    // Redirecionar para login
+                    window.location.href = '/login';
+                } else {
+                    const error = await response.json();
+                    showMessage(`❌ Erro ao excluir conta: ${error.detail || 'Falha desconhecida'}`, 'error');
+                }
+            } catch (err) {
+                showMessage(`❌ Erro ao excluir conta: ${err.message}`, 'error');
+                console.error('Erro ao excluir conta:', err);
+            }
+        }
+
+        function enableEditMode() {
+            // Preencher campos de edição com dados atuais
+                document.getElementById('editBtn').style.display = 'none';
+            document.getElementById('editName').value = currentUser.nome;
+            document.getElementById('editEmail').value = currentUser.email;
+            document.getElementById('editPhone').value = sanitizePhone(currentUser.telefone?.toString());
+            document.getElementById('editBirthDate').value = currentUser.data_nascimento ? formatISOToPtBr(currentUser.data_nascimento) : '';
+            document.getElementById('editCorrentista').checked = currentUser.correntista || false;
+
+            // Alternar modos
+            document.getElementById('viewMode').style.display = 'none';
+            document.getElementById('editMode').style.display = 'block';
+        }
+
+        function cancelEdit() {
+            // Alternar de volta para modo visualização
+                document.getElementById('editBtn').style.display = 'block';
+            document.getElementById('editMode').style.display = 'none';
+            document.getElementById('viewMode').style.display = 'block';
+        }
+
+        async function savePersonalData(event) {
+            event.preventDefault();
+
+            // Capturar dados antigos para comparação
+            const oldEmail = currentUser.email;
+            const oldPhone = currentUser.telefone;
+
+            const phoneClean = sanitizePhone(document.getElementById('editPhone').value);
+            const birthRaw = document.getElementById('editBirthDate').value.trim();
+            const birthDate = parseBRDate(birthRaw);
+            if (!birthDate) {
+                showMessage('❌ Informe a data no formato dd/mm/aaaa', 'error');
+                return;
+            }
+
+            const updatedData = {
+                nome: document.getElementById('editName').value,
+                email: document.getElementById('editEmail').value,
+                telefone: phoneClean ? parseInt(phoneClean, 10) : null,
+                data_nascimento: toISODate(birthDate),
+                correntista: document.getElementById('editCorrentista').checked
+            };
+
+            try {
+                const response = await fetch(`/clients/${currentUser.id}`, {
+                    method: 'PUT',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify(updatedData)
+                });
+
+                if (response.ok) {
+                    currentUser = await response.json();
+                    localStorage.setItem('cliente', JSON.stringify(currentUser));
+                        document.getElementById('editBtn').style.display = 'block';
+                    displayUserData();
+                    cancelEdit();
+                    
+                    // Mensagem personalizada se email ou telefone mudaram
+                    let message = '✅ Dados atualizados com sucesso!';
+                    const emailChanged = oldEmail !== currentUser.email;
+                    const phoneChanged = oldPhone !== currentUser.telefone;
+                    
+                    if (emailChanged && phoneChanged) {
+                        message += '\n📧 Email e 📱 Telefone alterados. Use o novo email no próximo login!';
+                    } else if (emailChanged) {
+                        message += '\n📧 Email alterado. Use o novo email no próximo login!';
+                    } else if (phoneChanged) {
+                        message += '\n📱 Telefone alterado e registrado com sucesso!';
+                    }
+                    
+                    showMessage(message, 'success');
+                } else {
+                    const error = await response.json();
+                    showMessage(`❌ Erro: ${error.detail || 'Falha ao atualizar dados'}`, 'error');
+                }
+            } catch (err) {
+                showMessage(`❌ Erro: ${err.message}`, 'error');
+            }
+        }
+
+        // Inicializa ao carregar
+        window.addEventListener('load', init);
@@ -0,0 +1,749 @@
+        let currentUser = null;
+        let investments = [];
+        let autoRefreshInterval = null;
+        let watchlistTickers = [];
+        let pendingInvestimento = null;
+
+        async function refreshCurrentUser() {
+            try {
+                const resp = await fetch(`/clients/${currentUser.id}`, {
+                    cache: 'no-cache'
+                });
+                if (!resp.ok) {
+                    throw new Error(`Erro ${resp.status}`);
+                }
+                currentUser = await resp.json();
+                localStorage.setItem('cliente', JSON.stringify(currentUser));
+            } catch (err) {
+                console.warn('Não foi possível atualizar o cliente', err);
+            }
+        }
+
+        async function init() {
+            // Verificar versão da aplicação para forçar reload de dados em cache
+            const APP_VERSION = "1.1.0";
+            const storedVersion = localStorage.getItem('appVersion');
+            
+            if (storedVersion !== APP_VERSION) {
+                console.log('Versão da aplicação mudou, limpando cache de dados...');
+                // Limpar APENAS cache de dados, não o login
+                localStorage.removeItem('watchlistTickers');
+                localStorage.setItem('appVersion', APP_VERSION);
+            }
+            
+            const userData = localStorage.getItem('cliente');
+            
+            if (!userData) {
+                window.location.href = '/login';
+                return;
+            }
+
+            // Confere a sessão assinada emitida no login (sem novo bcrypt no storage)
+            const sessao = await fetch('/session');
+            if (!sessao.ok) {
+                localStorage.clear();
+                window.location.href = '/login';
+                return;
+            }
+
+            // O cliente é o da sessão; dados locais de outro cliente são descartados
+            const { cliente_id } = await sessao.json();
+            currentUser = JSON.parse(userData);
+            if (currentUser.id !== cliente_id) {
+                localStorage.removeItem('cliente');
+                currentUser = { id: cliente_id };
+            }
+            
+            // Sempre fazer um refresh dos dados do servidor ao inicializar
+            try {
+                console.log('Carregando dados do servidor...');
+                const resp = await fetch(`/clients/${currentUser.id}`, {
+                    cache: 'no-cache'
+                });
+                if (resp.ok) {
+                    currentUser = await resp.json();
+                    localStorage.setItem('cliente', JSON.stringify(currentUser));
+                    console.log('Dados do servidor carregados:', currentUser);
+                }
+            } catch (err) {
+                console.warn('Erro ao recarregar dados do servidor:', err);
+            }
+            await refreshCurrentUser();
+            loadAllData();
+            initWatchlist();
+            startAutoRefresh();
+        }
+
+        async function loadAllData() {
+            await Promise.all([
+                loadPatrimonio(),
+                loadProjecao(),
+                loadAlocacao(),
+                loadInvestimentos()
+            ]);
+        }
+
+        async function loadPatrimonio() {
+            try {
+                const response = await fetch(`/calculos/patrimonio/${currentUser.id}`, { cache: 'no-cache' });
+                if (response.ok) {
+                    const data = await response.json();
+                    // Exibir patrimonio_investimento (disponível para investir)
+                    document.getElementById('patrimonioValue').textContent = 
+                        `R$ ${data.patrimonio_investimento.toLocaleString('pt-BR', { minimumFractionDigits: 2, maximumFractionDigits: 2 }).replace('.', ',')}`;
+                    document.getElementById('saldoContaValue').textContent = 
+                        `R$ ${data.saldo_conta.toLocaleString('pt-BR', { minimumFractionDigits: 2, maximumFractionDigits: 2 }).replace('.', ',')}`;
+                    document.getElementById('totalInvestidoValue').textContent = 
+                        `R$ ${data.total_investimentos.toLocaleString('pt-BR', { minimumFractionDigits: 2, maximumFractionDigits: 2 }).replace('.', ',')}`;
+                    // Patrimônio Base reflete o patrimônio atual (disponível para investir)
+                    const patrimonioBase = (data.patrimonio_investimento ?? data.patrimonio_total ?? 0);
+                    document.getElementById('patrimonioBaseValue').textContent = 
+                        `R$ ${patrimonioBase.toLocaleString('pt-BR', { minimumFractionDigits: 2, maximumFractionDigits: 2 }).replace('.', ',')}`;
+                }
+            } catch (err) {
+                console.error('Erro ao carregar patrimônio:', err);
+            }
+        }
+
+        async function loadProjecao() {
+            try {
+                const response = await fetch(`/calculos/projecao/${currentUser.id}`, { cache: 'no-cache' });
+                if (response.ok) {
+                    const data = await response.json();
+                    console.log('Dados de projeção:', data);
+                    document.getElementById('projecaoValue').textContent = 
+                        `R$ ${data.projecao_anual.toLocaleString('pt-BR', { minimumFractionDigits: 2, maximumFractionDigits: 2 }).replace('.', ',')}`;
+                    document.getElementById('taxaProjecaoValue').textContent = `${data.taxa_retorno}%`;
+                    document.getElementById('perfilValue').textContent = data.perfil_investidor;
+                    document.getElementById('baseCalculoValue').textContent = data.perfil_investidor;
+                }
+            } catch (err) {
+                console.error('Erro ao carregar projeção:', err);
+            }
+        }
+
+        async function loadAlocacao() {
+            try {
+                const response = await fetch(`/analises/carteira/${currentUser.id}`);
+                if (response.ok) {
+                    const data = await response.json();
+                    document.getElementById('numAtivosValue').textContent = data.numero_investimentos;
+                    
+                    let alocacaoHtml = '';
+                    for (const [tipo, info] of Object.entries(data.alocacao_por_tipo)) {
+                        alocacaoHtml += `
+                            <div class="alocacao-item">
+                                <div class="alocacao-tipo">${tipo}</div>
+                                <div class="alocacao-barra">
+                                    <div class="alocacao-preenchimento" style="width: ${info.percentual_carteira}%"></div>
+                                </div>
+                                <div class="alocacao-percentual">${info.percentual_carteira}%</div>
+                            </div>
+                        `;
+                    }
+                    document.getElementById('alocacaoContent').innerHTML = alocacaoHtml || '<p style="color: #999;">Nenhum investimento para exibir</p>';
+                }
+            } catch (err) {
+                console.error('Erro ao carregar alocação:', err);
+            }
+        }
+
+        async function loadInvestimentos() {
+            try {
+                const response = await fetch(`/investments/cliente/${currentUser.id}`);
+                if (response.ok) {
+                    investments = await response.json();
+                    renderInvestimentos();
+                }
+            } catch (err) {
+                console.error('Erro ao carregar investimentos:', err);
+            }
+        }
+
+        function renderInvestimentos() {
+            const tbody = document.getElementById('investmentsTbody');
+            tbody.innerHTML = '';
+
+            if (investments.length === 0) {
+                tbody.innerHTML = '<tr><td colspan="8" style="text-align: center; color: #999;">Nenhum investimento cadastrado</td></tr>';
+                return;
+            }
+
+            investments.forEach(inv => {
+                const tr = document.createElement('tr');
+                const dataApp = new Date(inv.data_aplicacao).toLocaleDateString('pt-BR');
+                const status = inv.ativo ? '✅ Ativo' : '❌ Inativo';
+                
+                tr.innerHTML = `
+                    <td>#${inv.id}</td>
+                    <td>${inv.tipo_investimento}</td>
+                    <td>${inv.ticker || '-'}</td>
+                    <td>R$ ${inv.valor_investido.toLocaleString('pt-BR', { minimumFractionDigits: 2, maximumFractionDigits: 2 }).replace('.', ',')}</td>
+                    <td>${inv.rentabilidade || 0}%</td>
+                    <td>${status}</td>
+                    <td>${dataApp}</td>
+                    <td class="actions">
+                        <button class="btn-small btn-delete" onclick="deleteInvestimento(${inv.id})">� Vender</button>
+                    </td>
+                `;
+                tbody.appendChild(tr);
+            });
+        }
+
+        function showCreateForm() {
+            document.getElementById('createFormContainer').style.display = 'block';
+            document.getElementById('createFormContainer').scrollIntoView({ behavior: 'smooth' });
+        }
+
+        function cancelCreateForm() {
+            document.getElementById('createFormContainer').style.display = 'none';
+            document.getElementById('tipoInvestimento').value = '';
+            document.getElementById('ticker').value = '';
+            document.getElementById('quantidade').value = '';
+            document.getElementById('valorTotal').value = '';
+            document.getElementById('cotacaoAtual').innerHTML = 'Informe o ticker para buscar cotação';
+            document.getElementById('cotacaoAtual').style.color = '#666';
+            document.getElementById('rentabilidade').value = '';
+            document.getElementById('ativo').checked = true;
+            window.currentCotacao = null;
+            window.currentTickerData = null;
+        }
+
+        async function saveInvestimento(event) {
+            event.preventDefault();
+
+            const valorTotal = parseFloat(document.getElementById('valorTotal').value);
+            if (!valorTotal || valorTotal <= 0) {
+                showMessage('❌ Informe a quantidade e verifique se a cotação foi carregada', 'error');
+                return;
+            }
+
+            const investimento = {
+                cliente_id: currentUser.id,
+                tipo_investimento: document.getElementById('tipoInvestimento').value,
+                ticker: document.getElementById('ticker').value || null,
+                valor_investido: valorTotal,
+                rentabilidade: parseFloat(document.getElementById('rentabilidade').value) || 0,
+                ativo: document.getElementById('ativo').checked
+            };
+
+            try {
+                const response = await fetch('/investments', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify(investimento)
+                });
+
+                if (response.ok) {
+                    showMessage('✅ Investimento criado com sucesso!', 'success');
+                    cancelCreateForm();
+                    await loadAllData();
+                } else {
+                    const error = await response.json();
+                    showMessage(`❌ Erro: ${error.detail || 'Falha ao criar investimento'}`, 'error');
+                }
+            } catch (err) {
+                showMessage(`❌ Erro: ${err.message}`, 'error');
+            }
+        }
+
+        async function abrirConfirmacaoCompra(event) {
+            event.preventDefault();
+
+            const valorTotal = parseFloat(document.getElementById('valorTotal').value);
+            if (!valorTotal || valorTotal <= 0) {
+                showMessage('❌ Informe a quantidade e verifique se a cotação foi carregada', 'error');
+                return;
+            }
+
+            // Preparar dados do investimento
+            const tipo = document.getElementById('tipoInvestimento').value;
+            const ticker = document.getElementById('ticker').value || '-';
+            const quantidade = document.getElementById('quantidade').value;
+            const cotacao = document.getElementById('cotacaoAtual').textContent;
+
+            // Armazenar investimento pendente
+            pendingInvestimento = {
+                cliente_id: currentUser.id,
+                tipo_investimento: tipo,
+                ticker: ticker !== '-' ? ticker : null,
+                valor_investido: valorTotal,
+                rentabilidade: parseFloat(document.getElementById('rentabilidade').value) || 0,
+                ativo: document.getElementById('ativo').checked
+            };
+
+            const buildDetalhesHtml = (patrimonioAtual) => `
+                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 15px;">
+                    <div>
+                        <strong style="color: #666; font-size: 12px; text-transform: uppercase;">Tipo</strong>
+                        <div style="font-size: 16px; color: #333; margin-top: 5px;">${tipo}</div>
+                    </div>
+                    <div>
+                        <strong style="color: #666; font-size: 12px; text-transform: uppercase;">Ticker</strong>
+                        <div style="font-size: 16px; color: #333; margin-top: 5px;">${ticker}</div>
+                    </div>
+                    <div>
+                        <strong style="color: #666; font-size: 12px; text-transform: uppercase;">Quantidade</strong>
+                        <div style="font-size: 16px; color: #333; margin-top: 5px;">${quantidade}</div>
+                    </div>
+                    <div>
+                        <strong style="color: #666; font-size: 12px; text-transform: uppercase;">Cotação</strong>
+                        <div style="font-size: 16px; color: #333; margin-top: 5px;">${cotacao}</div>
+                    </div>
+                    <div style="grid-column: 1 / -1;">
+                        <strong style="color: #666; font-size: 12px; text-transform: uppercase;">Valor Total</strong>
+                        <div style="font-size: 24px; font-weight: 700; color: #667eea; margin-top: 5px;">
+                            R$ ${valorTotal.toLocaleString('pt-BR', {minimumFractionDigits: 2, maximumFractionDigits: 2})}
+                        </div>
+                    </div>
+                </div>
+                <div style="margin-top: 15px; padding-top: 15px; border-top: 1px solid #ddd; font-size: 14px; color: #999;">
+                    Seu patrimônio atual: <strong style="color: #333;">R$ ${patrimonioAtual.toLocaleString('pt-BR', {minimumFractionDigits: 2, maximumFractionDigits: 2})}</strong>
+                    <br>
+                    <span style="font-size: 12px;">Patrimônio após compra: <strong style="color: ${patrimonioAtual - valorTotal >= 0 ? '#27ae60' : '#e74c3c'};">R$ ${(patrimonioAtual - valorTotal).toLocaleString('pt-BR', {minimumFractionDigits: 2, maximumFractionDigits: 2})}</strong></span>
+                </div>
+            `;
+
+            // SEMPRE buscar patrimônio fresco do servidor antes de abrir a modal
+            let patrimonioAtual = 0;
+            try {
+                const resp = await fetch(`/clients/${currentUser.id}`, {
+                    cache: 'no-cache'
+                });
+                if (!resp.ok) {
+                    throw new Error(`Erro ${resp.status}`);
+                }
+                const clienteAtualizado = await resp.json();
+                patrimonioAtual = clienteAtualizado.patrimonio_investimento || 0;
+                // manter currentUser alinhado
+                currentUser = clienteAtualizado;
+                localStorage.setItem('cliente', JSON.stringify(currentUser));
+                console.log('Patrimônio atual buscado do servidor:', patrimonioAtual);
+            } catch (err) {
+                console.error('Erro ao buscar patrimônio para confirmação', err);
+                // Fallback para o currentUser em memória
+                patrimonioAtual = currentUser.patrimonio_investimento || 0;
+            }
+
+            document.getElementById('confirmacaoDetalhes').innerHTML = buildDetalhesHtml(patrimonioAtual);
+            document.getElementById('confirmacaoCompraModal').style.display = 'flex';
+        }
+
+        function cancelarConfirmacaoCompra() {
+            document.getElementById('confirmacaoCompraModal').style.display = 'none';
+            pendingInvestimento = null;
+        }
+
+        async function confirmarCompraInvestimento() {
+            if (!pendingInvestimento) {
+                showMessage('❌ Erro ao processar a compra', 'error');
+                return;
+            }
+
+            document.getElementById('confirmacaoCompraModal').style.display = 'none';
+
+            try {
+                console.log('Enviando POST /investments com:', JSON.stringify(pendingInvestimento));
+                const response = await fetch('/investments', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify(pendingInvestimento)
+                });
+
+                console.log('Resposta do servidor:', response.status, response.statusText);
+
+                if (response.ok) {
+                    showMessage('✅ Investimento criado com sucesso!', 'success');
+                    cancelCreateForm();
+                    
+                    // Aguardar um pouco para garantir que o backend processou a dedução
+                    await new Promise(resolve => setTimeout(resolve, 500));
+                    
+                    // Limpar cache do localStorage para forçar reload
+                    localStorage.removeItem('cliente');
+                    
+                    // Atualizar currentUser com dados do servidor (garantir que é OK)
+                    try {
+                        const resp = await fetch(`/clients/${currentUser.id}`, {
+                            cache: 'no-cache'
+                        });
+                        if (!resp.ok) {
+                            throw new Error(`Erro ${resp.status}`);
+                        }
+                        const clienteAtualizado = await resp.json();
+                        currentUser = clienteAtualizado;
+                        localStorage.setItem('cliente', JSON.stringify(currentUser));
+                        console.log('Cliente atualizado após compra:', currentUser);
+                    } catch (err) {
+                        console.warn('Erro ao atualizar cliente após compra:', err);
+                    }
+                    
+                    await loadAllData();
+                    pendingInvestimento = null;
+                } else {
+                    const error = await response.json();
+                    console.error('Erro do servidor:', error);
+                    showMessage(`❌ Erro: ${error.detail || JSON.stringify(error) || 'Falha ao criar investimento'}`, 'error');
+                }
+            } catch (err) {
+                showMessage(`❌ Erro: ${err.message}`, 'error');
+            }
+        }
+
+        async function deleteInvestimento(invId) {
+            if (!confirm('Tem certeza que deseja vender este investimento?\n\nO valor investido será retornado para o seu patrimônio disponível.')) {
+                return;
+            }
+
+            try {
+                const response = await fetch(`/investments/${invId}`, {
+                    method: 'DELETE'
+                });
+
+                if (response.ok || response.status === 204) {
+                    // Limpar cache do localStorage para forçar reload
+                    localStorage.removeItem('cliente');
+                    
+                    showMessage('✅ Investimento vendido com sucesso! O valor foi retornado ao seu patrimônio.', 'success');
+                    
+                    // Aguardar um pouco para o backend processar
+                    await new Promise(resolve => setTimeout(resolve, 500));
+                    await loadAllData();
+                } else {
+                    showMessage('❌ Erro ao vender investimento', 'error');
+                }
+            } catch (err) {
+                showMessage(`❌ Erro: ${err.message}`, 'error');
+            }
+        }
+
+        function showMessage(message, type) {
+            const msgElement = document.getElementById('message');
+            msgElement.textContent = message;
+            msgElement.className = `message ${type}`;
+            
+            setTimeout(() => {
+                msgElement.className = 'message';
+            }, 5000);
+        }
+
+        // ===================== Auto refresh =====================
+        function startAutoRefresh() {
+            stopAutoRefresh();
+            autoRefreshInterval = setInterval(() => {
+                carregarIndices(true);
+                refreshWatchlist(true);
+            }, 60000);
+            // Atualiza imediatamente quando liga
+            carregarIndices(true);
+            refreshWatchlist(true);
+        }
+
+        function stopAutoRefresh() {
+            if (autoRefreshInterval) {
+                clearInterval(autoRefreshInterval);
+                autoRefreshInterval = null;
+            }
+        }
+
+        // ===================== Watchlist =====================
+        function initWatchlist() {
+            try {
+                const stored = localStorage.getItem('watchlistTickers');
+                watchlistTickers = stored ? JSON.parse(stored) : ['AAPL', 'MSFT', 'PETR4.SA'];
+            } catch {
+                watchlistTickers = ['AAPL', 'MSFT', 'PETR4.SA'];
+            }
+            refreshWatchlist();
+        }
+
+        function saveWatchlist() {
+            localStorage.setItem('watchlistTickers', JSON.stringify(watchlistTickers));
+        }
+
+        function showWatchlistMessage(message, type = 'warning') {
+            const el = document.getElementById('watchlistMessage');
+            el.textContent = message;
+            el.className = `message ${type}`;
+            setTimeout(() => {
+                el.className = 'message';
+            }, 4000);
+        }
+
+        function addWatchlistTicker() {
+            const input = document.getElementById('watchlistInput');
+            const ticker = input.value.trim().toUpperCase();
+            if (!ticker) return;
+            if (watchlistTickers.includes(ticker)) {
+                showWatchlistMessage('⚠️ Ticker já na lista', 'warning');
+                return;
+            }
+            watchlistTickers.push(ticker);
+            saveWatchlist();
+            input.value = '';
+            showWatchlistMessage('✅ Ticker adicionado', 'success');
+            refreshWatchlist(true);
+        }
+
+        function removeWatchlistTicker(ticker) {
+            watchlistTickers = watchlistTickers.filter(t => t !== ticker);
+            saveWatchlist();
+            refreshWatchlist(true);
+        }
+
+        async function refreshWatchlist(force = false) {
+            const grid = document.getElementById('watchlistGrid');
+            if (!grid) return;
+            if (watchlistTickers.length === 0) {
+                grid.innerHTML = '<div style="text-align:center; color:#999;">Adicione tickers para acompanhar</div>';
+                return;
+            }
+
+            grid.innerHTML = '<div style="text-align:center; color:#999;">Carregando...</div>';
+
+            const requests = watchlistTickers.map(ticker => (
+                fetch(`/analises/mercado/${ticker}`)
+                    .then(r => r.ok ? r.json() : null)
+                    .then(data => ({ ticker, data }))
+                    .catch(() => ({ ticker, data: null }))
+            ));
+
+            const results = await Promise.all(requests);
+
+            let html = '';
+            for (const { ticker, data } of results) {
+                const preco = data && data.preco_atual != null ? data.preco_atual.toLocaleString('pt-BR', { minimumFractionDigits: 2, maximumFractionDigits: 2 }) : 'N/A';
+                const variacao = data ? (data.variacao_percentual || 0).toFixed(2) : '0.00';
+                const variacaoClass = data && data.variacao_dia >= 0 ? 'positivo' : 'negativo';
+                const variacaoSimbolo = data && data.variacao_dia >= 0 ? '▲' : '▼';
+                html += `
+                    <div class="indice-card">
+                        <div style="display:flex; justify-content:space-between; align-items:center;">
+                            <div class="indice-nome">${ticker}</div>
+                            <button class="btn btn-danger" style="padding:6px 10px;" onclick="removeWatchlistTicker('${ticker}')">🗑️</button>
+                        </div>
+                        <div class="indice-preco">${preco}</div>
+                        <div class="indice-variacao ${variacaoClass}">${variacaoSimbolo} ${variacao}%</div>
+                    </div>
+                `;
+            }
+
+            grid.innerHTML = html;
+
+            try {
+                const now = new Date();
+                document.getElementById('watchlistLastUpdate').textContent = now.toLocaleString('pt-BR');
+            } catch {}
+        }
+
+        function showBolsaValores() {
+            const container = document.getElementById('bolsaValoresContainer');
+            const watchlistContainer = document.getElementById('watchlistContainer');
+            if (container.style.display === 'none') {
+                container.style.display = 'block';
+                watchlistContainer.style.display = 'block';
+                startAutoRefresh();
+            } else {
+                container.style.display = 'none';
+                watchlistContainer.style.display = 'none';
+                stopAutoRefresh();
+            }
+        }
+
+        async function buscarCotacao() {
+            const ticker = document.getElementById('tickerSearch').value.trim();
+            if (!ticker) {
+                document.getElementById('bolsaMessage').textContent = '⚠️ Digite um ticker para buscar';
+                document.getElementById('bolsaMessage').className = 'message warning';
+                return;
+            }
+
+            try {
+                const response = await fetch(`/analises/mercado/${ticker}`);
+                if (response.ok) {
+                    const data = await response.json();
+                    mostrarCotacao(data);
+                } else {
+                    const error = await response.json();
+                    document.getElementById('bolsaMessage').textContent = `❌ ${error.detail || 'Ticker não encontrado'}`;
+                    document.getElementById('bolsaMessage').className = 'message error';
+                }
+            } catch (err) {
+                document.getElementById('bolsaMessage').textContent = `❌ Erro ao buscar cotação: ${err.message}`;
+                document.getElementById('bolsaMessage').className = 'message error';
+            }
+        }
+
+        function mostrarCotacao(data) {
+            const variacaoClass = data.variacao_dia >= 0 ? 'positivo' : 'negativo';
+            const variacaoSimbolo = data.variacao_dia >= 0 ? '▲' : '▼';
+            
+            const html = `
+                <div class="cotacao-card">
+                    <h3>${data.ticker}</h3>
+                    <div class="cotacao-preco">R$ ${data.preco_atual ? data.preco_atual.toFixed(2) : 'N/A'}</div>
+                    <div class="cotacao-variacao ${variacaoClass}">
+                        ${variacaoSimbolo} ${data.variacao_percentual ? data.variacao_percentual.toFixed(2) : '0.00'}% 
+                        (${data.variacao_dia >= 0 ? '+' : ''}${data.variacao_dia ? data.variacao_dia.toFixed(2) : '0.00'})
+                    </div>
+                    <div style="margin-top: 15px; font-size: 14px;">
+                        <div>Volume: ${data.volume ? data.volume.toLocaleString('pt-BR') : 'N/A'}</div>
+                    </div>
+                </div>
+            `;
+            
+            document.getElementById('cotacaoResult').innerHTML = html;
+            document.getElementById('bolsaMessage').textContent = '';
+        }
+
+        async function carregarIndices(force = false) {
+            const indices = [
+                { ticker: '^BVSP', nome: 'Ibovespa' },
+                { ticker: '^GSPC', nome: 'S&P 500' },
+                { ticker: '^DJI', nome: 'Dow Jones' },
+                { ticker: '^IXIC', nome: 'NASDAQ' },
+                { ticker: 'BTC-USD', nome: 'Bitcoin' },
+                { ticker: 'ETH-USD', nome: 'Ethereum' }
+            ];
+
+            const grid = document.getElementById('indicesGrid');
+            grid.innerHTML = '<div style="text-align: center; color: #999;">Carregando...</div>';
+
+            // Buscar cotações em paralelo para maior performance
+            const requests = indices.map(indice => (
+                fetch(`/analises/mercado/${indice.ticker}`)
+                    .then(r => r.ok ? r.json() : null)
+                    .then(data => ({ indice, data }))
+                    .catch(() => ({ indice, data: null }))
+            ));
+
+            const results = await Promise.all(requests);
+
+            let html = '';
+            for (const result of results) {
+                const { indice, data } = result;
+                if (data) {
+                    const variacaoClass = data.variacao_dia >= 0 ? 'positivo' : 'negativo';
+                    const variacaoSimbolo = data.variacao_dia >= 0 ? '▲' : '▼';
+                    html += `
+                        <div class="indice-card">
+                            <div class="indice-nome">${indice.nome}</div>
+                            <div class="indice-preco">${data.preco_atual ? data.preco_atual.toLocaleString('pt-BR', {minimumFractionDigits: 2, maximumFractionDigits: 2}) : 'N/A'}</div>
+                            <div class="indice-variacao ${variacaoClass}">${variacaoSimbolo} ${data.variacao_percentual ? data.variacao_percentual.toFixed(2) : '0.00'}%</div>
+                        </div>
+                    `;
+                } else {
+                    html += `
+                        <div class="indice-card">
+                            <div class="indice-nome">${indice.nome}</div>
+                            <div style="color:#999">Erro ao carregar</div>
+                        </div>
+                    `;
+                }
+            }
+
+            grid.innerHTML = html || '<div style="text-align: center; color: #999;">Erro ao carregar índices</div>';
+
+            // Atualiza carimbo de tempo
+            try {
+                const now = new Date();
+                document.getElementById('bolsaLastUpdate').textContent = now.toLocaleString('pt-BR');
+            } catch {}
+        }
+
+        // ===================== Funções para compra por quantidade =====================
+        window.currentCotacao = null;
+        window.currentTickerData = null;
+
+        async function buscarCotacaoParaCompra() {
+            let ticker = document.getElementById('ticker').value.trim().toUpperCase();
+            const cotacaoEl = document.getElementById('cotacaoAtual');
+            
+            if (!ticker) {
+                cotacaoEl.innerHTML = 'Informe o ticker para buscar cotação';
+                cotacaoEl.style.color = '#666';
+                window.currentCotacao = null;
+                window.currentTickerData = null;
+                calcularValorTotal();
+                return;
+            }
+
+            // Normalizar tickers comuns
+            const tickerMap = {
+                'BITCOIN': 'BTC-USD',
+                'BTC': 'BTC-USD',
+                'ETHEREUM': 'ETH-USD',
+                'ETH': 'ETH-USD',
+                'PETR4': 'PETR4.SA',
+                'VALE3': 'VALE3.SA',
+                'ITUB4': 'ITUB4.SA',
+                'BBDC4': 'BBDC4.SA',
+                'APPLE': 'AAPL',
+                'MICROSOFT': 'MSFT',
+                'GOOGLE': 'GOOGL',
+                'TESLA': 'TSLA'
+            };
+            
+            if (tickerMap[ticker]) {
+                ticker = tickerMap[ticker];
+                document.getElementById('ticker').value = ticker;
+            }
+
+            cotacaoEl.innerHTML = '🔄 Buscando cotação...';
+            cotacaoEl.style.color = '#667eea';
+
+            try {
+                const response = await fetch(`/analises/mercado/${ticker}`);
+                if (response.ok) {
+                    const data = await response.json();
+                    window.currentCotacao = data.preco_atual;
+                    window.currentTickerData = data;
+                    
+                    const variacaoClass = data.variacao_dia >= 0 ? 'positivo' : 'negativo';
+                    const variacaoSimbolo = data.variacao_dia >= 0 ? '▲' : '▼';
+                    
+                    cotacaoEl.innerHTML = `
+                        <div style="display: flex; justify-content: space-between; align-items: center;">
+                            <div>
+                                <strong style="font-size: 16px; color: #27ae60;">R$ ${data.preco_atual.toLocaleString('pt-BR', {minimumFractionDigits: 2, maximumFractionDigits: 2})}</strong>
+                                <span style="margin-left: 8px; font-size: 12px; color: #999;">por unidade</span>
+                            </div>
+                            <div style="font-size: 12px; padding: 4px 8px; border-radius: 4px; background: ${variacaoClass === 'positivo' ? '#27ae60' : '#e74c3c'}; color: white;">
+                                ${variacaoSimbolo} ${data.variacao_percentual ? data.variacao_percentual.toFixed(2) : '0.00'}%
+                            </div>
+                        </div>
+                        <div style="margin-top: 8px; font-size: 11px; color: #999;">
+                            <strong>${ticker}</strong> • Volume: ${data.volume ? data.volume.toLocaleString('pt-BR') : 'N/A'}
+                        </div>
+                    `;
+                    cotacaoEl.style.color = '#333';
+                    calcularValorTotal();
+                } else {
+                    cotacaoEl.innerHTML = `❌ Ticker "${ticker}" não encontrado. Tente: BTC-USD, PETR4.SA, AAPL`;
+                    cotacaoEl.style.color = '#e74c3c';
+                    window.currentCotacao = null;
+                    window.currentTickerData = null;
+                    calcularValorTotal();
+                }
+            } catch (err) {
+                cotacaoEl.innerHTML = '❌ Erro ao buscar cotação. Verifique sua conexão.';
+                cotacaoEl.style.color = '#e74c3c';
+                window.currentCotacao = null;
+                window.currentTickerData = null;
+                calcularValorTotal();
+            }
+        }
+
+        function calcularValorTotal() {
+            const quantidade = parseFloat(document.getElementById('quantidade').value) || 0;
+            const cotacao = window.currentCotacao || 0;
+            const valorTotal = quantidade * cotacao;
+            
+            document.getElementById('valorTotal').value = valorTotal.toFixed(2);
+        }
+
+        window.addEventListener('load', init);
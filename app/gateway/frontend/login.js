@@ -0,0 +1,48 @@
+        const loginForm = document.getElementById('loginForm');
+        const registerBtn = document.getElementById('registerBtn');
+        const errorMsg = document.getElementById('errorMsg');
+        const successMsg = document.getElementById('successMsg');
+
+        loginForm.addEventListener('submit', async (e) => {
+            e.preventDefault();
+            errorMsg.style.display = 'none';
+            successMsg.style.display = 'none';
+
+            const email = document.getElementById('email').value;
+            const senha = document.getElementById('senha').value;
+
+            try {
+                const response = await fetch('/login', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({ email, senha })
+                });
+
+                if (response.ok) {
+                    const cliente = await response.json();
+                    successMsg.textContent = `Bem-vindo, ${cliente.nome}!`;
+                    successMsg.style.display = 'block';
+                    localStorage.setItem('cliente', JSON.stringify(cliente));
+                    localStorage.setItem('login_response', JSON.stringify(cliente));
+                    setTimeout(() => {
+                        window.location.href = '/dashboard';
+                    }, 1500);
+                } else if (response.status === 401) {
+                    errorMsg.textContent = 'Email ou senha inválidos';
+                    errorMsg.style.display = 'block';
+                } else {
+                    const error = await response.json();
+                    errorMsg.textContent = error.detail || 'Erro ao fazer login';
+                    errorMsg.style.display = 'block';
+                }
+            } catch (error) {
+                errorMsg.textContent = 'Erro de conexão com o servidor';
+                errorMsg.style.display = 'block';
+            }
+        });
+
+        registerBtn.addEventListener('click', () => {
+            window.location.href = '/register';
+        });
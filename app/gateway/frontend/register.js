@@ -0,0 +1,223 @@
+        function togglePassword(inputId, button) {
+            const input = document.getElementById(inputId);
+            const svg = button.querySelector('svg');
+            if (input.type === 'password') {
+                input.type = 'text';
+                svg.innerHTML = '<path d="M38.8 5.1C28.4-3.1 13.3-1.2 5.1 9.2S-1.2 34.7 9.2 42.9l592 464c10.4 8.2 25.5 6.3 33.7-4.1s6.3-25.5-4.1-33.7L525.6 386.7c39.6-40.6 66.4-86.1 79.9-118.4c3.3-7.9 3.3-16.7 0-24.6c-14.9-35.7-46.2-87.7-93-131.1C465.5 68.8 400.8 32 320 32c-68.2 0-125 26.3-169.3 60.8L38.8 5.1zM223.1 149.5C248.6 126.2 282.7 112 320 112c79.5 0 144 64.5 144 144c0 24.9-6.3 48.3-17.4 68.7L408 294.5c8.4-19.3 10.6-41.4 4.8-63.3c-11.1-41.5-47.8-69.4-88.6-71.1c-5.8-.2-9.2 6.1-7.4 11.7c2.1 6.4 3.3 13.2 3.3 20.3c0 10.2-2.4 19.8-6.6 28.3l-90.3-70.8zM373 389.9c-16.4 6.5-34.3 10.1-53 10.1c-79.5 0-144-64.5-144-144c0-6.9 .5-13.6 1.4-20.2L83.1 161.5C60.3 191.2 44 220.8 34.5 243.7c-3.3 7.9-3.3 16.7 0 24.6c14.9 35.7 46.2 87.7 93 131.1C174.5 443.2 239.2 480 320 480c47.8 0 89.9-12.9 126.2-32.5L373 389.9z"/>';
+            } else {
+                input.type = 'password';
+                svg.innerHTML = '<path d="M288 80c-65.2 0-118.8 29.6-159.9 67.7C89.6 183.5 63 226 49.4 256c13.6 30 40.2 72.5 78.6 108.3C169.2 402.4 222.8 432 288 432s118.8-29.6 159.9-67.7C486.4 328.5 513 286 526.6 256c-13.6-30-40.2-72.5-78.6-108.3C406.8 109.6 353.2 80 288 80zM95.4 112.6C142.5 68.8 207.2 32 288 32s145.5 36.8 192.6 80.6c46.8 43.5 78.1 95.4 93 131.1c3.3 7.9 3.3 16.7 0 24.6c-14.9 35.7-46.2 87.7-93 131.1C433.5 443.2 368.8 480 288 480s-145.5-36.8-192.6-80.6C48.6 355.9 17.3 303.9 2.4 268.3c-3.3-7.9-3.3-16.7 0-24.6C17.3 208.1 48.6 156.1 95.4 112.6zM288 336c26.5 0 48-21.5 48-48s-21.5-48-48-48c-26.5 0-48 21.5-48 48s21.5 48 48 48zm0-144c53 0 96 43 96 96s-43 96-96 96s-96-43-96-96s43-96 96-96z"/>';
+            }
+        }
+
+        const registerForm = document.getElementById('registerForm');
+        const backBtn = document.getElementById('backBtn');
+        const errorMsg = document.getElementById('errorMsg');
+        const successMsg = document.getElementById('successMsg');
+        const senhaInput = document.getElementById('senha');
+        const confirmarInput = document.getElementById('confirmarSenha');
+        const dataNascimentoInput = document.getElementById('dataNascimento');
+        const pwdBar = document.getElementById('pwdBar');
+        const pwnedMsg = document.getElementById('pwnedMsg');
+
+        let hibpTimer = null;
+        function calcStrength(pwd){
+            let score = 0;
+            if(pwd.length >= 6) score++;
+            if(pwd.length >= 10) score++;
+            if(/[a-z]/.test(pwd)) score++;
+            if(/[A-Z]/.test(pwd)) score++;
+            if(/\d/.test(pwd)) score++;
+            if(/[^A-Za-z0-9]/.test(pwd)) score++;
+            return score; // 0..6
+        }
+        function renderStrength(score){
+            const percent = (score/6)*100;
+            pwdBar.style.width = percent+"%";
+            pwdBar.style.background = score>=5 ? '#27ae60' : score>=3 ? '#f1c40f' : '#e74c3c';
+        }
+        async function checkPwned(pwd){
+            pwnedMsg.style.display = 'none';
+            if(pwd.length < 6) return;
+            // k-anonymity HIBP
+            const sha1 = new jsSHA('SHA-1', 'TEXT');
+            sha1.update(pwd);
+            const hash = sha1.getHash('HEX').toUpperCase();
+            const prefix = hash.substring(0,5);
+            const suffix = hash.substring(5);
+            try{
+                const resp = await fetch(`https://api.pwnedpasswords.com/range/${prefix}`);
+                const text = await resp.text();
+                const compromised = text.split('\n').some(line => line.split(':')[0].trim().toUpperCase() === suffix);
+                if(compromised){
+                    pwnedMsg.style.display = 'block';
+                }
+            }catch{ /* ignore network errors */ }
+        }
+        function formatDateMask(value) {
+            const digits = value.replace(/\D/g, '').slice(0, 8);
+            const parts = [];
+            if (digits.length >= 2) {
+                parts.push(digits.slice(0, 2));
+            } else if (digits.length > 0) {
+                parts.push(digits);
+            }
+            if (digits.length >= 4) {
+                parts.push(digits.slice(2, 4));
+            } else if (digits.length > 2) {
+                parts.push(digits.slice(2));
+            }
+            if (digits.length > 4) {
+                parts.push(digits.slice(4));
+            }
+            return parts.join('/');
+        }
+
+        function shouldBlockDateKey(event) {
+            const allowedKeys = ['Backspace', 'Delete', 'ArrowLeft', 'ArrowRight', 'Tab', 'Home', 'End'];
+            if (allowedKeys.includes(event.key)) return false;
+            if (!/\d/.test(event.key)) return true; // bloqueia não dígitos
+
+            const input = event.target;
+            const selectionLength = input.selectionEnd - input.selectionStart;
+            const digits = input.value.replace(/\D/g, '');
+            // Se já há 8 dígitos e não haverá substituição por seleção, bloqueia
+            return selectionLength === 0 && digits.length >= 8;
+        }
+
+        function parseBRDate(str) {
+            const match = /^(\d{2})\/(\d{2})\/(\d{4})$/.exec(str);
+            if (!match) return null;
+            const [, dd, mm, yyyy] = match;
+            const date = new Date(Number(yyyy), Number(mm) - 1, Number(dd));
+            const isValid = date.getFullYear() === Number(yyyy) && date.getMonth() === Number(mm) - 1 && date.getDate() === Number(dd);
+            return isValid ? date : null;
+        }
+
+        function toISODate(date) {
+            const year = date.getFullYear();
+            const month = String(date.getMonth() + 1).padStart(2, '0');
+            const day = String(date.getDate()).padStart(2, '0');
+            return `${year}-${month}-${day}`;
+        }
+
+        dataNascimentoInput.addEventListener('input', (e) => {
+            e.target.value = formatDateMask(e.target.value);
+        });
+
+        dataNascimentoInput.addEventListener('blur', (e) => {
+            e.target.value = formatDateMask(e.target.value);
+        });
+
+        dataNascimentoInput.addEventListener('keydown', (e) => {
+            if (shouldBlockDateKey(e)) {
+                e.preventDefault();
+            }
+        });
+
+        senhaInput.addEventListener('input', () => {
+            const pwd = senhaInput.value;
+            renderStrength(calcStrength(pwd));
+            clearTimeout(hibpTimer);
+            hibpTimer = setTimeout(()=>checkPwned(pwd), 600);
+        });
+        confirmarInput.addEventListener('input', () => {
+            if(confirmarInput.value !== senhaInput.value){
+                confirmarInput.setCustomValidity('As senhas não conferem');
+            }else{
+                confirmarInput.setCustomValidity('');
+            }
+        });
+
+        registerForm.addEventListener('submit', async (e) => {
+            e.preventDefault();
+            errorMsg.style.display = 'none';
+            successMsg.style.display = 'none';
+
+            const nome = document.getElementById('nome').value;
+            const email = document.getElementById('email').value;
+            const telefone = parseInt(document.getElementById('telefone').value);
+            const dataNascimento = dataNascimentoInput.value.trim();
+            const senha = document.getElementById('senha').value;
+            const confirmarSenha = document.getElementById('confirmarSenha').value;
+            const correntista = document.getElementById('correntista').checked;
+
+            const dataNasc = parseBRDate(dataNascimento);
+            if (!dataNasc) {
+                errorMsg.textContent = 'Informe a data no formato dd/mm/aaaa';
+                errorMsg.style.display = 'block';
+                return;
+            }
+            const hoje = new Date();
+            let idade = hoje.getFullYear() - dataNasc.getFullYear();
+            const mesAtual = hoje.getMonth();
+            const mesNasc = dataNasc.getMonth();
+            if (mesAtual < mesNasc || (mesAtual === mesNasc && hoje.getDate() < dataNasc.getDate())) {
+                idade--;
+            }
+
+            if (idade < 18) {
+                errorMsg.textContent = 'Você precisa ter pelo menos 18 anos';
+                errorMsg.style.display = 'block';
+                return;
+            }
+
+            if (senha !== confirmarSenha) {
+                errorMsg.textContent = 'As senhas não conferem';
+                errorMsg.style.display = 'block';
+                return;
+            }
+
+            if (senha.length < 6) {
+                errorMsg.textContent = 'A senha deve ter no mínimo 6 caracteres';
+                errorMsg.style.display = 'block';
+                return;
+            }
+
+            if (senha.length > 20) {
+                errorMsg.textContent = 'A senha deve ter no máximo 20 caracteres';
+                errorMsg.style.display = 'block';
+                return;
+            }
+
+            try {
+                const response = await fetch('/register', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        nome,
+                        email,
+                        telefone,
+                        data_nascimento: toISODate(dataNasc),
+                        senha,
+                        correntista
+                    })
+                });
+
+                if (response.ok) {
+                    const cliente = await response.json();
+                    successMsg.textContent = 'Conta criada com sucesso! Redirecionando para login...';
+                    successMsg.style.display = 'block';
+                    setTimeout(() => {
+                        window.location.href = '/login';
+                    }, 2000);
+                } else if (response.status === 400) {
+                    const error = await response.json();
+                    errorMsg.textContent = error.detail || 'Erro ao criar conta';
+                    errorMsg.style.display = 'block';
+                } else {
+                    const error = await response.json();
+                    errorMsg.textContent = error.detail || 'Erro ao criar conta';
+                    errorMsg.style.display = 'block';
+                }
+            } catch (error) {
+                errorMsg.textContent = 'Erro de conexão com o servidor';
+                errorMsg.style.display = 'block';
+            }
+        });
+
+        backBtn.addEventListener('click', () => {
+            window.location.href = '/login';
+        });
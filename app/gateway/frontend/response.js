@@ -0,0 +1,133 @@
+        // Recupera os dados armazenados
+        let currentData = null;
+        let isUserResponse = false;
+
+        function init() {
+            const params = new URLSearchParams(window.location.search);
+            const type = params.get('type') || 'login';
+            
+            // Recupera dados do localStorage
+            const storedData = localStorage.getItem(type + '_response');
+            
+            if (storedData) {
+                try {
+                    currentData = JSON.parse(storedData);
+                    isUserResponse = type === 'login' || type === 'register';
+                    
+                    document.getElementById('title').textContent = 
+                        type === 'login' ? '✅ Login Realizado com Sucesso!' : 
+                        type === 'register' ? '✅ Cadastro Realizado com Sucesso!' :
+                        '📋 Lista de Clientes';
+                    
+                    document.getElementById('status').textContent = 'Sucesso';
+                    document.getElementById('status').className = 'status success';
+                    document.getElementById('successMessage').textContent = 
+                        type === 'login' ? 'Você foi autenticado com sucesso!' :
+                        type === 'register' ? 'Sua conta foi criada com sucesso!' :
+                        'Dados carregados com sucesso!';
+                    document.getElementById('successMessage').style.display = 'block';
+                    
+                    displayResponse(type);
+                } catch (e) {
+                    showError('Erro ao carregar dados: ' + e.message);
+                }
+            } else {
+                showError('Nenhum dado disponível. Por favor, faça login ou registre-se.');
+            }
+        }
+
+        function displayResponse(type) {
+            const loading = document.getElementById('loading');
+            const content = document.getElementById('content');
+            
+            loading.style.display = 'none';
+            content.style.display = 'block';
+            
+            // Exibe resposta JSON
+            document.getElementById('responseJson').textContent = 
+                JSON.stringify(currentData, null, 2);
+            
+            // Se for resposta de usuário, exibe os dados formatados
+            if (isUserResponse && currentData.id) {
+                displayUserInfo(currentData);
+            }
+        }
+
+        function displayUserInfo(user) {
+            const userSection = document.getElementById('userSection');
+            const userInfo = document.getElementById('userInfo');
+            
+            userSection.style.display = 'block';
+            
+            const fields = [
+                { label: 'ID', value: user.id },
+                { label: 'Nome', value: user.nome },
+                { label: 'Email', value: user.email },
+                { label: 'Telefone', value: user.telefone },
+                { label: 'Idade', value: user.idade || 'N/A' },
+                { label: 'Correntista', value: user.correntista ? 'Sim' : 'Não' },
+                { label: 'Score', value: user.score_credito || 'N/A' },
+                { label: 'Saldo CC', value: user.saldo_cc ? `R$ ${parseFloat(user.saldo_cc).toFixed(2)}` : 'N/A' }
+            ];
+            
+            userInfo.innerHTML = fields.map(f => `
+                <div class="info-item">
+                    <div class="info-label">${f.label}</div>
+                    <div class="info-value">${f.value}</div>
+                </div>
+            `).join('');
+        }
+
+        function listClients() {
+            // Faz requisição para listar clientes
+            fetch('/clients')
+                .then(r => r.json())
+                .then(data => {
+                    currentData = data;
+                    displayClientsList(data);
+                    document.getElementById('responseJson').textContent = 
+                        JSON.stringify(data, null, 2);
+                    document.getElementById('title').textContent = '📋 Lista de Clientes';
+                    document.getElementById('userSection').style.display = 'none';
+                    document.getElementById('clientsSection').style.display = 'block';
+                })
+                .catch(err => showError('Erro ao carregar clientes: ' + err.message));
+        }
+
+        function displayClientsList(clients) {
+            const clientsList = document.getElementById('clientsList');
+            
+            if (!Array.isArray(clients) || clients.length === 0) {
+                clientsList.innerHTML = '<p style="color: #666; text-align: center;">Nenhum cliente encontrado.</p>';
+                return;
+            }
+            
+            clientsList.innerHTML = clients.map(client => `
+                <div class="client-item">
+                    <div class="client-name">👤 ${client.nome}</div>
+                    <div class="client-detail"><strong>ID:</strong> ${client.id}</div>
+                    <div class="client-detail"><strong>Email:</strong> ${client.email || 'N/A'}</div>
+                    <div class="client-detail"><strong>Telefone:</strong> ${client.telefone || 'N/A'}</div>
+                    <div class="client-detail"><strong>Idade:</strong> ${client.idade || 'N/A'}</div>
+                    <div class="client-detail"><strong>Saldo:</strong> R$ ${parseFloat(client.saldo_cc || 0).toFixed(2)}</div>
+                </div>
+            `).join('');
+        }
+
+        function logout() {
+            localStorage.clear();
+            window.location.href = '/login';
+        }
+
+        function showError(message) {
+            document.getElementById('loading').style.display = 'none';
+            document.getElementById('content').style.display = 'block';
+            document.getElementById('errorMessage').textContent = message;
+            document.getElementById('errorMessage').style.display = 'block';
+            document.getElementById('status').textContent = 'Erro';
+            document.getElementById('status').className = 'status error';
+            document.getElementById('title').textContent = '❌ Erro ao Carregar Dados';
+        }
+
+        // Inicializa ao carregar a página
+        window.addEventListener('load', init);
@@ -1,14 +1,17 @@
-﻿from fastapi import FastAPI, Depends, HTTPException
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+﻿from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
 import httpx
 import os
 from pathlib import Path
+from time import time
+from typing import Optional
 from .models import (
     ClientCreate, ClientUpdate, ClientOut, ScoreOut, ClientRegister, ClientLogin, ClientPasswordReset,
-    InvestimentoCreate, InvestimentoUpdate, InvestimentoOut, ProjecaoRetorno, PatrimonioCliente, AnaliseMercado
+    InvestimentoCreate, InvestimentoUpdate, InvestimentoOut, InvestimentoBatchCreate, ProjecaoRetorno, PatrimonioCliente, AnaliseMercado
 )
 from . import client as client_module
+from . import client_cache, compression, events, sessions, static_pages
 
 # Importar YahooFinanceService apenas quando necessário (importação tardia)
 
@@ -17,87 +20,161 @@ def get_dynamic_http_client():
     return client_module.get_http_client()
 
 
-app = FastAPI(title="JAVER Gateway Service", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Eventos de mudança do storage invalidam o cache de clientes (ver gateway/events.py)
+    events.start()
+    yield
+    events.stop()
+
+
+# Respostas serializadas com orjson (mais rápido que o json da stdlib, trata date/datetime nativamente)
+app = FastAPI(title="JAVER Gateway Service", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
+# gzip/brotli acima de COMPRESSION_MIN_SIZE para HTML/CSS/JS/JSON (ver gateway/compression.py)
+app.add_middleware(compression.CompressionMiddleware)
 # Cache simples para cotações de mercado (TTL 60s)
 MARKET_CACHE: dict[str, dict] = {}
 CACHE_TTL_SECONDS = 60
 
-frontend_dir = Path(__file__).parent / "frontend"
-if frontend_dir.exists():
-    app.mount("/static", StaticFiles(directory=str(frontend_dir)), name="static")
+# Rotas que só repassam o JSON do storage devolvem os bytes recebidos, sem
+# decodificar, validar contra o response_model e recodificar (0 desliga)
+GATEWAY_PASSTHROUGH = os.getenv("GATEWAY_PASSTHROUGH", "1").lower() not in ("0", "false", "no")
+# Cabeçalhos do storage mantidos no repasse. Content-Encoding/Length não: o httpx já descomprimiu o corpo
+_PASSTHROUGH_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+_SEM_CACHE = {
+    "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
+    "Pragma": "no-cache",
+    "Expires": "0"
+}
+# Leituras por cliente têm ETag: o navegador guarda e revalida a cada uso (304 se nada mudou)
+_REVALIDAR = {"Cache-Control": "no-cache"}
+
+
+def _condicional(request: Request) -> dict:
+    """If-None-Match do navegador para repassar ao storage ({} se não houver)."""
+    valor = request.headers.get("if-none-match")
+    return {"If-None-Match": valor} if valor else {}
+
+
+def _etag_recurso(etag: Optional[str], recurso: str) -> Optional[str]:
+    """ETag de um recurso calculado aqui a partir do cliente: o do cliente com sufixo (`W/"c1v7-projecao"`)."""
+    return f'{etag[:-1]}-{recurso}"' if etag and etag.endswith('"') else None
+
+
+def _casa(request: Request, etag: Optional[str]) -> bool:
+    """True se o If-None-Match do navegador casa com `etag` (mesma regra das páginas estáticas)."""
+    return bool(etag) and static_pages.if_none_match(request.headers.get("if-none-match"), (etag,))
+
 
+def _nao_modificado(etag: Optional[str]) -> Response:
+    return Response(status_code=304, headers={**_REVALIDAR, **({"ETag": etag} if etag else {})})
 
-@app.get("/")
-def index():
-    frontend_file = Path(__file__).parent / "frontend" / "index.html"
-    if frontend_file.exists():
-        return FileResponse(str(frontend_file), media_type="text/html")
-    return {"message": "Frontend não disponível"}
 
+def _cliente(client: httpx.Client, cliente_id: int) -> client_cache.CachedClient:
+    """Cliente via cache do gateway (ver gateway/client_cache.py); 404 se não existe."""
+    entrada = client_cache.get(client, cliente_id)
+    if entrada is None:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    return entrada
 
-@app.get("/login.html")
-def login_page_html():
-    frontend_file = Path(__file__).parent / "frontend" / "login.html"
-    if frontend_file.exists():
-        return FileResponse(str(frontend_file), media_type="text/html")
-    return {"message": "Login não disponível"}
 
+def _repassar(r: httpx.Response, headers: Optional[dict] = None):
+    """Resposta do gateway para uma rota que só repassa o JSON do storage.
 
-@app.get("/login")
-def login_page():
-    frontend_file = Path(__file__).parent / "frontend" / "login.html"
-    if frontend_file.exists():
-        return FileResponse(str(frontend_file), media_type="text/html")
-    return {"message": "Login não disponível"}
+    Com GATEWAY_PASSTHROUGH, os bytes do storage vão direto ao cliente com o
+    mesmo status e os cabeçalhos de _PASSTHROUGH_HEADERS (`headers` tem
+    precedência); por isso essas rotas pedem JSON ao storage
+    (`client_module.ACCEPT_JSON`) mesmo com STORAGE_WIRE_FORMAT=msgpack. Sem
+    passthrough o JSON é decodificado e o FastAPI valida contra o
+    response_model.
+    """
+    if not GATEWAY_PASSTHROUGH:
+        dados = client_module.parse_json(r)
+        return ORJSONResponse(content=dados, headers=headers) if headers else dados
+    repassados = {k.lower(): v for k, v in r.headers.items() if k.lower() in _PASSTHROUGH_HEADERS}
+    repassados.update({k.lower(): v for k, v in (headers or {}).items()})
+    return Response(
+        content=r.content,
+        status_code=r.status_code,
+        headers=repassados,
+        media_type=repassados.pop("content-type", "application/json"),
+    )
 
 
-@app.get("/register.html")
-def register_page_html():
-    frontend_file = Path(__file__).parent / "frontend" / "register.html"
-    if frontend_file.exists():
-        return FileResponse(str(frontend_file), media_type="text/html")
-    return {"message": "Registro não disponível"}
+def _recusar_se_sobrecarregado(r: httpx.Response):
+    """Storage recusou por fila de bcrypt cheia (503): repassa o 503 e o Retry-After em vez de virar 500."""
+    if r.status_code != 503:
+        return
+    try:
+        detalhe = client_module.parse_json(r).get("detail")
+    except Exception:
+        detalhe = None
+    retry_after = r.headers.get("retry-after")
+    raise HTTPException(
+        status_code=503,
+        detail=detalhe or "Serviço de autenticação sobrecarregado, tente novamente",
+        headers={"Retry-After": retry_after} if retry_after else None,
+    )
+
 
+def require_session(request: Request) -> sessions.Session:
+    """Sessão do token (Authorization: Bearer ou cookie); 401 se ausente, inválido ou expirado.
 
-@app.get("/register")
-def register_page():
-    frontend_file = Path(__file__).parent / "frontend" / "register.html"
-    if frontend_file.exists():
-        return FileResponse(str(frontend_file), media_type="text/html")
-    return {"message": "Registro não disponível"}
+    Verificada só nas rotas que dependem dela: HMAC + consulta ao store de
+    sessões (SQLite/Redis), sem storage nem bcrypt. Como dependência síncrona,
+    roda no threadpool, fora do event loop.
+    """
+    token = sessions.token_from_headers(
+        request.headers.get("authorization"),
+        request.cookies.get(sessions.SESSION_COOKIE),
+    )
+    sessao = sessions.verify(token)
+    if sessao is None:
+        raise HTTPException(status_code=401, detail="Sessão inválida ou expirada")
+    return sessao
 
 
-@app.get("/response")
-def response_page():
-    frontend_file = Path(__file__).parent / "frontend" / "response.html"
-    if frontend_file.exists():
-        return FileResponse(str(frontend_file), media_type="text/html")
-    return {"message": "Página de resposta não disponível"}
+# Frontend lido uma vez, na importação: páginas e /static saem da memória com ETag (ver gateway/static_pages.py)
+FRONTEND = static_pages.FrontendFiles(Path(__file__).parent / "frontend")
 
+# (rota, nome da rota, arquivo, mensagem quando o arquivo não existe)
+PAGINAS = [
+    ("/", "index", "index.html", "Frontend não disponível"),
+    ("/login.html", "login_page_html", "login.html", "Login não disponível"),
+    ("/login", "login_page", "login.html", "Login não disponível"),
+    ("/register.html", "register_page_html", "register.html", "Registro não disponível"),
+    ("/register", "register_page", "register.html", "Registro não disponível"),
+    ("/response", "response_page", "response.html", "Página de resposta não disponível"),
+    ("/dashboard", "dashboard_page", "dashboard.html", "Dashboard não disponível"),
+    # ROTA EXATA PARA PÁGINA DE INVESTIMENTOS - DEVE VIR ANTES DAS ROTAS /investments/*
+    ("/investments-page", "investments_page", "investments.html", "Página de investimentos não disponível"),
+    ("/investments.html", "investments_page_html", "investments.html", "Página de investimentos não disponível"),
+]
 
-@app.get("/dashboard")
-def dashboard_page():
-    frontend_file = Path(__file__).parent / "frontend" / "dashboard.html"
-    if frontend_file.exists():
-        return FileResponse(str(frontend_file), media_type="text/html")
-    return {"message": "Dashboard não disponível"}
 
+def _pagina(arquivo: str, mensagem: str):
+    def pagina(request: Request):
+        return FRONTEND.response(request, arquivo) or {"message": mensagem}
+    return pagina
 
-# ROTA EXATA PARA PÁGINA DE INVESTIMENTOS - DEVE VIR ANTES DAS ROTAS /investments/*
-@app.get("/investments-page")
-def investments_page():
-    frontend_file = Path(__file__).parent / "frontend" / "investments.html"
-    if frontend_file.exists():
-        return FileResponse(str(frontend_file), media_type="text/html")
-    return {"message": "Página de investimentos não disponível"}
 
+for _rota, _nome, _arquivo, _mensagem in PAGINAS:
+    app.add_api_route(_rota, _pagina(_arquivo, _mensagem), methods=["GET"], name=_nome, operation_id=_nome)
 
-@app.get("/investments.html")
-def investments_page_html():
-    frontend_file = Path(__file__).parent / "frontend" / "investments.html"
-    if frontend_file.exists():
-        return FileResponse(str(frontend_file), media_type="text/html")
-    return {"message": "Página de investimentos não disponível"}
+
+@app.get("/static/{nome:path}")
+def static_file(nome: str, request: Request):
+    """Assets do frontend; pelo nome com hash (`FRONTEND.asset_url`) são imutáveis."""
+    resposta = FRONTEND.static_response(request, nome)
+    if resposta is None:
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+    return resposta
+
+
+@app.get("/metrics/client-cache")
+def client_cache_metrics():
+    """Acertos, revalidações e faltas do cache de clientes do gateway."""
+    return client_cache.stats()
 
 
 @app.get("/health")
@@ -108,19 +185,23 @@ def health():
 @app.get("/clients", response_model=list[ClientOut])
 def list_clients(client: httpx.Client = Depends(get_dynamic_http_client)):
     client = client or client_module.get_http_client()
-    r = client.get("/clients")
+    r = client.get("/clients", headers=client_module.ACCEPT_JSON)
     r.raise_for_status()
-    return r.json()
+    return _repassar(r)
 
 
 @app.get("/clients/{client_id}", response_model=ClientOut)
-def get_client(client_id: int, client: httpx.Client = Depends(get_dynamic_http_client)):
+def get_client(client_id: int, request: Request, response: Response, client: httpx.Client = Depends(get_dynamic_http_client)):
     client = client or client_module.get_http_client()
-    r = client.get(f"/clients/{client_id}")
-    if r.status_code == 404:
-        raise HTTPException(status_code=404, detail="Cliente não encontrado")
-    r.raise_for_status()
-    return r.json()
+    entrada = _cliente(client, client_id)
+    if _casa(request, entrada.etag):
+        return _nao_modificado(entrada.etag)
+    # Com ETag, o navegador guarda a resposta mas revalida antes de reutilizá-la
+    headers = {**_REVALIDAR, **({"ETag": entrada.etag} if entrada.etag else {})}
+    if not GATEWAY_PASSTHROUGH:
+        response.headers.update(headers)
+        return entrada.dados
+    return Response(content=entrada.corpo, media_type="application/json", headers=headers)
 
 
 @app.post("/clients", response_model=ClientOut, status_code=201)
@@ -128,63 +209,93 @@ def create_client(payload: ClientCreate, client: httpx.Client = Depends(get_dyna
     client = client or client_module.get_http_client()
     r = client.post("/clients", json=payload.model_dump())
     r.raise_for_status()
-    return r.json()
+    return client_module.parse_json(r)
 
 
 @app.post("/register", response_model=ClientOut, status_code=201)
 def api_register(payload: ClientRegister, client: httpx.Client = Depends(get_dynamic_http_client)):
     client = client or client_module.get_http_client()
     try:
-        # Converter data para string ISO para envio ao storage
-        data = payload.model_dump()
-        if data.get("data_nascimento"):
-            data["data_nascimento"] = data["data_nascimento"].isoformat()
-        r = client.post("/register", json=data)
+        # mode="json": datas já saem como string ISO para o storage
+        r = client.post("/register", json=payload.model_dump(mode="json"))
+        _recusar_se_sobrecarregado(r)
         if r.status_code == 400:
-            error = r.json()
+            error = client_module.parse_json(r)
             raise HTTPException(status_code=400, detail=error.get("detail", "Erro ao criar conta"))
         r.raise_for_status()
-        return r.json()
+        return client_module.parse_json(r)
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 400:
-            error = e.response.json()
+            error = client_module.parse_json(e.response)
             raise HTTPException(status_code=400, detail=error.get("detail", "Erro ao criar conta"))
+        _recusar_se_sobrecarregado(e.response)
         raise
 
 
 @app.post("/login", response_model=ClientOut)
-def api_login(payload: ClientLogin, client: httpx.Client = Depends(get_dynamic_http_client)):
+def api_login(payload: ClientLogin, response: Response, client: httpx.Client = Depends(get_dynamic_http_client)):
     client = client or client_module.get_http_client()
     try:
         r = client.post("/login", json=payload.model_dump())
+        _recusar_se_sobrecarregado(r)
         if r.status_code == 401:
             raise HTTPException(status_code=401, detail="Email ou senha inválidos")
         r.raise_for_status()
-        return r.json()
+        cliente = client_module.parse_json(r)
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 401:
             raise HTTPException(status_code=401, detail="Email ou senha inválidos")
+        _recusar_se_sobrecarregado(e.response)
         raise
 
+    # Sessão assinada: as próximas requisições não precisam de novo bcrypt no storage
+    token, sessao = sessions.issue(cliente["id"])
+    response.headers["X-Session-Token"] = token
+    response.set_cookie(
+        sessions.SESSION_COOKIE,
+        token,
+        max_age=sessao.expira_em - int(time()),
+        httponly=True,
+        samesite="lax",
+        secure=sessions.SESSION_COOKIE_SECURE,
+    )
+    return cliente
+
+
+@app.get("/session")
+def get_session(sessao: sessions.Session = Depends(require_session)):
+    """Retorna a sessão atual (cliente autenticado) sem consultar o storage."""
+    return {"cliente_id": sessao.cliente_id, "expira_em": sessao.expira_em}
+
+
+@app.post("/logout", status_code=204)
+def api_logout(request: Request, response: Response):
+    """Revoga a sessão atual e remove o cookie."""
+    token = sessions.token_from_headers(
+        request.headers.get("authorization"),
+        request.cookies.get(sessions.SESSION_COOKIE),
+    )
+    sessions.revoke(token)
+    response.delete_cookie(sessions.SESSION_COOKIE)
+    return
+
 
 @app.put("/clients/{client_id}", response_model=ClientOut)
 def update_client(client_id: int, payload: ClientUpdate, client: httpx.Client = Depends(get_dynamic_http_client)):
     client = client or client_module.get_http_client()
-    # Converter data para string ISO se fornecida
-    data = payload.model_dump(exclude_unset=True)
-    if data.get("data_nascimento"):
-        data["data_nascimento"] = data["data_nascimento"].isoformat()
-    r = client.put(f"/clients/{client_id}", json=data)
+    r = client.put(f"/clients/{client_id}", json=payload.model_dump(mode="json", exclude_unset=True))
+    client_cache.invalidate(client_id)
     if r.status_code == 404:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     r.raise_for_status()
-    return r.json()
+    return client_module.parse_json(r)
 
 
 @app.delete("/clients/{client_id}", status_code=204)
 def delete_client(client_id: int, client: httpx.Client = Depends(get_dynamic_http_client)):
     client = client or client_module.get_http_client()
     r = client.delete(f"/clients/{client_id}")
+    client_cache.invalidate(client_id)
     if r.status_code == 404:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     r.raise_for_status()
@@ -197,24 +308,22 @@ def update_password(payload: ClientPasswordReset, client: httpx.Client = Depends
     client = client or client_module.get_http_client()
     try:
         r = client.put("/password", json=payload.model_dump())
+        _recusar_se_sobrecarregado(r)
         if r.status_code == 404:
             raise HTTPException(status_code=404, detail="Cliente não encontrado")
         r.raise_for_status()
-        return r.json()
+        return client_module.parse_json(r)
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
             raise HTTPException(status_code=404, detail="Cliente não encontrado")
+        _recusar_se_sobrecarregado(e.response)
         raise
 
 
 @app.get("/clients/{client_id}/score", response_model=ScoreOut)
 def score_credito(client_id: int, client: httpx.Client = Depends(get_dynamic_http_client)):
     client = client or client_module.get_http_client()
-    r = client.get(f"/clients/{client_id}")
-    if r.status_code == 404:
-        raise HTTPException(status_code=404, detail="Cliente não encontrado")
-    r.raise_for_status()
-    data = r.json()
+    data = _cliente(client, client_id).dados
     saldo = data.get("saldo_cc")
     score_calculado = (saldo * 0.1) if saldo is not None else None
     return {
@@ -230,46 +339,32 @@ def score_credito(client_id: int, client: httpx.Client = Depends(get_dynamic_htt
 @app.get("/investments", response_model=list[InvestimentoOut])
 def list_investments(client: httpx.Client = Depends(get_dynamic_http_client)):
     """Lista todos os investimentos."""
-    from fastapi.responses import JSONResponse
     client = client or client_module.get_http_client()
-    r = client.get("/investments")
+    r = client.get("/investments", headers=client_module.ACCEPT_JSON)
     r.raise_for_status()
-    return JSONResponse(
-        content=r.json(),
-        headers={
-            "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
-            "Pragma": "no-cache",
-            "Expires": "0"
-        }
-    )
+    return _repassar(r, headers=_SEM_CACHE)
 
 
 @app.get("/investments/{investment_id}", response_model=InvestimentoOut)
 def get_investment(investment_id: int, client: httpx.Client = Depends(get_dynamic_http_client)):
     """Obtém um investimento específico."""
     client = client or client_module.get_http_client()
-    r = client.get(f"/investments/{investment_id}")
+    r = client.get(f"/investments/{investment_id}", headers=client_module.ACCEPT_JSON)
     if r.status_code == 404:
         raise HTTPException(status_code=404, detail="Investimento não encontrado")
     r.raise_for_status()
-    return r.json()
+    return _repassar(r)
 
 
 @app.get("/investments/cliente/{cliente_id}", response_model=list[InvestimentoOut])
-def list_investments_by_cliente(cliente_id: int, client: httpx.Client = Depends(get_dynamic_http_client)):
-    """Lista investimentos de um cliente."""
-    from fastapi.responses import JSONResponse
+def list_investments_by_cliente(cliente_id: int, request: Request, client: httpx.Client = Depends(get_dynamic_http_client)):
+    """Lista investimentos de um cliente (304 se a versão do cliente não mudou)."""
     client = client or client_module.get_http_client()
-    r = client.get(f"/investments/cliente/{cliente_id}")
+    r = client.get(f"/investments/cliente/{cliente_id}", headers={**client_module.ACCEPT_JSON, **_condicional(request)})
+    if r.status_code == 304:
+        return _nao_modificado(r.headers.get("etag"))
     r.raise_for_status()
-    return JSONResponse(
-        content=r.json(),
-        headers={
-            "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
-            "Pragma": "no-cache",
-            "Expires": "0"
-        }
-    )
+    return _repassar(r, headers=_REVALIDAR)
 
 
 @app.post("/investments", response_model=InvestimentoOut, status_code=201)
@@ -284,10 +379,36 @@ def create_investment(payload: InvestimentoCreate, client: httpx.Client = Depend
         raise HTTPException(status_code=400, detail=f"Ticker '{payload.ticker}' não encontrado")
     
     r = client.post("/investments", json=payload.model_dump())
+    client_cache.invalidate(payload.cliente_id)
+    if r.status_code == 404:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    r.raise_for_status()
+    return client_module.parse_json(r)
+
+
+@app.post("/investments/batch", response_model=list[InvestimentoOut], status_code=201)
+def create_investments_batch(payload: InvestimentoBatchCreate, client: httpx.Client = Depends(get_dynamic_http_client)):
+    """Cria vários investimentos de um cliente em uma única operação."""
+    from .yahoo_finance_service import YahooFinanceService
+    
+    client = client or client_module.get_http_client()
+    
+    # Validar todos os tickers de uma vez
+    tickers = [item.ticker for item in payload.investimentos if item.ticker]
+    if tickers:
+        validos = YahooFinanceService.validar_tickers(tickers)
+        invalidos = [t for t, ok in validos.items() if not ok]
+        if invalidos:
+            raise HTTPException(status_code=400, detail=f"Tickers não encontrados: {', '.join(invalidos)}")
+    
+    r = client.post("/investments/batch", json=payload.model_dump())
+    client_cache.invalidate(payload.cliente_id)
     if r.status_code == 404:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    if r.status_code == 400:
+        raise HTTPException(status_code=400, detail=client_module.parse_json(r).get("detail", "Erro ao criar investimentos"))
     r.raise_for_status()
-    return r.json()
+    return client_module.parse_json(r)
 
 
 @app.put("/investments/{investment_id}", response_model=InvestimentoOut)
@@ -305,7 +426,9 @@ def update_investment(investment_id: int, payload: InvestimentoUpdate, client: h
     if r.status_code == 404:
         raise HTTPException(status_code=404, detail="Investimento não encontrado")
     r.raise_for_status()
-    return r.json()
+    investimento = client_module.parse_json(r)
+    client_cache.invalidate(investimento.get("cliente_id"))
+    return investimento
 
 
 @app.delete("/investments/{investment_id}", status_code=204)
@@ -316,13 +439,31 @@ def delete_investment(investment_id: int, client: httpx.Client = Depends(get_dyn
     if r.status_code == 404:
         raise HTTPException(status_code=404, detail="Investimento não encontrado")
     r.raise_for_status()
+    # O storage informa o dono do investimento removido; sem o cabeçalho (storage antigo), invalida todos
+    cliente_id = r.headers.get("x-cliente-id")
+    client_cache.invalidate(int(cliente_id) if cliente_id and cliente_id.isdigit() else None)
     return
 
 
 # ============ ENDPOINTS DE CÁLCULOS E ANÁLISES ============
 
+def _total_investido(client, cliente_id: int, cliente_data: dict) -> float:
+    """Total dos investimentos ativos do cliente.
+
+    O storage já devolve `total_investido_ativo` junto com o cliente; a
+    chamada a `/investments/cliente/{id}/total` fica só para storages antigos.
+    """
+    total = cliente_data.get("total_investido_ativo")
+    if total is not None:
+        return total
+    r_total = client.get(f"/investments/cliente/{cliente_id}/total")
+    if r_total.status_code == 404:
+        return 0.0
+    return client_module.parse_json(r_total).get("total_investido", 0.0)
+
+
 @app.get("/calculos/projecao/{cliente_id}", response_model=ProjecaoRetorno)
-def projecao_retorno(cliente_id: int, client: httpx.Client = Depends(get_dynamic_http_client)):
+def projecao_retorno(cliente_id: int, request: Request, client: httpx.Client = Depends(get_dynamic_http_client)):
     """
     Calcula projeção de retorno anual baseada no perfil do investidor.
     
@@ -330,23 +471,19 @@ def projecao_retorno(cliente_id: int, client: httpx.Client = Depends(get_dynamic
     MODERADO → (total_investido) * 0.12 (12%)
     ARROJADO → (total_investido) * 0.18 (18%)
     
-    Onde total_investido é o valor efetivamente aplicado em investimentos ativos
+    Onde total_investido é o valor efetivamente aplicado em investimentos ativos.
+    Com If-None-Match atual, 304 sem recalcular (ETag derivado da versão do cliente).
     """
     client = client or client_module.get_http_client()
     
     # Obter dados do cliente
-    r = client.get(f"/clients/{cliente_id}")
-    if r.status_code == 404:
-        raise HTTPException(status_code=404, detail="Cliente não encontrado")
-    r.raise_for_status()
-    cliente_data = r.json()
+    entrada = _cliente(client, cliente_id)
+    etag = _etag_recurso(entrada.etag, "projecao")
+    if _casa(request, etag):
+        return _nao_modificado(etag)
+    cliente_data = entrada.dados
     
-    # Obter total investido
-    r_total = client.get(f"/investments/cliente/{cliente_id}/total")
-    if r_total.status_code == 404:
-        total_investido = 0.0
-    else:
-        total_investido = r_total.json().get("total_investido", 0.0)
+    total_investido = _total_investido(client, cliente_id, cliente_data)
     
     # Usar total investido como base da projeção
     patrimonio_total = total_investido
@@ -362,8 +499,7 @@ def projecao_retorno(cliente_id: int, client: httpx.Client = Depends(get_dynamic
     taxa_retorno = taxas.get(perfil, 0.08)
     projecao_anual = patrimonio_total * taxa_retorno
     
-    from fastapi.responses import JSONResponse
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "cliente_id": cliente_id,
             "nome": cliente_data.get("nome"),
@@ -372,41 +508,30 @@ def projecao_retorno(cliente_id: int, client: httpx.Client = Depends(get_dynamic
             "projecao_anual": round(projecao_anual, 2),
             "taxa_retorno": taxa_retorno * 100
         },
-        headers={
-            "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
-            "Pragma": "no-cache",
-            "Expires": "0"
-        }
+        headers={**_REVALIDAR, **({"ETag": etag} if etag else {})}
     )
 
 
 @app.get("/calculos/patrimonio/{cliente_id}", response_model=PatrimonioCliente)
-def calcular_patrimonio(cliente_id: int, client: httpx.Client = Depends(get_dynamic_http_client)):
-    """Calcula o patrimônio total de um cliente."""
-    from fastapi import Response
+def calcular_patrimonio(cliente_id: int, request: Request, client: httpx.Client = Depends(get_dynamic_http_client)):
+    """Calcula o patrimônio total de um cliente (304 se a versão do cliente não mudou)."""
     client = client or client_module.get_http_client()
     
     # Obter dados do cliente
-    r = client.get(f"/clients/{cliente_id}")
-    if r.status_code == 404:
-        raise HTTPException(status_code=404, detail="Cliente não encontrado")
-    r.raise_for_status()
-    cliente_data = r.json()
+    entrada = _cliente(client, cliente_id)
+    etag = _etag_recurso(entrada.etag, "patrimonio")
+    if _casa(request, etag):
+        return _nao_modificado(etag)
+    cliente_data = entrada.dados
     
-    # Obter total investido
-    r_total = client.get(f"/investments/cliente/{cliente_id}/total")
-    if r_total.status_code == 404:
-        total_investimentos = 0.0
-    else:
-        total_investimentos = r_total.json().get("total_investido", 0.0)
+    total_investimentos = _total_investido(client, cliente_id, cliente_data)
     
     saldo_conta = cliente_data.get("saldo_cc") or 0.0
     patrimonio_investimento = cliente_data.get("patrimonio_investimento") or 0.0
     # Patrimônio total = saldo em conta + patrimônio disponível + total investido
     patrimonio_total = saldo_conta + patrimonio_investimento + total_investimentos
     
-    from fastapi.responses import JSONResponse
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "cliente_id": cliente_id,
             "nome": cliente_data.get("nome"),
@@ -415,11 +540,7 @@ def calcular_patrimonio(cliente_id: int, client: httpx.Client = Depends(get_dyna
             "total_investimentos": total_investimentos,
             "patrimonio_total": patrimonio_total
         },
-        headers={
-            "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
-            "Pragma": "no-cache",
-            "Expires": "0"
-        }
+        headers={**_REVALIDAR, **({"ETag": etag} if etag else {})}
     )
 
 
@@ -431,15 +552,12 @@ def analise_carteira(cliente_id: int, client: httpx.Client = Depends(get_dynamic
     """
     client = client or client_module.get_http_client()
     
-    # Obter cliente
-    r = client.get(f"/clients/{cliente_id}")
-    if r.status_code == 404:
-        raise HTTPException(status_code=404, detail="Cliente não encontrado")
-    r.raise_for_status()
+    # Cliente precisa existir (vem do cache do gateway)
+    _cliente(client, cliente_id)
     
     # Obter investimentos
     r_inv = client.get(f"/investments/cliente/{cliente_id}")
-    investimentos = r_inv.json() if r_inv.status_code == 200 else []
+    investimentos = client_module.parse_json(r_inv) if r_inv.status_code == 200 else []
     
     # Agrupar por tipo
     por_tipo = {}
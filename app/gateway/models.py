@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field, EmailStr, validator
 from datetime import date, datetime
 from enum import Enum
@@ -84,6 +84,8 @@ class ClientOut(ClientBase):
     id: int
     email: Optional[EmailStr] = None
     data_nascimento: Optional[date] = None
+    # Soma dos investimentos ativos, mantida pelo storage a cada escrita em investimentos
+    total_investido_ativo: Optional[float] = None
 
 
 class ScoreOut(BaseModel):
@@ -125,6 +127,21 @@ class InvestimentoCreate(InvestimentoBase):
     pass
 
 
+class InvestimentoBatchItem(BaseModel):
+    """Item de um lote de investimentos (o cliente é informado no lote)."""
+    tipo_investimento: TipoInvestimento
+    ticker: Optional[str] = Field(default=None, description="Código do ativo (ex: PETR4.SA, BTC-USD)")
+    valor_investido: float = Field(..., gt=0, description="Valor investido em reais")
+    rentabilidade: Optional[float] = Field(default=0.0, description="Rentabilidade acumulada (%)")
+    ativo: bool = Field(default=True, description="Se o investimento está ativo")
+
+
+class InvestimentoBatchCreate(BaseModel):
+    """Modelo para criar vários investimentos de um cliente em uma única operação."""
+    cliente_id: int
+    investimentos: List[InvestimentoBatchItem] = Field(..., min_length=1, max_length=500)
+
+
 class InvestimentoUpdate(BaseModel):
     """Modelo para atualizar investimento."""
     tipo_investimento: Optional[TipoInvestimento] = None
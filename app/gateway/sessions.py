@@ -0,0 +1,169 @@
+"""Sessões assinadas do gateway.
+
+O login no storage custa uma verificação bcrypt (~100ms+ de CPU). Depois do
+login o gateway emite um token assinado com HMAC-SHA256; as requisições
+seguintes são autenticadas conferindo a assinatura e a validade, mais uma
+consulta ao armazenamento de sessões (para permitir logout/revogação).
+
+Formato do token: ``<session_id>.<cliente_id>.<expira_em>.<assinatura>``
+"""
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+# Sem SESSION_SECRET cada processo gera o seu: sessões não sobrevivem a restart
+SESSION_SECRET = os.getenv("SESSION_SECRET") or secrets.token_hex(32)
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+# "memory" ou caminho de um arquivo SQLite (compartilhado entre workers do mesmo host)
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_COOKIE = "javer_session"
+SESSION_COOKIE_SECURE = os.getenv("SESSION_COOKIE_SECURE", "false").lower() == "true"
+
+
+@dataclass(frozen=True)
+class Session:
+    session_id: str
+    cliente_id: int
+    expira_em: int
+
+
+class MemorySessionStore:
+    """Sessões em memória do processo."""
+
+    def __init__(self):
+        self._sessions: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, session_id: str, cliente_id: int, expira_em: int):
+        with self._lock:
+            self._purge(int(time.time()))
+            self._sessions[session_id] = (cliente_id, expira_em)
+
+    def get(self, session_id: str) -> Optional[Tuple[int, int]]:
+        return self._sessions.get(session_id)
+
+    def revoke(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _purge(self, agora: int):
+        expiradas = [sid for sid, (_, exp) in self._sessions.items() if exp <= agora]
+        for sid in expiradas:
+            del self._sessions[sid]
+
+
+class SqliteSessionStore:
+    """Sessões em um arquivo SQLite, compartilhadas entre processos do mesmo host."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    cliente_id INTEGER NOT NULL,
+                    expira_em INTEGER NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    def add(self, session_id: str, cliente_id: int, expira_em: int):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE expira_em <= ?", (int(time.time()),))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, cliente_id, expira_em) VALUES (?, ?, ?)",
+                (session_id, cliente_id, expira_em),
+            )
+            self._conn.commit()
+
+    def get(self, session_id: str) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cliente_id, expira_em FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def revoke(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+
+def _build_store():
+    if SESSION_STORE == "memory":
+        return MemorySessionStore()
+    return SqliteSessionStore(SESSION_STORE)
+
+
+_store = _build_store()
+
+
+def get_store():
+    return _store
+
+
+def set_store(store):
+    """Troca o armazenamento de sessões (testes ou configuração em runtime)."""
+    global _store
+    _store = store
+
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(SESSION_SECRET.encode(), payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def issue(cliente_id: int, ttl_seconds: Optional[int] = None) -> Tuple[str, Session]:
+    """Cria uma sessão para o cliente e retorna (token, sessão)."""
+    session_id = secrets.token_urlsafe(16)
+    expira_em = int(time.time()) + (ttl_seconds or SESSION_TTL_SECONDS)
+    payload = f"{session_id}.{cliente_id}.{expira_em}"
+    _store.add(session_id, cliente_id, expira_em)
+    return f"{payload}.{_sign(payload)}", Session(session_id, cliente_id, expira_em)
+
+
+def verify(token: Optional[str]) -> Optional[Session]:
+    """Valida assinatura, expiração e existência da sessão. Retorna None se inválida."""
+    if not token:
+        return None
+    partes = token.split(".")
+    if len(partes) != 4:
+        return None
+    session_id, cliente_id, expira_em, assinatura = partes
+    if not hmac.compare_digest(assinatura, _sign(f"{session_id}.{cliente_id}.{expira_em}")):
+        return None
+    try:
+        cliente_id_int = int(cliente_id)
+        expira_em_int = int(expira_em)
+    except ValueError:
+        return None
+    if expira_em_int <= time.time():
+        return None
+    # Assinatura confere; o store só responde se a sessão não foi revogada
+    if _store.get(session_id) is None:
+        return None
+    return Session(session_id, cliente_id_int, expira_em_int)
+
+
+def revoke(token: Optional[str]):
+    sessao = verify(token)
+    if sessao:
+        _store.revoke(sessao.session_id)
+
+
+def token_from_headers(authorization: Optional[str], cookie: Optional[str]) -> Optional[str]:
+    """Extrai o token de `Authorization: Bearer <token>` ou do cookie de sessão."""
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:].strip()
+    return cookie
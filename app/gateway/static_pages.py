@@ -0,0 +1,151 @@
+"""Frontend servido da memória, com ETag forte e assets imutáveis.
+
+Os arquivos de `frontend/` são lidos uma única vez (na importação do
+gateway): conteúdo, tipo, ETag (hash SHA-256 do conteúdo) e as versões
+comprimidas (`.br`/`.gz` gerados no build por `python -m gateway.compression`,
+ou gzip feito aqui mesmo). Nenhuma requisição toca o disco.
+
+- Páginas e assets pelo nome original: `Cache-Control: no-cache`; o navegador
+  revalida com `If-None-Match` e recebe 304 enquanto o arquivo não mudar.
+- Assets pelo nome com hash (`/static/app.<hash>.js`, ver `asset_url`):
+  `immutable` por um ano; um conteúdo novo tem outro nome. Referências a
+  `/static/<arquivo>` nas páginas HTML são reescritas para o nome com hash
+  (entre assets não: o hash de um asset é só do próprio conteúdo).
+
+Alterações em `frontend/` só aparecem depois de reiniciar o gateway.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from . import compression
+
+CACHE_PAGINA = "no-cache"
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+
+_REFERENCIA = re.compile(r"/static/([\w.\-/]+)")
+
+
+@dataclass(frozen=True)
+class StaticFile:
+    nome: str
+    conteudo: bytes
+    media_type: str
+    etag: str
+    # encoding -> (conteúdo comprimido, ETag da representação)
+    variantes: Dict[str, tuple] = field(default_factory=dict)
+
+
+def _etag(conteudo: bytes) -> str:
+    return f'"{hashlib.sha256(conteudo).hexdigest()[:32]}"'
+
+
+def _nome_com_hash(nome: str, conteudo: bytes) -> str:
+    base, ext = os.path.splitext(nome)
+    return f"{base}.{hashlib.sha256(conteudo).hexdigest()[:12]}{ext}"
+
+
+def _variantes(caminho: Path, conteudo: bytes, media_type: str, reescrito: bool) -> dict:
+    """Versões comprimidas: as geradas no build, se atuais; senão comprimidas aqui, no nível máximo.
+
+    Arquivos com referências reescritas não aproveitam as do build (são do conteúdo original).
+    """
+    if media_type not in compression.COMPRESSIBLE_TYPES or len(conteudo) < compression.COMPRESSION_MIN_SIZE:
+        return {}
+    variantes = {}
+    mtime = caminho.stat().st_mtime
+    for encoding, sufixo in (("br", ".br"), ("gzip", ".gz")):
+        gerado = caminho.with_name(caminho.name + sufixo)
+        if not reescrito and gerado.is_file() and gerado.stat().st_mtime >= mtime:
+            variantes[encoding] = gerado.read_bytes()
+    if "br" not in variantes and compression.brotli is not None:  # pragma: no cover - requer brotli
+        variantes["br"] = compression.brotli.compress(conteudo, quality=11)
+    if "gzip" not in variantes:
+        variantes["gzip"] = gzip.compress(conteudo, compresslevel=9, mtime=0)
+    return variantes
+
+
+def if_none_match(valor: Optional[str], etags) -> bool:
+    """True se algum ETag do If-None-Match casa (comparação fraca, como pede a RFC 9110)."""
+    if not valor:
+        return False
+    pedidos = {parte.strip().removeprefix("W/") for parte in valor.split(",")}
+    return "*" in pedidos or not pedidos.isdisjoint(e.removeprefix("W/") for e in etags)
+
+
+class FrontendFiles:
+    """Arquivos do frontend carregados na memória."""
+
+    def __init__(self, diretorio):
+        self.files: Dict[str, StaticFile] = {}
+        # nome com hash -> nome original
+        self.hashed: Dict[str, str] = {}
+        self._urls: Dict[str, str] = {}
+        diretorio = Path(diretorio)
+        if not diretorio.is_dir():
+            return
+        lidos = {}
+        for caminho in sorted(diretorio.rglob("*")):
+            if caminho.is_file() and caminho.suffix not in (".gz", ".br"):
+                lidos[caminho.relative_to(diretorio).as_posix()] = caminho
+        conteudos = {nome: caminho.read_bytes() for nome, caminho in lidos.items()}
+        tipos = {nome: mimetypes.guess_type(nome)[0] or "application/octet-stream" for nome in lidos}
+
+        urls = {
+            nome: f"/static/{_nome_com_hash(nome, conteudo)}"
+            for nome, conteudo in conteudos.items()
+            if tipos[nome] != "text/html"
+        }
+        for nome, caminho in lidos.items():
+            conteudo = conteudos[nome]
+            if tipos[nome] == "text/html":
+                texto = conteudo.decode("utf-8")
+                conteudo = _REFERENCIA.sub(lambda m: urls.get(m.group(1), m.group(0)), texto).encode("utf-8")
+            variantes = _variantes(caminho, conteudo, tipos[nome], reescrito=conteudo != conteudos[nome])
+            etag = _etag(conteudo)
+            self.files[nome] = StaticFile(
+                nome=nome,
+                conteudo=conteudo,
+                media_type=tipos[nome],
+                etag=etag,
+                variantes={enc: (dados, f'"{etag[1:-1]}-{enc}"') for enc, dados in variantes.items()},
+            )
+        self.hashed = {url.removeprefix("/static/"): nome for nome, url in urls.items()}
+        self._urls = urls
+
+    def asset_url(self, nome: str) -> str:
+        """URL imutável (com hash do conteúdo) de um asset; o nome original se não existir."""
+        return self._urls.get(nome, f"/static/{nome}")
+
+    def response(self, request: Request, nome: str, imutavel: bool = False) -> Optional[Response]:
+        """Resposta (200 ou 304) para o arquivo, ou None se não existir."""
+        arquivo = self.files.get(nome)
+        if arquivo is None:
+            return None
+        encoding = compression.choose_encoding(request.headers.get("accept-encoding"), arquivo.variantes)
+        conteudo, etag = arquivo.variantes.get(encoding, (arquivo.conteudo, arquivo.etag))
+        headers = {
+            "ETag": etag,
+            "Cache-Control": CACHE_IMUTAVEL if imutavel else CACHE_PAGINA,
+        }
+        if arquivo.variantes:
+            headers["Vary"] = "Accept-Encoding"
+        todas = {arquivo.etag, *(e for _, e in arquivo.variantes.values())}
+        if if_none_match(request.headers.get("if-none-match"), todas):
+            return Response(status_code=304, headers=headers)
+        if encoding in arquivo.variantes:
+            headers["Content-Encoding"] = encoding
+        return Response(content=conteudo, media_type=arquivo.media_type, headers=headers)
+
+    def static_response(self, request: Request, nome: str) -> Optional[Response]:
+        """`/static/<nome>`: nome com hash é imutável; nome original revalida."""
+        if nome in self.hashed:
+            return self.response(request, self.hashed[nome], imutavel=True)
+        return self.response(request, nome)
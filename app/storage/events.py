@@ -0,0 +1,211 @@
+"""Eventos de mudança: avisam quem guarda cópias (o cache do gateway) que um cliente mudou.
+
+Cada escrita confirmada em `repository.py`/`investment_repository.py` chama
+`publish` com o cliente afetado e a entidade escrita; o evento leva a versão
+do cliente depois da escrita (`clients.versao`, `None` se o cliente foi
+removido):
+
+    {"cliente_id": 7, "entidade": "investimento", "versao": 12}
+
+`entidade` é "cliente", "investimento" ou "todos" (`cliente_id` None: por
+exemplo `repair_totals`, que corrige vários clientes de uma vez).
+
+- PostgreSQL: `pg_notify(EVENTS_CHANNEL, ...)` na conexão da escrita, depois do
+  commit. Cada instância do storage mantém uma conexão com `LISTEN`
+  (`start_listener`, na subida) e repassa as notificações aos seus
+  assinantes: uma escrita em qualquer instância chega a todos.
+- SQLite: `publish` entrega direto aos assinantes do processo (com vários
+  processos no mesmo arquivo, cada um só anuncia as próprias escritas).
+
+Assinantes recebem uma fila (`subscribe`); `GET /events` (SSE) é um assinante
+por conexão, com uma `asyncio.Queue` alimentada pelo loop do servidor
+(`loop.call_soon_threadsafe`): cada conexão aberta espera no event loop, sem
+prender uma thread do threadpool das rotas síncronas. Fila cheia ou listener reconectado: os pendentes são descartados
+e o assinante recebe `{"entidade": "todos", "cliente_id": null}` — quem
+consome invalida tudo. Falha ao publicar nunca desfaz nem falha a escrita.
+"""
+import asyncio
+import logging
+import os
+import queue
+import select
+import threading
+from typing import Awaitable, Callable, Optional
+
+import orjson
+from psycopg2 import sql
+
+from .db import get_backend, get_connection, is_shared_connection
+
+EVENTS_ENABLED = os.getenv("EVENTS_ENABLED", "true").lower() == "true"
+EVENTS_CHANNEL = os.getenv("EVENTS_CHANNEL", "javer_changes")
+# Eventos pendentes por assinante antes de trocar tudo por um "todos"
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "1000"))
+# Comentário SSE enviado sem eventos por este tempo: mantém a conexão e detecta quem caiu
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_RETRY_SECONDS = float(os.getenv("EVENTS_RETRY_SECONDS", "5"))
+
+TODOS = {"cliente_id": None, "entidade": "todos", "versao": None}
+
+logger = logging.getLogger("storage")
+
+_lock = threading.Lock()
+_assinantes: list = []
+_listener: Optional[threading.Thread] = None
+_parar = threading.Event()
+
+
+class _FilaAsync:
+    """Assinante de um stream SSE: `deliver` (qualquer thread) entrega pelo loop dono da fila."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self.fila: asyncio.Queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+
+    def put_nowait(self, evento: dict):
+        try:
+            self._loop.call_soon_threadsafe(self._colocar, evento)
+        except RuntimeError:
+            # Loop já encerrado: o stream está saindo e remove o assinante
+            pass
+
+    def _colocar(self, evento: dict):
+        try:
+            self.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            while not self.fila.empty():
+                self.fila.get_nowait()
+            self.fila.put_nowait(TODOS)
+
+
+def _inscrever(fila):
+    with _lock:
+        _assinantes.append(fila)
+
+
+def subscribe() -> queue.Queue:
+    fila = queue.Queue(maxsize=EVENTS_QUEUE_SIZE)
+    _inscrever(fila)
+    return fila
+
+
+def unsubscribe(fila):
+    with _lock:
+        if fila in _assinantes:
+            _assinantes.remove(fila)
+
+
+def _substituir_por_todos(fila: queue.Queue):
+    while True:
+        try:
+            fila.get_nowait()
+        except queue.Empty:
+            break
+    fila.put_nowait(TODOS)
+
+
+def deliver(evento: dict):
+    """Entrega um evento a todos os assinantes deste processo."""
+    with _lock:
+        assinantes = list(_assinantes)
+    for fila in assinantes:
+        try:
+            fila.put_nowait(evento)
+        except queue.Full:
+            _substituir_por_todos(fila)
+
+
+def publish(conn, cliente_id: Optional[int], entidade: str):
+    """Anuncia uma escrita já confirmada em `conn` (sem `cliente_id`: todos os clientes)."""
+    if not EVENTS_ENABLED:
+        return
+    try:
+        import sqlite3
+        if isinstance(conn, sqlite3.Connection):
+            versao = None
+            if cliente_id is not None:
+                row = conn.execute("SELECT versao FROM clients WHERE id = ?", (cliente_id,)).fetchone()
+                versao = row[0] if row else None
+            deliver({"cliente_id": cliente_id, "entidade": entidade, "versao": versao})
+        else:  # pragma: no cover - caminho PostgreSQL
+            cur = conn.cursor()
+            # Entregue pelo LISTEN de cada instância (inclusive esta) quando a transação da notificação termina
+            cur.execute(
+                """
+                SELECT pg_notify(%s, json_build_object(
+                    'cliente_id', %s::int, 'entidade', %s::text,
+                    'versao', (SELECT versao FROM clients WHERE id = %s)
+                )::text)
+                """,
+                (EVENTS_CHANNEL, cliente_id, entidade, cliente_id),
+            )
+    except Exception as e:
+        logger.warning(f"events: evento de {entidade} {cliente_id} não publicado: {e}")
+
+
+async def stream(desconectado: Optional[Callable[[], Awaitable[bool]]] = None, heartbeat: Optional[float] = None):
+    """Corpo SSE de `GET /events`: `data: <json>` por evento, comentário a cada `heartbeat` sem eventos.
+
+    `desconectado` (`request.is_disconnected`) é consultado a cada volta: quem
+    caiu sai no próximo evento ou heartbeat, se o servidor não cancelar antes.
+    """
+    heartbeat = EVENTS_HEARTBEAT_SECONDS if heartbeat is None else heartbeat
+    assinante = _FilaAsync(asyncio.get_running_loop())
+    _inscrever(assinante)
+    try:
+        # Primeiro bloco já na conexão: o assinante sabe que está inscrito
+        yield b": conectado\n\n"
+        while desconectado is None or not await desconectado():
+            try:
+                evento = await asyncio.wait_for(assinante.fila.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            yield b"data: " + orjson.dumps(evento) + b"\n\n"
+    finally:
+        unsubscribe(assinante)
+
+
+def _escutar():  # pragma: no cover - caminho PostgreSQL
+    """LISTEN no primário, repassando as notificações aos assinantes; reconecta em erro."""
+    while not _parar.is_set():
+        conn = None
+        try:
+            conn = get_connection()
+            conn.cursor().execute(sql.SQL("LISTEN {}").format(sql.Identifier(EVENTS_CHANNEL)))
+            # Notificações perdidas enquanto desconectado
+            deliver(TODOS)
+            while not _parar.is_set():
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    deliver(orjson.loads(conn.notifies.pop(0).payload))
+        except Exception as e:
+            logger.warning(f"events: LISTEN {EVENTS_CHANNEL} falhou ({e}); nova tentativa em {EVENTS_RETRY_SECONDS}s")
+            _parar.wait(EVENTS_RETRY_SECONDS)
+        finally:
+            if conn is not None and not is_shared_connection(conn):
+                conn.close()
+
+
+def start_listener():
+    """Inicia o LISTEN em segundo plano (só PostgreSQL; no SQLite `publish` já entrega localmente)."""
+    if not EVENTS_ENABLED or get_backend().is_sqlite or _listener is not None:
+        return
+    _iniciar_listener()
+
+
+def _iniciar_listener():  # pragma: no cover - caminho PostgreSQL
+    global _listener
+    _parar.clear()
+    _listener = threading.Thread(target=_escutar, name="storage-events", daemon=True)
+    _listener.start()
+
+
+def stop_listener():
+    global _listener
+    _parar.set()
+    if _listener is not None:  # pragma: no cover - caminho PostgreSQL
+        _listener.join(timeout=5)
+        _listener = None
@@ -1,63 +1,253 @@
-"""Repositório para gerenciar investimentos no banco de dados."""
-from typing import List, Optional
+"""Repositório para gerenciar investimentos no banco de dados.
+
+`clients.total_investido_ativo` guarda a soma de `valor_investido` dos
+investimentos ativos do cliente. Toda escrita em `investments` feita aqui
+ajusta esse total na mesma transação, então o total do cliente é uma leitura
+por chave primária. Se o total estiver NULL, a leitura cai no SUM sobre
+`investments`; `repair_totals` recalcula totais divergentes.
+
+Depois do commit, cada escrita anuncia o cliente afetado (`events.publish`).
+"""
+from contextlib import contextmanager
+from typing import Dict, List, Optional
 from datetime import datetime
-from .db import get_connection
-from .models import InvestimentoCreate, InvestimentoUpdate, InvestimentoOut, TipoInvestimento
+from .db import get_connection, mark_write
+from . import events
+from .models import InvestimentoCreate, InvestimentoUpdate, InvestimentoOut, InvestimentoBatchCreate, TipoInvestimento
+
+
+_SELECT_COLUMNS = "id, cliente_id, tipo_investimento, ticker, valor_investido, rentabilidade, ativo, data_aplicacao"
+
+
+_TIPOS = {t.value: t for t in TipoInvestimento}
+
+
+def _row_to_investimento(row) -> InvestimentoOut:
+    """Converte uma linha (na ordem de _SELECT_COLUMNS) em InvestimentoOut.
+
+    As linhas foram gravadas por este repositório a partir de modelos já
+    validados, então o modelo é montado com `model_construct` (sem validação);
+    o tipo vem de um dicionário em vez da busca do Enum.
+    """
+    data = row[7]
+    return InvestimentoOut.model_construct(
+        id=row[0],
+        cliente_id=row[1],
+        tipo_investimento=_TIPOS[row[2]],
+        ticker=row[3],
+        valor_investido=float(row[4]),
+        rentabilidade=row[5],
+        ativo=bool(row[6]),
+        # SQLite devolve TIMESTAMP como texto
+        data_aplicacao=data if isinstance(data, datetime) else datetime.fromisoformat(data),
+    )
+
+
+@contextmanager
+def _transacao(conn, is_sqlite: bool):
+    """Commit ao final do bloco ou rollback em erro."""
+    if not is_sqlite:  # pragma: no cover - caminho PostgreSQL
+        # get_connection liga autocommit; as escritas precisam de uma transação explícita
+        conn.autocommit = False
+    try:
+        yield
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if not is_sqlite:  # pragma: no cover - caminho PostgreSQL
+            conn.autocommit = True
+
+
+def _aplicar_contribuicao(cur, ph: str, investimento_id: int, sinal: int):
+    """Soma (sinal=1) ou subtrai (sinal=-1) a contribuição atual do investimento ao total do cliente.
+
+    Também incrementa `clients.versao`: toda escrita em investimentos passa por aqui.
+    """
+    cur.execute(
+        f"""
+        UPDATE clients
+        SET versao = versao + 1,
+            total_investido_ativo = total_investido_ativo + {sinal} * (
+                SELECT CASE WHEN ativo THEN valor_investido ELSE 0 END FROM investments WHERE id = {ph}
+            )
+        WHERE id = (SELECT cliente_id FROM investments WHERE id = {ph})
+        """,
+        (investimento_id, investimento_id),
+    )
+
+
+def _cliente_do_investimento(cur, ph: str, investimento_id: int, travar: bool) -> Optional[int]:
+    """Cliente dono do investimento (None se não existe); com `travar`, bloqueia a linha (FOR UPDATE)."""
+    cur.execute(f"SELECT cliente_id FROM investments WHERE id = {ph}{' FOR UPDATE' if travar else ''}", (investimento_id,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def _patrimonio_insuficiente(patrimonio_atual: float, valor: float) -> ValueError:
+    return ValueError(
+        f"Patrimônio insuficiente para investir. Você tem R$ {patrimonio_atual:.2f} disponível "
+        f"e tentou investir R$ {valor:.2f}. Transfira dinheiro da conta corrente primeiro."
+    )
+
+
+def _debitar_patrimonio(cur, ph: str, cliente_id: int, valor: float) -> bool:
+    """Debita `valor` do patrimonio_investimento com um único UPDATE condicional.
+
+    O saldo é conferido pelo banco na própria escrita (trava a linha no
+    PostgreSQL e o arquivo no SQLite), então escritas concorrentes não gastam o
+    mesmo saldo duas vezes. Retorna False se o cliente não existe; levanta
+    ValueError se o saldo não cobre `valor`.
+    """
+    cur.execute(
+        f"""
+        UPDATE clients SET patrimonio_investimento = COALESCE(patrimonio_investimento, 0) - {ph}
+        WHERE id = {ph} AND COALESCE(patrimonio_investimento, 0) >= {ph}
+        """,
+        (valor, cliente_id, valor),
+    )
+    if cur.rowcount:
+        return True
+    cur.execute(f"SELECT patrimonio_investimento FROM clients WHERE id = {ph}", (cliente_id,))
+    row = cur.fetchone()
+    if row is None:
+        return False
+    raise _patrimonio_insuficiente(float(row[0] or 0.0), valor)
+
+
+_SUM_ATIVOS = "SELECT COALESCE(SUM(valor_investido), 0) FROM investments WHERE cliente_id = clients.id AND ativo"
 
 
 class InvestmentRepository:
     """Repositório para operações CRUD de investimentos."""
 
     @staticmethod
-    def create(investimento: InvestimentoCreate) -> InvestimentoOut:
-        """Cria um novo investimento."""
+    def create(investimento: InvestimentoCreate, debitar_patrimonio: bool = False) -> Optional[InvestimentoOut]:
+        """Cria um novo investimento.
+
+        Com `debitar_patrimonio`, debita o patrimonio_investimento do cliente
+        na mesma transação do INSERT, com um UPDATE condicional ao saldo (ver
+        `_debitar_patrimonio`); nesse modo retorna None se o cliente não existe
+        e levanta ValueError se o patrimônio não cobre o investimento.
+        """
         conn = get_connection()
         cur = conn.cursor()
         
         import sqlite3
-        if isinstance(conn, sqlite3.Connection):
+        is_sqlite = isinstance(conn, sqlite3.Connection)
+        ph = "?" if is_sqlite else "%s"
+        with _transacao(conn, is_sqlite):
+            # Débito antes do INSERT: é a primeira escrita da transação e já segura o saldo
+            if debitar_patrimonio and not _debitar_patrimonio(cur, ph, investimento.cliente_id, investimento.valor_investido or 0):
+                return None
+            if is_sqlite:
+                cur.execute(
+                    """
+                    INSERT INTO investments (cliente_id, tipo_investimento, ticker, valor_investido, rentabilidade, ativo)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        investimento.cliente_id,
+                        investimento.tipo_investimento.value,
+                        investimento.ticker,
+                        investimento.valor_investido,
+                        investimento.rentabilidade or 0.0,
+                        1 if investimento.ativo else 0,
+                    ),
+                )
+                inv_id = cur.lastrowid
+            else:  # pragma: no cover - caminho usado apenas com PostgreSQL em produção
+                cur.execute(
+                    """
+                    INSERT INTO investments (cliente_id, tipo_investimento, ticker, valor_investido, rentabilidade, ativo)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    RETURNING id, data_aplicacao
+                    """,
+                    (
+                        investimento.cliente_id,
+                        investimento.tipo_investimento.value,
+                        investimento.ticker,
+                        investimento.valor_investido,
+                        investimento.rentabilidade or 0.0,
+                        investimento.ativo,
+                    ),
+                )
+                result = cur.fetchone()
+                inv_id, data_aplicacao = result
+            _aplicar_contribuicao(cur, ph, inv_id, 1)
+        mark_write(("cliente", investimento.cliente_id), ("investimento", inv_id))
+        events.publish(conn, investimento.cliente_id, "investimento")
+
+        return InvestmentRepository.get_by_id(inv_id)
+
+    @staticmethod
+    def create_batch(lote: InvestimentoBatchCreate) -> Optional[List[InvestimentoOut]]:
+        """Cria vários investimentos de um cliente em uma única transação.
+
+        Debita o total do lote do patrimonio_investimento uma vez, com um
+        UPDATE condicional ao saldo (atômico também entre lotes concorrentes),
+        insere todas as linhas com um único INSERT ... RETURNING e soma o
+        total_investido_ativo do cliente uma vez.
+
+        Retorno:
+            Lista de investimentos criados, ou None se o cliente não existe
+
+        Levanta:
+            ValueError se o patrimônio disponível não cobre o total do lote
+        """
+        conn = get_connection()
+        cur = conn.cursor()
+        import sqlite3
+        is_sqlite = isinstance(conn, sqlite3.Connection)
+        ph = "?" if is_sqlite else "%s"
+
+        with _transacao(conn, is_sqlite):
+            # Débito condicional ao saldo antes dos INSERTs (ver `_debitar_patrimonio`)
+            total = sum(item.valor_investido for item in lote.investimentos)
+            if not _debitar_patrimonio(cur, ph, lote.cliente_id, total):
+                return None
+
+            values_sql = ", ".join([f"({ph}, {ph}, {ph}, {ph}, {ph}, {ph})"] * len(lote.investimentos))
+            params = []
+            for item in lote.investimentos:
+                params.extend((
+                    lote.cliente_id,
+                    item.tipo_investimento.value,
+                    item.ticker,
+                    item.valor_investido,
+                    item.rentabilidade or 0.0,
+                    (1 if item.ativo else 0) if is_sqlite else item.ativo,
+                ))
             cur.execute(
-                """
+                f"""
                 INSERT INTO investments (cliente_id, tipo_investimento, ticker, valor_investido, rentabilidade, ativo)
-                VALUES (?, ?, ?, ?, ?, ?)
+                VALUES {values_sql}
+                RETURNING {_SELECT_COLUMNS}
                 """,
-                (
-                    investimento.cliente_id,
-                    investimento.tipo_investimento.value,
-                    investimento.ticker,
-                    investimento.valor_investido,
-                    investimento.rentabilidade or 0.0,
-                    1 if investimento.ativo else 0,
-                ),
+                tuple(params),
             )
-            inv_id = cur.lastrowid
-            conn.commit()
-        else:  # pragma: no cover - caminho usado apenas com PostgreSQL em produção
+            rows = cur.fetchall()
+
+            total_ativo = sum(item.valor_investido for item in lote.investimentos if item.ativo)
             cur.execute(
-                """
-                INSERT INTO investments (cliente_id, tipo_investimento, ticker, valor_investido, rentabilidade, ativo)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING id, data_aplicacao
+                f"""
+                UPDATE clients
+                SET total_investido_ativo = total_investido_ativo + {ph},
+                    versao = versao + 1
+                WHERE id = {ph}
                 """,
-                (
-                    investimento.cliente_id,
-                    investimento.tipo_investimento.value,
-                    investimento.ticker,
-                    investimento.valor_investido,
-                    investimento.rentabilidade or 0.0,
-                    investimento.ativo,
-                ),
+                (total_ativo, lote.cliente_id),
             )
-            result = cur.fetchone()
-            inv_id, data_aplicacao = result
-            conn.commit()
+        mark_write(("cliente", lote.cliente_id), *(("investimento", r[0]) for r in rows))
+        events.publish(conn, lote.cliente_id, "investimento")
 
-        return InvestmentRepository.get_by_id(inv_id)
+        return [_row_to_investimento(r) for r in sorted(rows, key=lambda r: r[0])]
 
     @staticmethod
     def get_all() -> List[InvestimentoOut]:
         """Retorna todos os investimentos."""
-        conn = get_connection()
+        conn = get_connection(read_only=True)
         cur = conn.cursor()
         cur.execute(
             """
@@ -70,23 +260,14 @@ class InvestmentRepository:
         rows = cur.fetchall()
         
         return [
-            InvestimentoOut(
-                id=row[0],
-                cliente_id=row[1],
-                tipo_investimento=TipoInvestimento(row[2]),
-                ticker=row[3],
-                valor_investido=row[4],
-                rentabilidade=row[5],
-                ativo=bool(row[6]),
-                data_aplicacao=row[7] if isinstance(row[7], datetime) else datetime.fromisoformat(str(row[7])),
-            )
+            _row_to_investimento(row)
             for row in rows
         ]
 
     @staticmethod
-    def get_by_id(investimento_id: int) -> Optional[InvestimentoOut]:
-        """Retorna um investimento pelo ID."""
-        conn = get_connection()
+    def get_by_id(investimento_id: int, read_only: bool = True) -> Optional[InvestimentoOut]:
+        """Retorna um investimento pelo ID (`read_only=False`: sempre do primário)."""
+        conn = get_connection(read_only=read_only, chave=("investimento", investimento_id))
         cur = conn.cursor()
         import sqlite3
         if isinstance(conn, sqlite3.Connection):
@@ -114,21 +295,12 @@ class InvestmentRepository:
         if not row:
             return None
         
-        return InvestimentoOut(
-            id=row[0],
-            cliente_id=row[1],
-            tipo_investimento=TipoInvestimento(row[2]),
-            ticker=row[3],
-            valor_investido=row[4],
-            rentabilidade=row[5],
-            ativo=bool(row[6]),
-            data_aplicacao=row[7] if isinstance(row[7], datetime) else datetime.fromisoformat(str(row[7])),
-        )
+        return _row_to_investimento(row)
 
     @staticmethod
     def get_by_cliente(cliente_id: int) -> List[InvestimentoOut]:
         """Retorna todos os investimentos de um cliente."""
-        conn = get_connection()
+        conn = get_connection(read_only=True, chave=("cliente", cliente_id))
         cur = conn.cursor()
         import sqlite3
         if isinstance(conn, sqlite3.Connection):
@@ -156,16 +328,7 @@ class InvestmentRepository:
         rows = cur.fetchall()
         
         return [
-            InvestimentoOut(
-                id=row[0],
-                cliente_id=row[1],
-                tipo_investimento=TipoInvestimento(row[2]),
-                ticker=row[3],
-                valor_investido=row[4],
-                rentabilidade=row[5],
-                ativo=bool(row[6]),
-                data_aplicacao=row[7] if isinstance(row[7], datetime) else datetime.fromisoformat(str(row[7])),
-            )
+            _row_to_investimento(row)
             for row in rows
         ]
 
@@ -206,36 +369,72 @@ class InvestmentRepository:
         
         valores.append(investimento_id)
         
-        if isinstance(conn, sqlite3.Connection):
+        is_sqlite = isinstance(conn, sqlite3.Connection)
+        if is_sqlite:
             query = f"UPDATE investments SET {', '.join(updates)} WHERE id = ?"
         else:  # pragma: no cover - caminho PostgreSQL
             query = f"UPDATE investments SET {', '.join(updates)} WHERE id = %s"
-        cur.execute(query, tuple(valores))
-        conn.commit()
+        with _transacao(conn, is_sqlite):
+            # No PostgreSQL, trava a linha antes de ler a contribuição antiga
+            cliente_id = _cliente_do_investimento(cur, placeholder, investimento_id, travar=not is_sqlite)
+            _aplicar_contribuicao(cur, placeholder, investimento_id, -1)
+            cur.execute(query, tuple(valores))
+            _aplicar_contribuicao(cur, placeholder, investimento_id, 1)
+        mark_write(("cliente", cliente_id), ("investimento", investimento_id))
+        if cliente_id is not None:
+            events.publish(conn, cliente_id, "investimento")
         
         return InvestmentRepository.get_by_id(investimento_id)
 
     @staticmethod
-    def delete(investimento_id: int) -> bool:
-        """Deleta um investimento."""
+    def delete(investimento_id: int, creditar_patrimonio: bool = False) -> bool:
+        """Deleta um investimento.
+
+        Com `creditar_patrimonio` (venda), devolve o valor investido ao
+        patrimonio_investimento do cliente na mesma transação do DELETE.
+        """
         conn = get_connection()
         cur = conn.cursor()
         import sqlite3
-        if isinstance(conn, sqlite3.Connection):
-            cur.execute("DELETE FROM investments WHERE id = ?", (investimento_id,))
-        else:  # pragma: no cover - caminho PostgreSQL
-            cur.execute("DELETE FROM investments WHERE id = %s", (investimento_id,))
-        conn.commit()
+        is_sqlite = isinstance(conn, sqlite3.Connection)
+        ph = "?" if is_sqlite else "%s"
+        with _transacao(conn, is_sqlite):
+            cliente_id = _cliente_do_investimento(cur, ph, investimento_id, travar=not is_sqlite)
+            _aplicar_contribuicao(cur, ph, investimento_id, -1)
+            if creditar_patrimonio:
+                cur.execute(
+                    f"""
+                    UPDATE clients
+                    SET patrimonio_investimento = COALESCE(patrimonio_investimento, 0) + (
+                        SELECT valor_investido FROM investments WHERE id = {ph}
+                    )
+                    WHERE id = {ph}
+                    """,
+                    (investimento_id, cliente_id),
+                )
+            cur.execute(f"DELETE FROM investments WHERE id = {ph}", (investimento_id,))
+            removidos = cur.rowcount
+        mark_write(("cliente", cliente_id), ("investimento", investimento_id))
+        if removidos:
+            events.publish(conn, cliente_id, "investimento")
         
-        return cur.rowcount > 0
+        return removidos > 0
 
     @staticmethod
     def get_total_investido_cliente(cliente_id: int) -> float:
-        """Retorna o total investido por um cliente (apenas investimentos ativos)."""
-        conn = get_connection()
+        """Retorna o total investido por um cliente (apenas investimentos ativos).
+
+        Lê `clients.total_investido_ativo`; sem o total mantido (cliente
+        inexistente ou total ainda não calculado), soma os investimentos ativos.
+        """
+        conn = get_connection(read_only=True, chave=("cliente", cliente_id))
         cur = conn.cursor()
         import sqlite3
         if isinstance(conn, sqlite3.Connection):
+            cur.execute("SELECT total_investido_ativo FROM clients WHERE id = ?", (cliente_id,))
+            row = cur.fetchone()
+            if row and row[0] is not None:
+                return float(row[0])
             cur.execute(
                 """
                 SELECT COALESCE(SUM(valor_investido), 0)
@@ -245,6 +444,10 @@ class InvestmentRepository:
                 (cliente_id,),
             )
         else:  # pragma: no cover - caminho PostgreSQL
+            cur.execute("SELECT total_investido_ativo FROM clients WHERE id = %s", (cliente_id,))
+            row = cur.fetchone()
+            if row and row[0] is not None:
+                return float(row[0])
             cur.execute(
                 """
                 SELECT COALESCE(SUM(valor_investido), 0)
@@ -256,3 +459,42 @@ class InvestmentRepository:
         result = cur.fetchone()
         
         return float(result[0]) if result else 0.0
+
+    @staticmethod
+    def check_totals() -> List[Dict[str, float]]:
+        """Lista os clientes cujo total_investido_ativo diverge da soma dos investimentos ativos."""
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            SELECT id, total_investido_ativo, ({_SUM_ATIVOS}) AS esperado
+            FROM clients
+            WHERE total_investido_ativo IS NULL
+               OR ABS(total_investido_ativo - ({_SUM_ATIVOS})) > 0.005
+            ORDER BY id
+            """
+        )
+        return [
+            {"cliente_id": r[0], "registrado": None if r[1] is None else float(r[1]), "esperado": float(r[2])}
+            for r in cur.fetchall()
+        ]
+
+    @staticmethod
+    def repair_totals() -> int:
+        """Recalcula total_investido_ativo a partir de `investments`. Retorna o nº de clientes corrigidos."""
+        conn = get_connection()
+        cur = conn.cursor()
+        import sqlite3
+        is_sqlite = isinstance(conn, sqlite3.Connection)
+        with _transacao(conn, is_sqlite):
+            cur.execute(
+                f"""
+                UPDATE clients SET total_investido_ativo = ({_SUM_ATIVOS}), versao = versao + 1
+                WHERE total_investido_ativo IS NULL
+                   OR ABS(total_investido_ativo - ({_SUM_ATIVOS})) > 0.005
+                """
+            )
+            corrigidos = cur.rowcount
+        if corrigidos:
+            events.publish(conn, None, "todos")
+        return corrigidos
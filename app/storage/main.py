@@ -1,39 +1,135 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import TypeAdapter
 import re
 import logging
-from storage.db import init_db
-from storage.models import ClientCreate, ClientUpdate, ClientOut, ClientRegister, ClientLogin, ClientPasswordReset, InvestimentoCreate, InvestimentoUpdate, InvestimentoOut
-from storage.repository import list_clients, get_client, create_client, update_client, delete_client, login_client, update_password
+from typing import Optional
+from storage.db import init_db, check_health
+from storage.models import ClientCreate, ClientUpdate, ClientOut, ClientRegister, ClientLogin, ClientPasswordReset, InvestimentoCreate, InvestimentoUpdate, InvestimentoOut, InvestimentoBatchCreate
+from storage.repository import ClientRecord, list_clients, get_client, get_client_version, create_client, update_client, delete_client, login_client, update_password
 from storage.investment_repository import InvestmentRepository
+from storage.bulk_import import import_clients, parse_csv, parse_ndjson
+from storage import bulk_import, compression, events, password_pool, pwned_passwords, wire
 
 logger = logging.getLogger("storage")
 
+_cliente_json = TypeAdapter(ClientOut)
+_clientes_json = TypeAdapter(list[ClientOut])
+_investimento_json = TypeAdapter(InvestimentoOut)
+_investimentos_json = TypeAdapter(list[InvestimentoOut])
+_resumo_json = TypeAdapter(dict)
+
+
+def _resposta_confiavel(request: Request, adapter: TypeAdapter, dados, etag: Optional[str] = None) -> Response:
+    """Serializa direto com o pydantic-core, sem a revalidação do response_model.
+
+    Só para dados lidos do próprio banco pelos repositórios (já validados na
+    escrita); o response_model da rota continua documentando o schema. Em
+    msgpack quando o cliente pede (`Accept: application/msgpack`), senão JSON.
+    """
+    if wire.accepts_msgpack(request.headers.get("accept")):
+        resposta = wire.msgpack_response(adapter.dump_python(dados, mode="json"))
+    else:
+        resposta = Response(content=adapter.dump_json(dados), media_type="application/json", headers=wire.VARY)
+    if etag:
+        resposta.headers["ETag"] = etag
+    return resposta
+
+
+def _if_none_match(valor: Optional[str], etag: str) -> bool:
+    """True se o If-None-Match casa com o ETag (comparação fraca, RFC 9110)."""
+    if not valor:
+        return False
+    pedidos = {parte.strip().removeprefix("W/") for parte in valor.split(",")}
+    return "*" in pedidos or etag.removeprefix("W/") in pedidos
+
+
+def _etag_cliente(request: Request, cliente_id: int):
+    """(ETag, resposta 304 ou None) das leituras de um cliente, a partir de `clients.versao`.
+
+    O ETag é fraco: JSON e msgpack são a mesma versão dos dados. Sem versão
+    (cliente inexistente) não há ETag e a rota segue o caminho normal.
+    """
+    versao = get_client_version(cliente_id)
+    if versao is None:
+        return None, None
+    etag = f'W/"c{cliente_id}v{versao}"'
+    if _if_none_match(request.headers.get("if-none-match"), etag):
+        return etag, Response(status_code=304, headers={"ETag": etag, **wire.VARY})
+    return etag, None
+
+
+def _cliente_out(c) -> ClientOut:
+    """Registros do repositório dispensam revalidação (inclusive do EmailStr); outros mapeamentos passam pelo modelo."""
+    return c.to_model() if isinstance(c, ClientRecord) else ClientOut.model_validate(c)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Inicialização
+    # Inicialização: sem banco acessível o serviço não sobe (falha rápida em vez de erro por requisição)
+    saude = check_health()
+    if not saude["ok"]:
+        raise RuntimeError(f"Banco indisponível ({saude['backend']}): {saude.get('erro')}")
+    logger.info(f"storage: backend {saude['backend']} ({saude['latencia_ms']} ms)")
     init_db()
+    # PostgreSQL: LISTEN dos eventos de mudança de todas as instâncias (ver storage/events.py)
+    events.start_listener()
     yield
-    # Finalização (se necessário)
+    # Finalização
+    events.stop_listener()
+    password_pool.shutdown()
+    bulk_import.shutdown()
+
+
+# Respostas serializadas com orjson (mais rápido que o json da stdlib, trata date/datetime nativamente)
+app = FastAPI(title="JAVER Storage Service", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
+# gzip/brotli das listagens acima de COMPRESSION_MIN_SIZE (ver storage/compression.py)
+app.add_middleware(compression.CompressionMiddleware)
+
 
+@app.exception_handler(password_pool.PasswordPoolOverloaded)
+def password_pool_overloaded_handler(request: Request, exc: password_pool.PasswordPoolOverloaded):
+    """Fila de bcrypt cheia: recusa rápido em vez de segurar uma thread do servidor."""
+    return ORJSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
-app = FastAPI(title="JAVER Storage Service", version="1.0.0", lifespan=lifespan)
 
 @app.get("/health")
 def health():
     return {"status": "ok", "service": "storage"}
 
+@app.get("/health/db")
+def health_db():
+    """Disponibilidade do banco configurado (503 se inacessível)."""
+    saude = check_health()
+    return ORJSONResponse(status_code=200 if saude["ok"] else 503, content=saude)
+
+@app.get("/metrics/hibp")
+def hibp_metrics():
+    return pwned_passwords.latency_histogram()
+
+@app.get("/events")
+async def api_events(request: Request):
+    """Eventos de mudança (SSE): `data: {"cliente_id", "entidade", "versao"}` a cada escrita confirmada.
+
+    Rota e corpo assíncronos: uma conexão aberta não ocupa thread do threadpool.
+    """
+    return StreamingResponse(events.stream(request.is_disconnected), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @app.get("/clients", response_model=list[ClientOut])
-def api_list_clients():
-    return list_clients()
+def api_list_clients(request: Request):
+    return _resposta_confiavel(request, _clientes_json, [_cliente_out(c) for c in list_clients()])
 
 @app.get("/clients/{client_id}", response_model=ClientOut)
-def api_get_client(client_id: int):
+def api_get_client(client_id: int, request: Request):
+    etag, nao_modificado = _etag_cliente(request, client_id)
+    if nao_modificado:
+        return nao_modificado
     c = get_client(client_id)
     if not c:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
-    return c
+    return _resposta_confiavel(request, _cliente_json, _cliente_out(c), etag)
 
 @app.post("/clients", response_model=ClientOut, status_code=201)
 def api_create_client(payload: ClientCreate):
@@ -42,6 +138,24 @@ def api_create_client(payload: ClientCreate):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/clients/import")
+async def api_import_clients(request: Request, formato: str | None = None, chunk_size: int | None = None):
+    """Importa clientes em lote a partir de CSV ou NDJSON enviado no corpo.
+
+    O formato vem do parâmetro `formato` ou do Content-Type
+    (`text/csv` ou `application/x-ndjson`).
+    """
+    if formato is None:
+        content_type = request.headers.get("content-type", "")
+        formato = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+    if formato not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="Formato deve ser 'csv' ou 'ndjson'")
+
+    body = (await request.body()).decode("utf-8-sig")
+    registros = parse_ndjson(body) if formato == "ndjson" else parse_csv(body)
+    # Validação, hash e carga são CPU/IO bloqueantes: fora do event loop
+    return await run_in_threadpool(import_clients, registros, chunk_size)
+
 @app.post("/register", response_model=ClientOut, status_code=201)
 def api_register(payload: ClientRegister):
     try:
@@ -93,72 +207,58 @@ def api_update_password(payload: ClientPasswordReset):
 # ============ ENDPOINTS DE INVESTIMENTOS ============
 
 @app.get("/investments", response_model=list[InvestimentoOut])
-def api_list_investments():
+def api_list_investments(request: Request):
     """Lista todos os investimentos."""
-    return InvestmentRepository.get_all()
+    return _resposta_confiavel(request, _investimentos_json, InvestmentRepository.get_all())
 
 
 @app.get("/investments/{investment_id}", response_model=InvestimentoOut)
-def api_get_investment(investment_id: int):
+def api_get_investment(investment_id: int, request: Request):
     """Retorna um investimento específico por ID."""
     inv = InvestmentRepository.get_by_id(investment_id)
     if not inv:
         raise HTTPException(status_code=404, detail="Investimento não encontrado")
-    return inv
+    return _resposta_confiavel(request, _investimento_json, inv)
 
 
 @app.get("/investments/cliente/{cliente_id}", response_model=list[InvestimentoOut])
-def api_list_investments_by_cliente(cliente_id: int):
+def api_list_investments_by_cliente(cliente_id: int, request: Request):
     """Lista todos os investimentos de um cliente."""
-    return InvestmentRepository.get_by_cliente(cliente_id)
+    etag, nao_modificado = _etag_cliente(request, cliente_id)
+    if nao_modificado:
+        return nao_modificado
+    return _resposta_confiavel(request, _investimentos_json, InvestmentRepository.get_by_cliente(cliente_id), etag)
 
 
 @app.post("/investments", response_model=InvestimentoOut, status_code=201)
 def api_create_investment(payload: InvestimentoCreate):
-    """Cria um novo investimento e deduz o valor do patrimonio_investimento do cliente."""
+    """Cria um novo investimento e deduz o valor do patrimonio_investimento do cliente.
+
+    Verificação e débito acontecem na transação do INSERT (ver
+    `InvestmentRepository.create`): o saldo nunca é lido de uma réplica nem
+    regravado como valor absoluto.
+    """
+    try:
+        investimento = InvestmentRepository.create(payload, debitar_patrimonio=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if investimento is None:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    logger.info(f"api_create_investment: Cliente {payload.cliente_id} - Investimento {investimento.id} de R$ {payload.valor_investido}")
+    return investimento
+
+
+@app.post("/investments/batch", response_model=list[InvestimentoOut], status_code=201)
+def api_create_investments_batch(payload: InvestimentoBatchCreate):
+    """Cria vários investimentos de um cliente e debita o total do patrimonio_investimento uma única vez."""
     try:
-        # Verificar se o cliente existe
-        cliente = get_client(payload.cliente_id)
-        if not cliente:
-            raise HTTPException(status_code=404, detail="Cliente não encontrado")
-        
-        # Verificar se o cliente tem patrimônio suficiente para investir
-        patrimonio_atual = cliente.get("patrimonio_investimento", 0) or 0
-        valor_investimento = payload.valor_investido or 0
-        
-        logger.info(f"api_create_investment: Cliente {payload.cliente_id} - Patrimônio disponível: {patrimonio_atual}, Investimento: {valor_investimento}")
-        
-        if valor_investimento > patrimonio_atual:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Patrimônio insuficiente para investir. Você tem R$ {patrimonio_atual:.2f} disponível e tentou investir R$ {valor_investimento:.2f}. Transfira dinheiro da conta corrente primeiro."
-            )
-        
-        # Criar o investimento
-        investimento = InvestmentRepository.create(payload)
-        inv_id = investimento.id if hasattr(investimento, 'id') else investimento.get('id')
-        logger.info(f"api_create_investment: Investimento criado ID {inv_id}")
-        
-        # Deduzir o valor do patrimônio de investimentos (não mexer em saldo_cc)
-        novo_patrimonio = patrimonio_atual - valor_investimento
-        
-        logger.info(f"api_create_investment: Atualizando cliente {payload.cliente_id} - Novo patrimônio disponível: {novo_patrimonio}")
-        
-        cliente_atualizado = update_client(
-            payload.cliente_id,
-            {
-                "patrimonio_investimento": novo_patrimonio
-            }
-        )
-        
-        if cliente_atualizado:
-            logger.info(f"api_create_investment: Patrimônio atualizado para {cliente_atualizado.get('patrimonio_investimento')}")
-        else:
-            logger.error(f"api_create_investment: Falha ao atualizar cliente {payload.cliente_id}")
-        
-        return investimento
+        investimentos = InvestmentRepository.create_batch(payload)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if investimentos is None:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    logger.info(f"api_create_investments_batch: Cliente {payload.cliente_id} - {len(investimentos)} investimentos criados")
+    return investimentos
 
 
 @app.put("/investments/{investment_id}", response_model=InvestimentoOut)
@@ -175,50 +275,32 @@ def api_update_investment(investment_id: int, payload: InvestimentoUpdate):
 
 @app.delete("/investments/{investment_id}", status_code=204)
 def api_delete_investment(investment_id: int):
-    """Vende um investimento e retorna o valor para o patrimônio do cliente."""
-    # Buscar o investimento antes de deletar
-    investimento = InvestmentRepository.get_by_id(investment_id)
+    """Vende um investimento e retorna o valor para o patrimônio do cliente (na transação do DELETE)."""
+    # Dono do investimento, lido do primário (uma réplica pode ainda não ter o investimento)
+    investimento = InvestmentRepository.get_by_id(investment_id, read_only=False)
     if not investimento:
         raise HTTPException(status_code=404, detail="Investimento não encontrado")
-    
-    # Retornar o valor investido para o patrimônio do cliente
     cliente_id = investimento.cliente_id
-    valor_investido = investimento.valor_investido
-    
-    logger.info(f"api_delete_investment: Vendendo investimento {investment_id} - Retornando R$ {valor_investido} para cliente {cliente_id}")
-    
-    # Buscar cliente atual
-    cliente = get_client(cliente_id)
-    if cliente:
-        patrimonio_atual = cliente.get("patrimonio_investimento", 0) or 0
-        novo_patrimonio = patrimonio_atual + valor_investido
-        
-        logger.info(f"api_delete_investment: Patrimônio atual: {patrimonio_atual}, Novo: {novo_patrimonio}")
-        
-        # Atualizar patrimônio do cliente
-        cliente_atualizado = update_client(
-            cliente_id,
-            {"patrimonio_investimento": novo_patrimonio}
-        )
-        
-        if cliente_atualizado:
-            logger.info(f"api_delete_investment: Patrimônio atualizado para {cliente_atualizado.get('patrimonio_investimento')}")
-    
-    # Deletar o investimento
-    ok = InvestmentRepository.delete(investment_id)
+
+    logger.info(f"api_delete_investment: Vendendo investimento {investment_id} - Retornando R$ {investimento.valor_investido} para cliente {cliente_id}")
+    ok = InvestmentRepository.delete(investment_id, creditar_patrimonio=True)
     if not ok:
         raise HTTPException(status_code=404, detail="Investimento não encontrado")
     
-    return
+    # O gateway usa o dono do investimento para invalidar o cache do cliente
+    return Response(status_code=204, headers={"X-Cliente-Id": str(cliente_id)})
 
 
 @app.get("/investments/cliente/{cliente_id}/total")
-def api_get_total_investido(cliente_id: int):
+def api_get_total_investido(cliente_id: int, request: Request):
     """Retorna o total investido por um cliente."""
+    etag, nao_modificado = _etag_cliente(request, cliente_id)
+    if nao_modificado:
+        return nao_modificado
     # Verificar se o cliente existe
     cliente = get_client(cliente_id)
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
     total = InvestmentRepository.get_total_investido_cliente(cliente_id)
-    return {"cliente_id": cliente_id, "total_investido": total}
+    return _resposta_confiavel(request, _resumo_json, {"cliente_id": cliente_id, "total_investido": total}, etag)
@@ -0,0 +1,133 @@
+"""Comandos administrativos do storage.
+
+Uso:
+    python -m storage.manage import-clients clientes.csv
+    python -m storage.manage import-clients clientes.ndjson --formato ndjson --chunk-size 5000
+    python -m storage.manage hibp-index pwnedpasswords.txt
+    python -m storage.manage repair-totals [--check]
+    python -m storage.manage migrate [--status]
+    python -m storage.manage partition-investments --particoes 16 [--descartar-legado]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from .db import init_db
+
+
+def _cmd_import_clients(args) -> int:
+    from .bulk_import import import_clients, parse_csv, parse_ndjson
+
+    caminho = Path(args.arquivo)
+    formato = args.formato or ("ndjson" if caminho.suffix in (".ndjson", ".jsonl") else "csv")
+    content = caminho.read_text(encoding="utf-8")
+    registros = parse_ndjson(content) if formato == "ndjson" else parse_csv(content)
+
+    relatorio = import_clients(
+        registros,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        check_pwned=args.check_pwned,
+    )
+    print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    return 0 if relatorio["rejeitados"] == 0 else 1
+
+
+def _cmd_hibp_index(args) -> int:
+    from .pwned_passwords import build_index
+
+    print(build_index(args.arquivo))
+    return 0
+
+
+def _cmd_repair_totals(args) -> int:
+    from .investment_repository import InvestmentRepository
+
+    divergentes = InvestmentRepository.check_totals()
+    for d in divergentes:
+        print(f"cliente {d['cliente_id']}: registrado={d['registrado']} esperado={d['esperado']}")
+    if args.check:
+        return 1 if divergentes else 0
+    corrigidos = InvestmentRepository.repair_totals() if divergentes else 0
+    print(f"{corrigidos} cliente(s) corrigido(s)")
+    return 0
+
+
+def _cmd_migrate(args) -> int:
+    from . import migrations
+    from .db import get_connection
+
+    conn = get_connection()
+    if args.status:
+        print(f"versão atual: {migrations.current_version(conn)}")
+        for m in migrations.pending(conn):
+            print(f"pendente: {m.versao} - {m.descricao}")
+        return 0
+    aplicadas = migrations.migrate(conn, alvo=args.alvo)
+    print(f"aplicadas: {aplicadas or 'nenhuma'}; versão atual: {migrations.current_version(conn)}")
+    return 0
+
+
+def _cmd_partition_investments(args) -> int:
+    from . import migrations
+    from .db import get_connection
+
+    conn = get_connection()
+    if args.status:
+        particoes = migrations.investments_partitions(conn)
+        if not particoes:
+            print("investments não é particionada")
+        for p in particoes:
+            print(f"{p['particao']}: ~{p['linhas']} linhas")
+        return 0
+    copiadas = migrations.partition_investments(conn, args.particoes, manter_legado=not args.descartar_legado)
+    print(f"investments particionada em {args.particoes} partições; {copiadas} linha(s) copiada(s)")
+    if not args.descartar_legado:
+        print("tabela anterior mantida como investments_legado (DROP TABLE investments_legado após conferir)")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m storage.manage", description="Comandos administrativos do storage")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    imp = sub.add_parser("import-clients", help="Importa clientes em lote de um arquivo CSV ou NDJSON")
+    imp.add_argument("arquivo")
+    imp.add_argument("--formato", choices=("csv", "ndjson"), default=None)
+    imp.add_argument("--chunk-size", type=int, default=None)
+    imp.add_argument("--workers", type=int, default=None)
+    imp.add_argument("--check-pwned", action="store_true", help="Consulta o HIBP para cada senha")
+    imp.set_defaults(func=_cmd_import_clients)
+
+    idx = sub.add_parser("hibp-index", help="Gera o índice de prefixos de um arquivo offline do HIBP")
+    idx.add_argument("arquivo")
+    idx.set_defaults(func=_cmd_hibp_index, needs_db=False)
+
+    rep = sub.add_parser("repair-totals", help="Confere e corrige clients.total_investido_ativo")
+    rep.add_argument("--check", action="store_true", help="Só lista divergências (sai com 1 se houver)")
+    rep.set_defaults(func=_cmd_repair_totals)
+
+    mig = sub.add_parser("migrate", help="Aplica as migrações pendentes do schema")
+    mig.add_argument("--status", action="store_true", help="Só mostra a versão atual e as pendentes")
+    mig.add_argument("--alvo", type=int, default=None, help="Aplica só até esta versão")
+    mig.set_defaults(func=_cmd_migrate, needs_db=False)
+
+    par = sub.add_parser("partition-investments", help="Converte investments em tabela particionada por hash de cliente_id (PostgreSQL)")
+    par.add_argument("--particoes", type=int, default=16)
+    par.add_argument("--descartar-legado", action="store_true", help="Remove a tabela anterior ao final da cópia")
+    par.add_argument("--status", action="store_true", help="Só lista as partições e o nº estimado de linhas")
+    par.set_defaults(func=_cmd_partition_investments)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, "needs_db", True):
+        init_db()
+    return args.func(args)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,383 @@
+"""Migrações versionadas do schema do storage.
+
+Cada migração roda uma única vez e fica registrada em `schema_version`. No
+startup, `migrate()` só consulta a versão atual e aplica as pendentes, então
+o tempo de restart não depende do tamanho das tabelas — as passagens caras
+(deduplicação de clientes, backfill de totais) acontecem só na migração que
+as introduziu.
+
+Para alterar o schema, acrescente uma `Migration` ao final de `MIGRATIONS`
+com a próxima versão; nunca edite uma migração já publicada.
+"""
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+# Índices das consultas quentes, iguais nos dois dialetos. Consultas por
+# email (login, troca de senha, unicidade) e por telefone (unicidade) usam os
+# índices implícitos das constraints UNIQUE; consultas por id usam a PK.
+INDEXES = {
+    "idx_investments_cliente_id": "investments (cliente_id)",
+    "idx_investments_ticker": "investments (ticker)",
+}
+# Índice de cobertura do total investido (SUM(valor_investido) dos ativos de um
+# cliente): a soma é lida só do índice, sem visitar as linhas da tabela.
+# PostgreSQL usa índice parcial com INCLUDE; SQLite não tem INCLUDE, então a
+# coluna somada entra na chave.
+POSTGRES_INDEXES = {
+    "idx_investments_cliente_ativo": "investments (cliente_id) INCLUDE (valor_investido) WHERE ativo",
+}
+SQLITE_INDEXES = {
+    "idx_investments_cliente_ativo": "investments (cliente_id, ativo, valor_investido)",
+}
+
+# Particionamento de `investments` por hash de cliente_id (só PostgreSQL; 0 desliga).
+# Vale na criação da tabela; bases existentes convertem com
+# `python -m storage.manage partition-investments --particoes N`.
+INVESTMENTS_PARTITIONS = int(os.getenv("INVESTMENTS_PARTITIONS", "0"))
+
+# Chave do pg_advisory_lock: só uma instância aplica migrações por vez
+_ADVISORY_LOCK_KEY = 7_341_001
+
+
+@dataclass(frozen=True)
+class Migration:
+    versao: int
+    descricao: str
+    postgres: Callable
+    sqlite: Callable
+
+
+# ============ MIGRAÇÕES ============
+
+def _clients_postgres(cur):  # pragma: no cover - caminho PostgreSQL
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS clients (
+            id SERIAL PRIMARY KEY,
+            nome VARCHAR(255) NOT NULL,
+            telefone BIGINT UNIQUE,
+            email VARCHAR(255) UNIQUE,
+            data_nascimento DATE,
+            correntista BOOLEAN,
+            score_credito DOUBLE PRECISION,
+            saldo_cc DOUBLE PRECISION,
+            senha_hash VARCHAR(255),
+            patrimonio_investimento DOUBLE PRECISION DEFAULT 0.0
+        )
+        """
+    )
+    # Bases criadas antes do schema atual
+    cur.execute("ALTER TABLE clients ADD COLUMN IF NOT EXISTS email VARCHAR(255) UNIQUE")
+    cur.execute("ALTER TABLE clients ADD COLUMN IF NOT EXISTS data_nascimento DATE")
+    cur.execute("ALTER TABLE clients ADD COLUMN IF NOT EXISTS senha_hash VARCHAR(255)")
+    cur.execute("ALTER TABLE clients ADD COLUMN IF NOT EXISTS patrimonio_investimento DOUBLE PRECISION DEFAULT 0.0")
+    # Remover coluna de idade se existir (migrando para data_nascimento)
+    cur.execute("ALTER TABLE clients DROP COLUMN IF EXISTS idade")
+
+    # Remove duplicados para permitir criação das constraints de unicidade
+    cur.execute(
+        """
+        DELETE FROM clients a
+        USING clients b
+        WHERE a.id > b.id
+          AND a.telefone IS NOT NULL
+          AND b.telefone IS NOT NULL
+          AND a.telefone = b.telefone;
+        """
+    )
+    cur.execute(
+        """
+        DELETE FROM clients a
+        USING clients b
+        WHERE a.id > b.id
+          AND a.email IS NOT NULL
+          AND b.email IS NOT NULL
+          AND a.email = b.email;
+        """
+    )
+
+    # Adiciona constraints únicas somente se ainda não existirem
+    cur.execute(
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conname = 'clients_telefone_key'
+            ) THEN
+                ALTER TABLE clients ADD CONSTRAINT clients_telefone_key UNIQUE (telefone);
+            END IF;
+        END$$;
+        """
+    )
+    cur.execute(
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conname = 'clients_email_key'
+            ) THEN
+                ALTER TABLE clients ADD CONSTRAINT clients_email_key UNIQUE (email);
+            END IF;
+        END$$;
+        """
+    )
+
+
+def _clients_sqlite(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS clients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            telefone INTEGER UNIQUE,
+            email TEXT UNIQUE,
+            data_nascimento DATE,
+            correntista INTEGER,
+            score_credito REAL,
+            saldo_cc REAL,
+            senha_hash TEXT,
+            patrimonio_investimento REAL DEFAULT 0.0
+        )
+        """
+    )
+
+
+def create_indexes(cur, sqlite: bool = True):
+    especificos = SQLITE_INDEXES if sqlite else POSTGRES_INDEXES
+    for nome, alvo in {**INDEXES, **especificos}.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {alvo}")
+
+
+def investments_postgres(cur, particoes: Optional[int] = None):
+    """Cria `investments` no PostgreSQL; com `particoes` > 0, particionada por HASH (cliente_id).
+
+    Tabela particionada exige a chave de partição na PK, que passa a ser
+    (id, cliente_id). Consultas por cliente_id tocam uma partição só; por id,
+    sondam a PK de cada partição.
+    """
+    particoes = INVESTMENTS_PARTITIONS if particoes is None else particoes
+    if particoes > 0:
+        chave, sufixo = "PRIMARY KEY (id, cliente_id),", " PARTITION BY HASH (cliente_id)"
+    else:
+        chave, sufixo = "", ""
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS investments (
+            id SERIAL{'' if particoes > 0 else ' PRIMARY KEY'},
+            cliente_id INTEGER NOT NULL,
+            tipo_investimento VARCHAR(50) NOT NULL,
+            ticker VARCHAR(50),
+            valor_investido DOUBLE PRECISION NOT NULL CHECK (valor_investido > 0),
+            rentabilidade DOUBLE PRECISION DEFAULT 0.0,
+            ativo BOOLEAN DEFAULT TRUE,
+            data_aplicacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            {chave}
+            FOREIGN KEY (cliente_id) REFERENCES clients(id) ON DELETE CASCADE
+        ){sufixo}
+        """
+    )
+    for resto in range(particoes):
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS investments_p{resto} PARTITION OF investments "
+            f"FOR VALUES WITH (MODULUS {particoes}, REMAINDER {resto})"
+        )
+    # Índices criados na tabela-mãe se propagam para as partições
+    create_indexes(cur, sqlite=False)
+
+
+def investments_sqlite(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS investments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cliente_id INTEGER NOT NULL,
+            tipo_investimento TEXT NOT NULL,
+            ticker TEXT,
+            valor_investido REAL NOT NULL,
+            rentabilidade REAL DEFAULT 0.0,
+            ativo INTEGER DEFAULT 1,
+            data_aplicacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (cliente_id) REFERENCES clients(id) ON DELETE CASCADE
+        )
+        """
+    )
+    create_indexes(cur, sqlite=True)
+
+
+def _backfill_total_investido(cur):
+    """Preenche clients.total_investido_ativo com a soma dos investimentos ativos de cada cliente."""
+    cur.execute(
+        """
+        UPDATE clients SET total_investido_ativo = (
+            SELECT COALESCE(SUM(valor_investido), 0) FROM investments
+            WHERE investments.cliente_id = clients.id AND investments.ativo
+        )
+        """
+    )
+
+
+def _total_investido_postgres(cur):  # pragma: no cover - caminho PostgreSQL
+    cur.execute("ALTER TABLE clients ADD COLUMN IF NOT EXISTS total_investido_ativo DOUBLE PRECISION DEFAULT 0.0")
+    _backfill_total_investido(cur)
+
+
+def _total_investido_sqlite(cur):
+    colunas = {row[1] for row in cur.execute("PRAGMA table_info(clients)")}
+    if "total_investido_ativo" not in colunas:
+        cur.execute("ALTER TABLE clients ADD COLUMN total_investido_ativo REAL DEFAULT 0.0")
+    _backfill_total_investido(cur)
+
+
+def _versao_postgres(cur):  # pragma: no cover - caminho PostgreSQL
+    cur.execute("ALTER TABLE clients ADD COLUMN IF NOT EXISTS versao INTEGER NOT NULL DEFAULT 1")
+
+
+def _versao_sqlite(cur):
+    colunas = {row[1] for row in cur.execute("PRAGMA table_info(clients)")}
+    if "versao" not in colunas:
+        cur.execute("ALTER TABLE clients ADD COLUMN versao INTEGER NOT NULL DEFAULT 1")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "tabela clients e constraints de unicidade", _clients_postgres, _clients_sqlite),
+    Migration(2, "tabela investments e índices", investments_postgres, investments_sqlite),
+    Migration(3, "clients.total_investido_ativo", _total_investido_postgres, _total_investido_sqlite),
+    # Incrementada a cada escrita no cliente ou nos seus investimentos (ETag das leituras por cliente)
+    Migration(4, "clients.versao", _versao_postgres, _versao_sqlite),
+]
+
+
+# ============ PARTICIONAMENTO ============
+
+def investments_partitions(conn) -> List[Dict[str, int]]:  # pragma: no cover - caminho PostgreSQL
+    """Partições de `investments` com o nº estimado de linhas (vazio se a tabela não é particionada)."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT c.relname, c.reltuples::BIGINT
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'investments'::regclass
+        ORDER BY c.relname
+        """
+    )
+    return [{"particao": nome, "linhas": max(int(linhas), 0)} for nome, linhas in cur.fetchall()]
+
+
+def partition_investments(conn, particoes: int, manter_legado: bool = True) -> int:
+    """Converte `investments` em tabela particionada por HASH (cliente_id). Retorna as linhas copiadas.
+
+    Numa única transação: renomeia a tabela atual para `investments_legado`
+    (com seus índices), cria a particionada com o nome original, copia as
+    linhas e ajusta a sequência de id. A tabela fica bloqueada durante a cópia
+    (leituras e escritas esperam), então rode numa janela de manutenção. Sem
+    `manter_legado`, a tabela antiga é descartada no final.
+    """
+    if isinstance(conn, sqlite3.Connection):
+        raise ValueError("particionamento de investments só existe no PostgreSQL")
+    if particoes < 2:
+        raise ValueError("use ao menos 2 partições")
+    return _partition_investments_postgres(conn, particoes, manter_legado)
+
+
+def _partition_investments_postgres(conn, particoes: int, manter_legado: bool) -> int:  # pragma: no cover - caminho PostgreSQL
+    cur = conn.cursor()
+    cur.execute("SELECT pg_advisory_lock(%s)", (_ADVISORY_LOCK_KEY,))
+    autocommit = conn.autocommit
+    conn.autocommit = False
+    try:
+        cur.execute("SELECT relkind FROM pg_class WHERE oid = 'investments'::regclass")
+        if cur.fetchone()[0] == "p":
+            raise ValueError("investments já é particionada")
+        cur.execute("ALTER TABLE investments RENAME TO investments_legado")
+        # Nomes de índice são únicos no schema: os da tabela antiga saem do caminho
+        for nome in ["investments_pkey", *INDEXES, *POSTGRES_INDEXES]:
+            cur.execute(f"ALTER INDEX IF EXISTS {nome} RENAME TO {nome}_legado")
+        investments_postgres(cur, particoes)
+        colunas = "id, cliente_id, tipo_investimento, ticker, valor_investido, rentabilidade, ativo, data_aplicacao"
+        cur.execute(f"INSERT INTO investments ({colunas}) SELECT {colunas} FROM investments_legado")
+        copiadas = cur.rowcount
+        cur.execute(
+            "SELECT setval(pg_get_serial_sequence('investments', 'id'), "
+            "COALESCE((SELECT MAX(id) FROM investments), 0) + 1, false)"
+        )
+        if not manter_legado:
+            cur.execute("DROP TABLE investments_legado")
+        conn.commit()
+        return copiadas
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = autocommit
+        cur.execute("SELECT pg_advisory_unlock(%s)", (_ADVISORY_LOCK_KEY,))
+
+
+# ============ EXECUÇÃO ============
+
+def _ensure_version_table(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            versao INTEGER PRIMARY KEY,
+            descricao TEXT,
+            aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def current_version(conn) -> int:
+    """Versão aplicada mais recente (0 em base nova)."""
+    cur = conn.cursor()
+    _ensure_version_table(cur)
+    cur.execute("SELECT MAX(versao) FROM schema_version")
+    row = cur.fetchone()
+    return int(row[0]) if row and row[0] is not None else 0
+
+
+def pending(conn) -> List[Migration]:
+    atual = current_version(conn)
+    return [m for m in MIGRATIONS if m.versao > atual]
+
+
+def migrate(conn, alvo: Optional[int] = None) -> List[int]:
+    """Aplica as migrações pendentes (até `alvo`, se informado). Retorna as versões aplicadas.
+
+    Cada migração roda na sua própria transação, junto com o registro em
+    `schema_version`: se falhar, nada dela fica aplicado.
+    """
+    is_sqlite = isinstance(conn, sqlite3.Connection)
+    ph = "?" if is_sqlite else "%s"
+    cur = conn.cursor()
+    if not is_sqlite:  # pragma: no cover - caminho PostgreSQL
+        cur.execute("SELECT pg_advisory_lock(%s)", (_ADVISORY_LOCK_KEY,))
+    aplicadas = []
+    try:
+        # Relido após o lock: outra instância pode ter acabado de migrar
+        for m in pending(conn):
+            if alvo is not None and m.versao > alvo:
+                break
+            autocommit = getattr(conn, "autocommit", None)
+            if not is_sqlite:  # pragma: no cover - caminho PostgreSQL
+                conn.autocommit = False
+            try:
+                (m.sqlite if is_sqlite else m.postgres)(cur)
+                cur.execute(
+                    f"INSERT INTO schema_version (versao, descricao) VALUES ({ph}, {ph})",
+                    (m.versao, m.descricao),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                if not is_sqlite:  # pragma: no cover - caminho PostgreSQL
+                    conn.autocommit = autocommit
+            aplicadas.append(m.versao)
+    finally:
+        if not is_sqlite:  # pragma: no cover - caminho PostgreSQL
+            cur.execute("SELECT pg_advisory_unlock(%s)", (_ADVISORY_LOCK_KEY,))
+    return aplicadas
@@ -0,0 +1,147 @@
+"""Pool dedicado para hash e verificação de senhas bcrypt.
+
+O bcrypt é CPU-bound (~100ms+ por operação). Executado direto na thread da
+requisição, uma rajada de logins ocupa todo o threadpool do FastAPI e trava
+endpoints baratos como `/clients/{id}`. Aqui o trabalho vai para um pool de
+processos com fila limitada: no máximo `PASSWORD_POOL_MAX_PENDING` operações
+aguardam ao mesmo tempo e, acima disso, a chamada falha na hora com
+`PasswordPoolOverloaded` (convertida em 503 pela API). Uma operação que passa
+de `PASSWORD_POOL_TIMEOUT` também vira `PasswordPoolOverloaded`, mas o lugar
+dela na fila só é devolvido quando o processo termina o bcrypt: a requisição
+desiste, o trabalho continua contando no limite.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional
+
+import bcrypt
+
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", str(min(2, os.cpu_count() or 1))))
+PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", "16"))
+PASSWORD_POOL_TIMEOUT = float(os.getenv("PASSWORD_POOL_TIMEOUT", "10"))
+# Fator de custo do bcrypt (2^rounds iterações). Cada hash registra o próprio custo ($2b$<rounds>$...)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+
+class PasswordPoolOverloaded(RuntimeError):
+    """Fila de hash de senhas cheia: a requisição deve ser recusada com 503."""
+
+
+def _mp_context():
+    """Contexto dos processos de bcrypt: forkserver (spawn onde não existe), nunca fork.
+
+    Um fork feito a partir de um serviço com threads (threadpool do FastAPI,
+    conexões, locks) copia locks possivelmente travados para o filho; o
+    forkserver cria os processos a partir de um servidor limpo.
+    """
+    metodo = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(metodo)
+
+
+def _bcrypt_hash(senha: str, rounds: Optional[int] = None) -> str:
+    return bcrypt.hashpw(senha.encode(), bcrypt.gensalt(rounds or BCRYPT_ROUNDS)).decode()
+
+
+def _bcrypt_check(senha: str, senha_hash: str) -> bool:
+    return bcrypt.checkpw(senha.encode(), senha_hash.encode())
+
+
+class PasswordPool:
+    """Executa funções bcrypt em processos separados com limite de fila.
+
+    Com `workers <= 0` a função roda no próprio processo, mas o limite de
+    operações simultâneas continua valendo.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        """Operações em andamento ou aguardando um processo livre."""
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+            return self._executor
+
+    def _liberar(self, _future: Optional[Future] = None):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolOverloaded("Serviço de autenticação sobrecarregado, tente novamente")
+        with self._lock:
+            self._pending += 1
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                self._liberar()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._liberar()
+            raise
+        # O lugar na fila volta quando o processo termina, não quando a requisição desiste
+        future.add_done_callback(self._liberar)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Ainda na fila do executor: cancela; já rodando: termina e só então libera
+            future.cancel()
+            raise PasswordPoolOverloaded("Serviço de autenticação sobrecarregado, tente novamente")
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+_pool = PasswordPool(PASSWORD_POOL_WORKERS, PASSWORD_POOL_MAX_PENDING, PASSWORD_POOL_TIMEOUT)
+
+
+def get_pool() -> PasswordPool:
+    return _pool
+
+
+def hash_cost(senha_hash: str) -> Optional[int]:
+    """Extrai o fator de custo gravado no hash bcrypt ($2b$12$... → 12)."""
+    partes = senha_hash.split("$")
+    if len(partes) < 4 or not partes[2].isdigit():
+        return None
+    return int(partes[2])
+
+
+def needs_rehash(senha_hash: str) -> bool:
+    """Indica se o hash foi gerado com um custo diferente do configurado."""
+    return hash_cost(senha_hash) != BCRYPT_ROUNDS
+
+
+def hash_password(senha: str) -> str:
+    """Gera o hash bcrypt da senha no pool dedicado, com o custo configurado."""
+    # O custo vai explícito: o processo filho não precisa ver a mesma configuração
+    return _pool.run(_bcrypt_hash, senha, BCRYPT_ROUNDS)
+
+
+def verify_password(senha: str, senha_hash: str) -> bool:
+    """Verifica a senha contra o hash bcrypt no pool dedicado."""
+    return _pool.run(_bcrypt_check, senha, senha_hash)
+
+
+def shutdown():
+    _pool.shutdown()
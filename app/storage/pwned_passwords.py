@@ -0,0 +1,282 @@
+"""Verificação local de senhas vazadas (HIBP Pwned Passwords).
+
+Duas camadas evitam a chamada HTTP a api.pwnedpasswords.com (até 2s) em
+cada cadastro/troca de senha:
+
+- Cache em disco das respostas de faixa (k-anonimidade: prefixo SHA-1 de 5
+  caracteres), com TTL (`HIBP_CACHE_DIR`, `HIBP_CACHE_TTL_SECONDS`).
+- Modo offline (`HIBP_OFFLINE_FILE`): arquivo baixado com o
+  haveibeenpwned-downloader, uma linha ``SHA1:CONTAGEM`` ordenada por hash.
+  Com o índice de prefixos (`<arquivo>.idx`, gerado por
+  ``python -m storage.manage hibp-index``) a consulta lê só o trecho do
+  prefixo — O(1) no tamanho do arquivo. Sem o índice, faz busca binária.
+
+Quando a API é consultada, a conexão vem de uma `requests.Session`
+compartilhada (keep-alive), com no máximo `HIBP_MAX_CONCURRENCY` chamadas
+simultâneas e latência registrada em histograma (`latency_histogram()`).
+"""
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from array import array
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HIBP_RANGE_URL = "https://api.pwnedpasswords.com/range/{prefix}"
+HIBP_TIMEOUT_SECONDS = float(os.getenv("HIBP_TIMEOUT_SECONDS", "2"))
+# Diretório do cache de faixas; vazio desliga o cache em disco
+HIBP_CACHE_DIR: Optional[str] = os.getenv("HIBP_CACHE_DIR", os.path.join(tempfile.gettempdir(), "javer-hibp")) or None
+HIBP_CACHE_TTL_SECONDS = int(os.getenv("HIBP_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+HIBP_OFFLINE_FILE: Optional[str] = os.getenv("HIBP_OFFLINE_FILE") or None
+# Nunca consulta a rede (somente índice offline e cache)
+HIBP_OFFLINE_ONLY = os.getenv("HIBP_OFFLINE_ONLY", "false").lower() == "true"
+HIBP_MAX_CONCURRENCY = int(os.getenv("HIBP_MAX_CONCURRENCY", "8"))
+# Limites superiores (ms) das faixas do histograma de latência da API
+HIBP_LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2000)
+
+_PREFIXES = 16 ** 5
+_offline_lock = threading.Lock()
+_offline: Optional[Tuple[str, mmap.mmap, Optional[array]]] = None
+
+
+def _sha1(senha: str) -> Tuple[str, str]:
+    sha1 = hashlib.sha1(senha.encode("utf-8")).hexdigest().upper()
+    return sha1[:5], sha1[5:]
+
+
+def _count_in_range(body: str, suffix: str) -> int:
+    """Procura o sufixo numa resposta de faixa (``SUFIXO:CONTAGEM`` por linha)."""
+    for line in body.splitlines():
+        parts = line.split(":")
+        if len(parts) != 2:
+            continue
+        suf, count = parts
+        if suf.upper() == suffix:
+            return int(count)
+    return 0
+
+
+# ============ CACHE DE FAIXAS EM DISCO ============
+
+def _cache_path(prefix: str) -> Optional[str]:
+    if not HIBP_CACHE_DIR:
+        return None
+    return os.path.join(HIBP_CACHE_DIR, f"{prefix}.txt")
+
+
+def _read_cached_range(prefix: str) -> Optional[str]:
+    path = _cache_path(prefix)
+    if not path:
+        return None
+    try:
+        if time.time() - os.path.getmtime(path) > HIBP_CACHE_TTL_SECONDS:
+            return None
+        with open(path, "r", encoding="ascii") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_cached_range(prefix: str, body: str):
+    path = _cache_path(prefix)
+    if not path:
+        return
+    try:
+        os.makedirs(HIBP_CACHE_DIR, exist_ok=True)
+        # Escrita atômica: leitores concorrentes nunca veem arquivo pela metade
+        fd, tmp = tempfile.mkstemp(dir=HIBP_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="ascii") as f:
+            f.write(body)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+# ============ CLIENTE HTTP ============
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HIBP_MAX_CONCURRENCY)
+    session.mount("https://", adapter)
+    return session
+
+
+_session = _build_session()
+_http_slots = threading.BoundedSemaphore(HIBP_MAX_CONCURRENCY)
+_latency_lock = threading.Lock()
+_latency_counts = [0] * (len(HIBP_LATENCY_BUCKETS_MS) + 1)
+_latency_total = {"count": 0, "sum_ms": 0.0, "errors": 0}
+_in_flight = 0
+
+
+def _record_latency(ms: float, erro: bool):
+    faixa = len(HIBP_LATENCY_BUCKETS_MS)
+    for i, limite in enumerate(HIBP_LATENCY_BUCKETS_MS):
+        if ms <= limite:
+            faixa = i
+            break
+    with _latency_lock:
+        _latency_counts[faixa] += 1
+        _latency_total["count"] += 1
+        _latency_total["sum_ms"] += ms
+        if erro:
+            _latency_total["errors"] += 1
+
+
+def latency_histogram() -> dict:
+    """Histograma de latência das chamadas à API (contagem por faixa, em ms)."""
+    with _latency_lock:
+        faixas = {f"le_{limite}": c for limite, c in zip(HIBP_LATENCY_BUCKETS_MS, _latency_counts)}
+        faixas["le_inf"] = _latency_counts[-1]
+        return {
+            "buckets_ms": faixas,
+            "count": _latency_total["count"],
+            "sum_ms": round(_latency_total["sum_ms"], 3),
+            "errors": _latency_total["errors"],
+            "in_flight": _in_flight,
+        }
+
+
+def reset_latency():
+    with _latency_lock:
+        for i in range(len(_latency_counts)):
+            _latency_counts[i] = 0
+        _latency_total.update(count=0, sum_ms=0.0, errors=0)
+
+
+def fetch_range(prefix: str) -> Optional[str]:
+    """Busca a faixa do prefixo na API do HIBP. Retorna None em erro/status != 200.
+
+    Sem vaga entre as `HIBP_MAX_CONCURRENCY` chamadas simultâneas dentro do
+    timeout, desiste (TimeoutError) em vez de enfileirar indefinidamente.
+    """
+    global _in_flight
+    if not _http_slots.acquire(timeout=HIBP_TIMEOUT_SECONDS):
+        raise TimeoutError("Limite de consultas simultâneas ao HIBP atingido")
+    with _latency_lock:
+        _in_flight += 1
+    inicio = time.perf_counter()
+    erro = True
+    try:
+        resp = _session.get(HIBP_RANGE_URL.format(prefix=prefix), timeout=HIBP_TIMEOUT_SECONDS)
+        erro = resp.status_code != 200
+        return None if erro else resp.text
+    finally:
+        with _latency_lock:
+            _in_flight -= 1
+        _http_slots.release()
+        _record_latency((time.perf_counter() - inicio) * 1000, erro)
+
+
+# ============ ÍNDICE OFFLINE ============
+
+def _lower_bound(mm, alvo: bytes, lo: int, hi: int) -> int:
+    """Menor início de linha em [lo, hi) cujo hash é >= alvo (hi se nenhum).
+
+    `lo` precisa ser início de linha; `hi` início de linha ou fim do arquivo.
+    """
+    while lo < hi:
+        mid = (lo + hi) // 2
+        nl = mm.rfind(b"\n", lo, mid)
+        inicio = nl + 1 if nl >= 0 else lo
+        if mm[inicio:inicio + len(alvo)] < alvo:
+            fim = mm.find(b"\n", inicio)
+            lo = fim + 1 if fim >= 0 else hi
+        else:
+            hi = inicio
+    return lo
+
+
+def build_index(path: str) -> str:
+    """Gera `<path>.idx` com o deslocamento de início de cada prefixo de 5 caracteres.
+
+    Usa busca binária por prefixo sobre o arquivo mapeado em memória, então o
+    custo é ~1M buscas e não uma leitura linha a linha do arquivo inteiro.
+    """
+    offsets = array("Q", bytes(8 * (_PREFIXES + 1)))
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        tamanho = len(mm)
+        inicio = 0
+        for p in range(_PREFIXES):
+            inicio = _lower_bound(mm, f"{p:05X}".encode(), inicio, tamanho)
+            offsets[p] = inicio
+        offsets[_PREFIXES] = tamanho
+    idx_path = f"{path}.idx"
+    with open(idx_path, "wb") as out:
+        offsets.tofile(out)
+    return idx_path
+
+
+def _load_offline() -> Optional[Tuple[str, mmap.mmap, Optional[array]]]:
+    global _offline
+    if not HIBP_OFFLINE_FILE:
+        return None
+    with _offline_lock:
+        if _offline is None or _offline[0] != HIBP_OFFLINE_FILE:
+            with open(HIBP_OFFLINE_FILE, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            offsets = None
+            idx_path = f"{HIBP_OFFLINE_FILE}.idx"
+            if os.path.exists(idx_path):
+                offsets = array("Q")
+                with open(idx_path, "rb") as f:
+                    offsets.fromfile(f, _PREFIXES + 1)
+            _offline = (HIBP_OFFLINE_FILE, mm, offsets)
+        return _offline
+
+
+def _offline_count(prefix: str, suffix: str) -> int:
+    _, mm, offsets = _load_offline()
+    alvo = f"{prefix}{suffix}".encode()
+    if offsets is not None:
+        p = int(prefix, 16)
+        inicio, fim = offsets[p], offsets[p + 1]
+    else:
+        inicio, fim = 0, len(mm)
+    pos = _lower_bound(mm, alvo, inicio, fim)
+    if mm[pos:pos + len(alvo) + 1] != alvo + b":":
+        return 0
+    fim_linha = mm.find(b"\n", pos)
+    linha = mm[pos:fim_linha if fim_linha >= 0 else len(mm)]
+    return int(linha.split(b":")[1].strip() or 0)
+
+
+def reset():
+    """Descarta o índice offline carregado (troca de arquivo em runtime/testes)."""
+    global _offline
+    with _offline_lock:
+        if _offline is not None:
+            _offline[1].close()
+        _offline = None
+
+
+# ============ API ============
+
+def pwned_count(senha: str) -> int:
+    """Quantas vezes a senha aparece em vazamentos (0 se não encontrada ou sem dados).
+
+    Ordem: índice offline → cache de faixas → API do HIBP (salvo HIBP_OFFLINE_ONLY).
+    Erros de rede propagam; quem chama decide se bloqueia ou não.
+    """
+    prefix, suffix = _sha1(senha)
+    if HIBP_OFFLINE_FILE:
+        return _offline_count(prefix, suffix)
+
+    body = _read_cached_range(prefix)
+    if body is None:
+        if HIBP_OFFLINE_ONLY:
+            return 0
+        body = fetch_range(prefix)
+        if body is None:
+            return 0
+        _write_cached_range(prefix, body)
+    return _count_in_range(body, suffix)
+
+
+def is_pwned(senha: str) -> bool:
+    return pwned_count(senha) > 0
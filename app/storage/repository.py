@@ -1,10 +1,13 @@
+from collections.abc import Mapping
+from datetime import date
 from typing import List, Optional, Dict, Any
-from .db import get_connection
+from .db import get_connection, is_shared_connection, mark_write
+from . import events
+from .models import ClientOut
+from . import password_pool, pwned_passwords
 import sqlite3
-import bcrypt
+from concurrent.futures import ThreadPoolExecutor
 import re
-import hashlib
-import requests
 
 
 def _compute_score(saldo: Optional[float]) -> Optional[float]:
@@ -13,13 +16,13 @@ def _compute_score(saldo: Optional[float]) -> Optional[float]:
 
 
 def _hash_password(senha: str) -> str:
-    """Hash de senha usando bcrypt."""
-    return bcrypt.hashpw(senha.encode(), bcrypt.gensalt()).decode()
+    """Hash de senha usando bcrypt (executado no pool dedicado de senhas)."""
+    return password_pool.hash_password(senha)
 
 
 def _verify_password(senha: str, senha_hash: str) -> bool:
-    """Verifica se senha corresponde ao hash."""
-    return bcrypt.checkpw(senha.encode(), senha_hash.encode())
+    """Verifica se senha corresponde ao hash (executado no pool dedicado de senhas)."""
+    return password_pool.verify_password(senha, senha_hash)
 
 
 def _validate_password_strength(senha: str):
@@ -42,30 +45,37 @@ def _validate_password_strength(senha: str):
 
 
 def _is_password_pwned(senha: str) -> bool:
-    """Consulta HIBP Pwned Passwords via k-anonimidade. Retorna True se comprometida.
+    """Consulta HIBP Pwned Passwords (índice offline, cache local ou API). Retorna True se comprometida.
     Em erro de rede, não bloqueia (retorna False).
     """
     try:
-        sha1 = hashlib.sha1(senha.encode("utf-8")).hexdigest().upper()
-        prefix, suffix = sha1[:5], sha1[5:]
-        url = f"https://api.pwnedpasswords.com/range/{prefix}"
-        resp = requests.get(url, timeout=2)
-        if resp.status_code != 200:
-            return False
-        lines = resp.text.splitlines()
-        for line in lines:
-            parts = line.split(":")
-            if len(parts) != 2:
-                continue
-            suf, count = parts
-            if suf.upper() == suffix:
-                return int(count) > 0
-        return False
+        return pwned_passwords.is_pwned(senha)
     except Exception:
         # Falha de rede: não bloquear usuário
         return False
 
 
+# Threads para a consulta ao HIBP (I/O), que roda enquanto o bcrypt calcula o hash
+_pwned_executor = ThreadPoolExecutor(max_workers=pwned_passwords.HIBP_MAX_CONCURRENCY, thread_name_prefix="hibp")
+
+
+def _check_and_hash_password(senha: str) -> str:
+    """Valida a senha e gera o hash, consultando o HIBP em paralelo ao bcrypt.
+
+    O hash é descartado se a senha estiver comprometida.
+    """
+    _validate_password_strength(senha)
+    pwned = _pwned_executor.submit(_is_password_pwned, senha)
+    try:
+        senha_hash = _hash_password(senha)
+    except Exception:
+        pwned.cancel()
+        raise
+    if pwned.result():
+        raise ValueError("Senha comprometida em vazamentos. Escolha outra.")
+    return senha_hash
+
+
 def _execute_query(conn, cur, query_sqlite: str, query_postgres: str, params: tuple):
     """Executa a query usando o dialeto correto conforme o driver.
 
@@ -89,41 +99,94 @@ def _execute_query(conn, cur, query_sqlite: str, query_postgres: str, params: tu
         raise
 
 
-def _row_to_client(row) -> Dict[str, Any]:
+_CLIENT_FIELDS = (
+    "id", "nome", "telefone", "email", "data_nascimento", "correntista",
+    "score_credito", "saldo_cc", "patrimonio_investimento", "total_investido_ativo",
+)
+_CLIENT_FIELD_SET = frozenset(_CLIENT_FIELDS)
+
+
+class ClientRecord(Mapping):
+    """Cliente lido do banco, com `__slots__` em vez de um dict por linha.
+
+    Continua um Mapping (`c["email"]`, `c.get(...)`, `{**c}`, igualdade com
+    dict), então quem tratava o cliente como dict não muda. Imutável.
+    """
+    __slots__ = _CLIENT_FIELDS
+
+    def __init__(self, id, nome, telefone, email, data_nascimento, correntista,
+                 score_credito, saldo_cc, patrimonio_investimento, total_investido_ativo):
+        self.id = id
+        self.nome = nome
+        self.telefone = telefone
+        self.email = email
+        self.data_nascimento = data_nascimento
+        self.correntista = correntista
+        self.score_credito = score_credito
+        self.saldo_cc = saldo_cc
+        self.patrimonio_investimento = patrimonio_investimento
+        self.total_investido_ativo = total_investido_ativo
+
+    def __getitem__(self, campo):
+        if campo not in _CLIENT_FIELD_SET:
+            raise KeyError(campo)
+        return getattr(self, campo)
+
+    def __iter__(self):
+        return iter(_CLIENT_FIELDS)
+
+    def __len__(self):
+        return len(_CLIENT_FIELDS)
+
+    def __repr__(self):
+        return f"ClientRecord({dict(self)!r})"
+
+    def to_model(self) -> ClientOut:
+        """ClientOut sem revalidação: os dados foram validados quando este repositório os gravou."""
+        nascimento = self.data_nascimento
+        if isinstance(nascimento, str):
+            # SQLite devolve DATE como texto
+            nascimento = date.fromisoformat(nascimento)
+        return ClientOut.model_construct(
+            id=self.id,
+            nome=self.nome,
+            telefone=self.telefone,
+            email=self.email,
+            data_nascimento=nascimento,
+            correntista=self.correntista,
+            score_credito=self.score_credito,
+            saldo_cc=self.saldo_cc,
+            patrimonio_investimento=self.patrimonio_investimento,
+            total_investido_ativo=self.total_investido_ativo,
+        )
+
+
+def _row_to_client(row) -> ClientRecord:
     saldo = float(row[7]) if row[7] is not None else None
     score = float(row[6]) if row[6] is not None else _compute_score(saldo)
     patrimonio_inv = float(row[8]) if len(row) > 8 and row[8] is not None else 0.0
-    return {
-        "id": row[0],
-        "nome": row[1],
-        "telefone": int(row[2]),
-        "email": row[3],
-        "data_nascimento": row[4],
-        "correntista": bool(row[5]),
-        "score_credito": score,
-        "saldo_cc": saldo,
-        "patrimonio_investimento": patrimonio_inv,
-    }
+    total_ativo = float(row[9]) if len(row) > 9 and row[9] is not None else None
+    return ClientRecord(
+        row[0], row[1], int(row[2]), row[3], row[4], bool(row[5]),
+        score, saldo, patrimonio_inv, total_ativo,
+    )
 
 
 def _should_close_connection(conn) -> bool:
-    """Verifica se a conexão deve ser fechada (não está em cache)."""
-    # Se a conexão não é a do cache, deve ser fechada
-    if hasattr(get_connection, "_test_cache"):
-        return conn is not get_connection._test_cache
-    return True
+    """Verifica se a conexão deve ser fechada (não é reaproveitada)."""
+    return not is_shared_connection(conn)
 
 
-def list_clients() -> List[Dict[str, Any]]:
-    conn = get_connection()
+def list_clients() -> List[ClientRecord]:
+    conn = get_connection(read_only=True)
     should_close = _should_close_connection(conn)
     try:
         cur = conn.cursor()
         _execute_query(
             conn,
             cur,
-            "SELECT id, nome, telefone, email, data_nascimento, correntista, score_credito, saldo_cc, patrimonio_investimento FROM clients",
-            "SELECT id, nome, telefone, email, data_nascimento, correntista, score_credito, saldo_cc, patrimonio_investimento FROM clients",
+            "SELECT id, nome, telefone, email, data_nascimento, correntista, score_credito, saldo_cc, patrimonio_investimento, total_investido_ativo FROM clients",
+            "SELECT id, nome, telefone, email, data_nascimento, correntista, score_credito, saldo_cc, patrimonio_investimento, total_investido_ativo FROM clients",
             ()
         )
         rows = cur.fetchall()
@@ -133,16 +196,17 @@ def list_clients() -> List[Dict[str, Any]]:
             conn.close()
 
 
-def get_client(client_id: int) -> Optional[Dict[str, Any]]:
-    conn = get_connection()
+def get_client(client_id: int, read_only: bool = True) -> Optional[ClientRecord]:
+    """Cliente por id. Pode vir de uma réplica, salvo escrita recente do próprio cliente."""
+    conn = get_connection(read_only=read_only, chave=("cliente", client_id))
     should_close = _should_close_connection(conn)
     try:
         cur = conn.cursor()
         _execute_query(
             conn,
             cur,
-            "SELECT id, nome, telefone, email, data_nascimento, correntista, score_credito, saldo_cc, patrimonio_investimento FROM clients WHERE id = ?",
-            "SELECT id, nome, telefone, email, data_nascimento, correntista, score_credito, saldo_cc, patrimonio_investimento FROM clients WHERE id = %s",
+            "SELECT id, nome, telefone, email, data_nascimento, correntista, score_credito, saldo_cc, patrimonio_investimento, total_investido_ativo FROM clients WHERE id = ?",
+            "SELECT id, nome, telefone, email, data_nascimento, correntista, score_credito, saldo_cc, patrimonio_investimento, total_investido_ativo FROM clients WHERE id = %s",
             (client_id,)
         )
         row = cur.fetchone()
@@ -152,19 +216,51 @@ def get_client(client_id: int) -> Optional[Dict[str, Any]]:
             conn.close()
 
 
+def get_client_version(client_id: int) -> Optional[int]:
+    """Versão do cliente (`clients.versao`), ou None se não existe.
+
+    Incrementada a cada escrita que muda o cliente ou os investimentos dele;
+    é a única leitura das requisições condicionais que terminam em 304.
+    Mesma réplica/primário que `get_client` usaria.
+    """
+    conn = get_connection(read_only=True, chave=("cliente", client_id))
+    should_close = _should_close_connection(conn)
+    try:
+        cur = conn.cursor()
+        _execute_query(
+            conn,
+            cur,
+            "SELECT versao FROM clients WHERE id = ?",
+            "SELECT versao FROM clients WHERE id = %s",
+            (client_id,)
+        )
+        row = cur.fetchone()
+        return int(row[0]) if row else None
+    finally:
+        if should_close:
+            conn.close()
+
+
 def _ensure_unique(conn, email: str, telefone: int, exclude_id: Optional[int] = None):
+    """Verifica unicidade de email e telefone com duas consultas pontuais.
+
+    Um único `email = ? OR telefone = ?` impede o uso limpo dos índices únicos;
+    separadas, cada consulta é uma busca no próprio índice (ver `db.INDEXES`).
+    """
     cur = conn.cursor()
-    params = [email, telefone]
-    query_sqlite = "SELECT id FROM clients WHERE (email = ? OR telefone = ?)"
-    query_postgres = "SELECT id FROM clients WHERE (email = %s OR telefone = %s)"
-    if exclude_id is not None:
-        query_sqlite += " AND id <> ?"
-        query_postgres += " AND id <> %s"
-        params.append(exclude_id)
-    _execute_query(conn, cur, query_sqlite, query_postgres, tuple(params))
-    row = cur.fetchone()
-    if row:
-        raise ValueError("Email ou telefone já cadastrado")
+    for coluna, valor in (("email", email), ("telefone", telefone)):
+        if valor is None:
+            continue
+        params = [valor]
+        query_sqlite = f"SELECT id FROM clients WHERE {coluna} = ?"
+        query_postgres = f"SELECT id FROM clients WHERE {coluna} = %s"
+        if exclude_id is not None:
+            query_sqlite += " AND id <> ?"
+            query_postgres += " AND id <> %s"
+            params.append(exclude_id)
+        _execute_query(conn, cur, query_sqlite + " LIMIT 1", query_postgres + " LIMIT 1", tuple(params))
+        if cur.fetchone():
+            raise ValueError("Email ou telefone já cadastrado")
 
 
 def create_client(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -177,10 +273,7 @@ def create_client(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         # Validar e gerar hash da senha se fornecida
         senha_hash = None
         if "senha" in data:
-            _validate_password_strength(data["senha"])
-            if _is_password_pwned(data["senha"]):
-                raise ValueError("Senha comprometida em vazamentos. Escolha outra.")
-            senha_hash = _hash_password(data["senha"])
+            senha_hash = _check_and_hash_password(data["senha"])
         
         params_pg = (
             data["nome"],
@@ -230,7 +323,9 @@ def create_client(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         conn.commit()
         
         if new_id is not None:
-            return get_client(int(new_id))
+            mark_write(("cliente", int(new_id)))
+            events.publish(conn, int(new_id), "cliente")
+            return get_client(int(new_id), read_only=False)
         return None
     finally:
         if should_close:
@@ -241,7 +336,8 @@ def update_client(client_id: int, data: Dict[str, Any]) -> Optional[Dict[str, An
     import logging
     logger = logging.getLogger("storage")
     
-    current = get_client(client_id)
+    # Do primário: o merge abaixo não pode partir de uma cópia atrasada
+    current = get_client(client_id, read_only=False)
     if not current:
         logger.error(f"update_client: Cliente {client_id} não encontrado")
         return None
@@ -252,10 +348,7 @@ def update_client(client_id: int, data: Dict[str, Any]) -> Optional[Dict[str, An
     
     # Hash da senha se fornecida
     if "senha" in data:
-        _validate_password_strength(data["senha"])
-        if _is_password_pwned(data["senha"]):
-            raise ValueError("Senha comprometida em vazamentos. Escolha outra.")
-        data["senha_hash"] = _hash_password(data.pop("senha"))
+        data["senha_hash"] = _check_and_hash_password(data.pop("senha"))
 
     # Aplicar delta SOMENTE se não vier patrimonio_investimento direto
     if data.get("patrimonio_investimento_delta") is not None and "patrimonio_investimento" not in data:
@@ -307,7 +400,7 @@ def update_client(client_id: int, data: Dict[str, Any]) -> Optional[Dict[str, An
         try:
               print(f"DEBUG: Tentando UPDATE com SQLite placeholders (?)")
               cur.execute(  # pragma: no cover - caminho SQLite
-                """UPDATE clients SET nome=?, telefone=?, email=?, data_nascimento=?, correntista=?, score_credito=?, saldo_cc=?, patrimonio_investimento=?, senha_hash=? 
+                """UPDATE clients SET nome=?, telefone=?, email=?, data_nascimento=?, correntista=?, score_credito=?, saldo_cc=?, patrimonio_investimento=?, senha_hash=?, versao=versao + 1
                    WHERE id=?""",
                 params
             )
@@ -317,7 +410,7 @@ def update_client(client_id: int, data: Dict[str, Any]) -> Optional[Dict[str, An
               try:
                   print(f"DEBUG: Tentando UPDATE com PostgreSQL placeholders (%s)")
                   cur.execute(  # pragma: no cover - caminho PostgreSQL
-                    """UPDATE clients SET nome=%s, telefone=%s, email=%s, data_nascimento=%s, correntista=%s, score_credito=%s, saldo_cc=%s, patrimonio_investimento=%s, senha_hash=%s 
+                    """UPDATE clients SET nome=%s, telefone=%s, email=%s, data_nascimento=%s, correntista=%s, score_credito=%s, saldo_cc=%s, patrimonio_investimento=%s, senha_hash=%s, versao=versao + 1
                        WHERE id=%s""",
                     params
                 )
@@ -338,8 +431,10 @@ def update_client(client_id: int, data: Dict[str, Any]) -> Optional[Dict[str, An
             # SQLite: sempre fazer commit
             conn.commit()
             logger.info(f"update_client: {client_id} commit manual realizado (SQLite)")
+        mark_write(("cliente", client_id))
+        events.publish(conn, client_id, "cliente")
         
-        result = get_client(client_id)
+        result = get_client(client_id, read_only=False)
         if result:
             print(f"DEBUG: Pós-UPDATE verificação - patrimonio_investimento={result.get('patrimonio_investimento')}")
             logger.info(f"update_client: {client_id} verificação pós-update saldo_cc={result.get('saldo_cc')}, patrimonio={result.get('patrimonio_investimento')}")
@@ -361,12 +456,38 @@ def delete_client(client_id: int) -> bool:
             cur.execute("DELETE FROM clients WHERE id = %s", (client_id,))
         
         conn.commit()
-        return cur.rowcount > 0
+        mark_write(("cliente", client_id))
+        removido = cur.rowcount > 0
+        if removido:
+            events.publish(conn, client_id, "cliente")
+        return removido
     finally:
         if should_close:
             conn.close()
 
 
+def _rehash_password(conn, client_id: int, senha: str):
+    """Regrava o hash de senha com o custo atual após um login bem-sucedido.
+
+    Falhas aqui não impedem o login: o hash antigo continua válido.
+    """
+    import logging
+    logger = logging.getLogger("storage")
+    try:
+        novo_hash = _hash_password(senha)
+        cur = conn.cursor()
+        _execute_query(
+            conn,
+            cur,
+            "UPDATE clients SET senha_hash = ? WHERE id = ?",
+            "UPDATE clients SET senha_hash = %s WHERE id = %s",
+            (novo_hash, client_id)
+        )
+        conn.commit()
+    except Exception as e:
+        logger.warning(f"login_client: falha ao atualizar custo do hash do cliente {client_id}: {e}")
+
+
 def login_client(email: str, senha: str) -> Optional[Dict[str, Any]]:
     """Autentica cliente por email e senha. Retorna cliente se sucesso, None se falha."""
     conn = get_connection()
@@ -388,6 +509,10 @@ def login_client(email: str, senha: str) -> Optional[Dict[str, Any]]:
         senha_hash = row[8]
         if not senha_hash or not _verify_password(senha, senha_hash):
             return None
+
+        # Hash com custo diferente do configurado (BCRYPT_ROUNDS): regrava com o custo atual
+        if password_pool.needs_rehash(senha_hash):
+            _rehash_password(conn, row[0], senha)
         
         # Retorna cliente sem exposição de hash
         return _row_to_client(row[:8])
@@ -424,10 +549,7 @@ def update_password(email: str, nova_senha: str) -> bool:
             return False
         
         # Validação e hash da nova senha
-        _validate_password_strength(nova_senha)
-        if _is_password_pwned(nova_senha):
-            raise ValueError("Senha comprometida em vazamentos. Escolha outra.")
-        novo_hash = _hash_password(nova_senha)
+        novo_hash = _check_and_hash_password(nova_senha)
         
         # Atualiza senha
         try:
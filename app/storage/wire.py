@@ -0,0 +1,56 @@
+"""Negociação do formato das respostas do storage (JSON ou msgpack).
+
+O gateway pede msgpack com `Accept: application/msgpack` quando configurado
+(`STORAGE_WIRE_FORMAT=msgpack`); qualquer outro cliente continua recebendo
+JSON. msgpack é opcional: sem o pacote instalado, o storage só fala JSON.
+"""
+import os
+from typing import Optional
+
+from fastapi.responses import Response
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende do ambiente
+    msgpack = None
+
+MSGPACK = "application/msgpack"
+JSON = "application/json"
+
+# Atende pedidos de msgpack (0 desliga, mesmo com o pacote instalado)
+STORAGE_MSGPACK = os.getenv("STORAGE_MSGPACK", "1").lower() not in ("0", "false", "no")
+
+# Toda resposta negociada varia com o Accept (caches intermediários)
+VARY = {"Vary": "Accept"}
+
+
+def parse_qualities(cabecalho: str) -> dict:
+    """Mapeia valor -> q a partir de um cabeçalho de negociação (Accept, Accept-Encoding)."""
+    qualidades = {}
+    for parte in cabecalho.split(","):
+        tipo, *params = [p.strip() for p in parte.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if tipo:
+            qualidades[tipo.lower()] = q
+    return qualidades
+
+
+def accepts_msgpack(accept: Optional[str]) -> bool:
+    """True se o cliente prefere msgpack a JSON e o storage pode atendê-lo."""
+    if not accept or msgpack is None or not STORAGE_MSGPACK:
+        return False
+    qualidades = parse_qualities(accept)
+    q_msgpack = qualidades.get(MSGPACK, 0.0)
+    q_json = max(qualidades.get(JSON, 0.0), qualidades.get("*/*", 0.0))
+    return q_msgpack > 0 and q_msgpack >= q_json
+
+
+def msgpack_response(dados) -> Response:
+    """Resposta msgpack de uma estrutura JSON-compatível (datas já como texto)."""
+    return Response(content=msgpack.packb(dados), media_type=MSGPACK, headers=VARY)
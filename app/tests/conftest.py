@@ -8,6 +8,8 @@ def setup_test_db():
     """Inicializa o banco de dados de teste"""
     # Garantir que usamos sqlite para testes
     os.environ.pop("DB_HOST", None)
+    from storage import db
+    db.configure("sqlite://")
     
     # Importar init_db e inicializar
     from storage.db import init_db
@@ -29,21 +31,28 @@ def clean_db():
     yield
 
 
+@pytest.fixture(autouse=True)
+def reset_gateway_client_cache():
+    """Cada teste começa com o cache de clientes do gateway vazio."""
+    from gateway import client_cache
+    client_cache.reset()
+    yield
+
+
 @pytest.fixture(autouse=True)
 def override_gateway_client():
     """Garante cliente HTTP fake para o gateway em todos os testes."""
     try:
         from gateway import main as gw_main
 
-        class _DummyResponse:
-            def __init__(self, data, status):
-                self._data = data
-                self.status_code = status
-            def json(self):
-                return self._data
-            def raise_for_status(self):
-                if self.status_code >= 400:
-                    raise Exception(f"HTTP {self.status_code}")
+        import httpx
+
+        def _DummyResponse(data, status):
+            """Resposta do storage fake: corpo JSON em bytes e cabeçalhos reais, como o httpx entrega."""
+            request = httpx.Request("GET", "http://storage")
+            if data is None:
+                return httpx.Response(status, request=request)
+            return httpx.Response(status, json=data, request=request)
 
         class _DummyClient:
             def __init__(self):
@@ -52,7 +61,7 @@ def override_gateway_client():
                     2: {"id": 2, "nome": "Maria", "email": "maria@test.com", "telefone": 987654321, "correntista": False, "data_nascimento": "2000-01-02", "score_credito": None, "saldo_cc": 0},
                 }
                 self.next_id = 3
-            def get(self, path):
+            def get(self, path, headers=None):
                 if path == "/clients":
                     return _DummyResponse(list(self.db.values()), 200)
                 if path.startswith("/clients/"):
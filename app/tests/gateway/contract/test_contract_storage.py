@@ -6,12 +6,8 @@ from fastapi.testclient import TestClient
 # Para testes com fallback SQLite, não precisa mais de Java ou H2
 pytestmark = pytest.mark.skipif(False, reason="")
 
-# Configurar para usar fallback SQLite em memória
-os.environ.setdefault("DB_HOST", "localhost")
-os.environ.setdefault("DB_PORT", "5432")
-os.environ.setdefault("DB_NAME", "test_db")
-os.environ.setdefault("DB_USER", "postgres")
-os.environ.setdefault("DB_PASS", "postgres")
+# Configurar para usar SQLite em memória
+os.environ.setdefault("DATABASE_URL", "sqlite://")
 
 from storage.main import app as storage_app
 from storage.db import init_db
@@ -0,0 +1,162 @@
+from unittest.mock import MagicMock, patch
+
+import httpx
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from gateway import client_cache
+from gateway.main import app
+
+
+class _Storage:
+    """Dublê do storage: GET /clients/{id} com ETag pela versão do cliente."""
+
+    def __init__(self):
+        self.clientes = {1: {"id": 1, "nome": "João", "saldo_cc": 100.0}}
+        self.versoes = {1: 1}
+        self.chamadas = []
+
+    def get(self, path, headers=None):
+        self.chamadas.append((path, dict(headers or {})))
+        cliente_id = int(path.rsplit("/", 1)[-1])
+        pedido = httpx.Request("GET", f"http://storage{path}")
+        if cliente_id not in self.clientes:
+            return httpx.Response(404, json={"detail": "Cliente não encontrado"}, request=pedido)
+        etag = f'W/"c{cliente_id}v{self.versoes[cliente_id]}"'
+        if (headers or {}).get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"etag": etag}, request=pedido)
+        return httpx.Response(200, content=orjson.dumps(self.clientes[cliente_id]),
+                              headers={"content-type": "application/json", "etag": etag}, request=pedido)
+
+    def escrever(self, cliente_id, **dados):
+        self.clientes[cliente_id].update(dados)
+        self.versoes[cliente_id] += 1
+
+    def put(self, path, json=None):
+        cliente_id = int(path.rsplit("/", 1)[-1])
+        self.escrever(cliente_id, **json)
+        corpo = {"email": "j@x.com", "telefone": 1, "correntista": True, **self.clientes[cliente_id]}
+        return httpx.Response(200, json=corpo, request=httpx.Request("PUT", f"http://storage{path}"))
+
+    def delete(self, path):
+        # DELETE /investments/{id}: o dono do investimento vem no cabeçalho
+        return httpx.Response(204, headers={"x-cliente-id": "1"}, request=httpx.Request("DELETE", f"http://storage{path}"))
+
+
+@pytest.fixture
+def storage():
+    return _Storage()
+
+
+def test_fresh_entries_skip_storage(storage):
+    primeira = client_cache.get(storage, 1)
+    assert primeira.dados["nome"] == "João"
+    assert primeira.etag == 'W/"c1v1"'
+    assert client_cache.get(storage, 1) is primeira
+    assert len(storage.chamadas) == 1
+    assert client_cache.stats()["hits"] == 1
+    assert client_cache.stats()["misses"] == 1
+
+
+def test_stale_entries_revalidate_with_storage_version(storage, monkeypatch):
+    monkeypatch.setattr(client_cache, "CLIENT_CACHE_TTL_SECONDS", 0)
+    client_cache.get(storage, 1)
+    assert client_cache.get(storage, 1).dados["nome"] == "João"
+    assert storage.chamadas[-1][1]["If-None-Match"] == 'W/"c1v1"'
+    assert client_cache.stats()["revalidated"] == 1
+
+    # Escrita feita por outra instância: a versão nova chega na revalidação
+    storage.escrever(1, nome="Outro")
+    assert client_cache.get(storage, 1).dados["nome"] == "Outro"
+    assert client_cache.stats()["misses"] == 2
+
+
+def test_missing_client_and_errors(storage):
+    assert client_cache.get(storage, 99) is None
+    assert client_cache.stats()["size"] == 0
+
+    falha = MagicMock()
+    falha.get.return_value = httpx.Response(500, request=httpx.Request("GET", "http://storage/clients/1"))
+    with pytest.raises(httpx.HTTPStatusError):
+        client_cache.get(falha, 1)
+
+
+def test_lru_eviction(storage, monkeypatch):
+    monkeypatch.setattr(client_cache, "CLIENT_CACHE_SIZE", 2)
+    for cliente_id in (1, 2, 3):
+        storage.clientes[cliente_id] = {"id": cliente_id}
+        storage.versoes[cliente_id] = 1
+    client_cache.get(storage, 1)
+    client_cache.get(storage, 2)
+    client_cache.get(storage, 1)
+    client_cache.get(storage, 3)
+    assert client_cache.stats()["evictions"] == 1
+    # O 2 foi o menos usado recentemente
+    chamadas = len(storage.chamadas)
+    client_cache.get(storage, 1)
+    assert len(storage.chamadas) == chamadas
+    client_cache.get(storage, 2)
+    assert len(storage.chamadas) == chamadas + 1
+
+
+def test_invalidate(storage):
+    client_cache.get(storage, 1)
+    client_cache.invalidate(1)
+    client_cache.invalidate(1)
+    assert client_cache.stats()["invalidations"] == 1
+    client_cache.get(storage, 1)
+    client_cache.invalidate()
+    assert client_cache.stats()["size"] == 0
+    assert len(storage.chamadas) == 2
+
+
+def test_disabled(storage, monkeypatch):
+    monkeypatch.setattr(client_cache, "CLIENT_CACHE_SIZE", 0)
+    client_cache.get(storage, 1)
+    client_cache.get(storage, 1)
+    assert len(storage.chamadas) == 2
+    assert client_cache.stats()["size"] == 0
+    assert client_cache.get(storage, 99) is None
+
+
+def test_hit_ratio(storage):
+    assert client_cache.stats()["hit_ratio"] == 0.0
+    for _ in range(4):
+        client_cache.get(storage, 1)
+    assert client_cache.stats()["hit_ratio"] == 0.75
+
+
+@patch("gateway.main.get_dynamic_http_client")
+def test_gateway_routes_share_cache_and_writes_invalidate(mock_get_client, storage):
+    storage.clientes[1].update(perfil_investidor="MODERADO", total_investido_ativo=100.0, patrimonio_investimento=0.0)
+    mock_get_client.return_value = storage
+    http = TestClient(app)
+
+    for rota in ("/clients/1", "/clients/1/score", "/calculos/projecao/1", "/calculos/patrimonio/1"):
+        assert http.get(rota).status_code == 200
+    assert [p for p, _ in storage.chamadas] == ["/clients/1"]
+
+    http.put("/clients/1", json={"nome": "Novo"})
+    assert client_cache.stats()["size"] == 0
+    assert http.get("/clients/1").json()["nome"] == "Novo"
+    http.delete("/investments/7")
+    assert client_cache.stats()["size"] == 0
+
+    metricas = http.get("/metrics/client-cache").json()
+    assert metricas["hits"] == 3
+    assert metricas["invalidations"] == 2
+
+
+@patch("gateway.main.get_dynamic_http_client")
+def test_delete_investment_without_owner_header_invalidates_all(mock_get_client, storage):
+    storage.clientes[2] = {"id": 2}
+    storage.versoes[2] = 1
+    client_cache.get(storage, 1)
+    client_cache.get(storage, 2)
+    http_client = MagicMock()
+    http_client.delete.return_value = httpx.Response(204, request=httpx.Request("DELETE", "http://storage/"))
+    mock_get_client.return_value = http_client
+
+    assert TestClient(app).delete("/investments/7").status_code == 204
+    assert client_cache.stats()["size"] == 0
@@ -22,3 +22,30 @@ def test_post_register_calls_http_client():
 
         mock_instance.post.assert_called_with("/register", json=data)
         assert resp is mock_response
+
+
+def test_parse_json_uses_orjson_on_response_bytes():
+    import httpx
+
+    resp = httpx.Response(200, content=b'{"id": 1, "nome": "Jo\xc3\xa3o", "saldo_cc": 10.5}')
+    assert client_module.parse_json(resp) == {"id": 1, "nome": "João", "saldo_cc": 10.5}
+
+
+def test_storage_accept_follows_wire_format(monkeypatch):
+    monkeypatch.setattr(client_module, "STORAGE_WIRE_FORMAT", "json")
+    assert client_module.storage_accept() == "application/json"
+    monkeypatch.setattr(client_module, "STORAGE_WIRE_FORMAT", "msgpack")
+    monkeypatch.setattr(client_module, "msgpack", None)
+    assert client_module.storage_accept() == "application/json"
+    monkeypatch.setattr(client_module, "msgpack", object())
+    assert client_module.storage_accept().startswith("application/msgpack")
+
+
+def test_parse_json_decodes_msgpack_body():
+    import httpx
+    import pytest
+
+    msgpack = pytest.importorskip("msgpack")
+    corpo = msgpack.packb([{"id": 1, "data_aplicacao": "2024-01-01T00:00:00"}])
+    resp = httpx.Response(200, content=corpo, headers={"content-type": "application/msgpack"})
+    assert client_module.parse_json(resp) == [{"id": 1, "data_aplicacao": "2024-01-01T00:00:00"}]
@@ -0,0 +1,127 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from gateway import compression
+from gateway.main import app as gateway_app
+
+
+@pytest.mark.parametrize("accept,esperado", [
+    (None, None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("br;q=0.9, gzip;q=0.5", "gzip"),
+])
+def test_choose_encoding_without_brotli(monkeypatch, accept, esperado):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert compression.choose_encoding(accept) == esperado
+
+
+def test_choose_encoding_prefers_brotli_when_installed(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert compression.choose_encoding("gzip, br") == "br"
+    assert compression.choose_encoding("gzip, br;q=0.5") == "gzip"
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(compression.CompressionMiddleware, minimum_size=100)
+
+    @app.get("/grande")
+    def grande():
+        return Response("x" * 1000, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @app.get("/pequena")
+    def pequena():
+        return Response("x" * 10, media_type="application/json")
+
+    @app.get("/binaria")
+    def binaria():
+        return Response(b"\0" * 1000, media_type="application/octet-stream")
+
+    @app.get("/codificada")
+    def codificada():
+        return Response(gzip.compress(b"y" * 1000), media_type="text/html", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/pedacos")
+    def pedacos():
+        return StreamingResponse(iter([b"a" * 500, b"b" * 500]), media_type="text/plain")
+
+    @app.get("/eventos")
+    def eventos():
+        return StreamingResponse(iter([b"data: x\n\n" * 200]), media_type="text/event-stream")
+
+    return TestClient(app)
+
+
+def test_middleware_compresses_large_allowlisted_bodies():
+    resp = _app().get("/grande", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert int(resp.headers["content-length"]) < 1000
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert resp.headers["etag"] == 'W/"v1"'
+    assert resp.text == "x" * 1000
+
+
+@pytest.mark.parametrize("rota", ["/pequena", "/binaria", "/eventos"])
+def test_middleware_skips_small_or_non_allowlisted(rota):
+    resp = _app().get(rota, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resp.headers
+
+
+def test_middleware_leaves_encoded_responses_alone():
+    resp = _app().get("/codificada", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.text == "y" * 1000
+
+
+def test_middleware_without_accept_encoding():
+    resp = _app().get("/grande", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in resp.headers
+    assert resp.headers["etag"] == '"v1"'
+
+
+def test_middleware_compresses_streamed_bodies():
+    resp = _app().get("/pedacos", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "content-length" not in resp.headers
+    assert resp.text == "a" * 500 + "b" * 500
+
+
+def test_middleware_disabled(monkeypatch):
+    monkeypatch.setattr(compression, "COMPRESSION_ENABLED", False)
+    resp = _app().get("/grande", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resp.headers
+
+
+def test_gateway_compresses_pages():
+    resp = TestClient(gateway_app).get("/investments-page", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "<html" in resp.text.lower()
+
+
+@pytest.fixture
+def frontend(tmp_path):
+    (tmp_path / "pagina.html").write_text("<p>javer</p>" * 500)
+    (tmp_path / "app.js").write_text("console.log(1);" * 200)
+    (tmp_path / "mini.css").write_text("a{}")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" * 1000)
+    return tmp_path
+
+
+def test_precompress_writes_gzip_for_compressible_files(frontend):
+    gerados = compression.precompress(frontend)
+    nomes = {p.name for p in gerados if p.suffix == ".gz"}
+    assert nomes == {"pagina.html.gz", "app.js.gz"}
+    assert gzip.decompress((frontend / "pagina.html.gz").read_bytes()) == (frontend / "pagina.html").read_bytes()
+    # Build reprodutível: rodar de novo gera os mesmos bytes
+    antes = (frontend / "app.js.gz").read_bytes()
+    compression.precompress(frontend)
+    assert (frontend / "app.js.gz").read_bytes() == antes
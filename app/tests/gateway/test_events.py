@@ -0,0 +1,136 @@
+import threading
+
+import httpx
+import orjson
+import pytest
+
+from gateway import client_cache, events
+
+
+class _Storage:
+    def __init__(self):
+        self.versao = 1
+        self.chamadas = 0
+        self.durante_get = None
+
+    def get(self, path, headers=None):
+        self.chamadas += 1
+        if self.durante_get:
+            self.durante_get()
+        pedido = httpx.Request("GET", f"http://storage{path}")
+        etag = f'W/"c1v{self.versao}"'
+        if (headers or {}).get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"etag": etag}, request=pedido)
+        return httpx.Response(200, content=orjson.dumps({"id": 1, "versao": self.versao}),
+                              headers={"content-type": "application/json", "etag": etag}, request=pedido)
+
+
+@pytest.fixture
+def storage():
+    storage = _Storage()
+    client_cache.get(storage, 1)
+    return storage
+
+
+def test_handle_invalidates_client_or_everything(storage):
+    events.handle({"cliente_id": 2, "entidade": "cliente", "versao": 5})
+    assert client_cache.stats()["size"] == 1
+    events.handle({"cliente_id": 1, "entidade": "investimento", "versao": 2})
+    assert client_cache.stats()["size"] == 0
+
+    client_cache.get(storage, 1)
+    events.handle({"cliente_id": None, "entidade": "todos", "versao": None})
+    assert client_cache.stats()["size"] == 0
+
+
+def _sse(linhas):
+    corpo = "".join(f"{linha}\n\n" for linha in linhas).encode()
+
+    def responder(request):
+        assert request.url.path == "/events"
+        return httpx.Response(200, content=corpo, headers={"content-type": "text/event-stream"})
+
+    return httpx.Client(base_url="http://storage", transport=httpx.MockTransport(responder))
+
+
+def test_listen_applies_events_and_tracks_connection(storage, monkeypatch):
+    conectado = []
+    original = events.handle
+    monkeypatch.setattr(events, "handle", lambda e: (conectado.append(client_cache.stats()["events_connected"]), original(e)))
+
+    events.listen(_sse([": conectado", ": ping", 'data: {"cliente_id": 1, "entidade": "cliente", "versao": 2}']),
+                  threading.Event())
+    assert conectado == [True]
+    assert client_cache.stats()["size"] == 0
+    # Conexão encerrada: volta à janela curta
+    assert client_cache.stats()["events_connected"] is False
+
+
+def test_listen_raises_on_storage_error():
+    client = httpx.Client(base_url="http://storage", transport=httpx.MockTransport(lambda r: httpx.Response(404)))
+    with pytest.raises(httpx.HTTPStatusError):
+        events.listen(client, threading.Event())
+    assert client_cache.stats()["events_connected"] is False
+
+
+def test_connected_cache_uses_long_window_and_starts_empty(storage, monkeypatch):
+    monkeypatch.setattr(client_cache, "CLIENT_CACHE_TTL_SECONDS", 0)
+    client_cache.set_events_connected(True)
+    assert client_cache.stats()["size"] == 0
+    client_cache.get(storage, 1)
+    client_cache.get(storage, 1)
+    assert client_cache.stats()["hits"] == 1
+
+    client_cache.set_events_connected(False)
+    client_cache.get(storage, 1)
+    assert client_cache.stats()["revalidated"] == 1
+
+
+def test_read_in_flight_during_invalidation_is_not_fresh(storage):
+    client_cache.invalidate()
+    storage.durante_get = lambda: client_cache.invalidate(1)
+    client_cache.get(storage, 1)
+    storage.durante_get = None
+    chamadas = storage.chamadas
+    client_cache.get(storage, 1)
+    assert storage.chamadas == chamadas + 1
+    assert client_cache.stats()["revalidated"] == 1
+
+
+def test_start_and_stop(monkeypatch):
+    monkeypatch.setattr(events, "STORAGE_EVENTS_RETRY_SECONDS", 0.01)
+    chamadas = threading.Event()
+
+    def listen(client, parar):
+        chamadas.set()
+        raise httpx.ConnectError("storage fora")
+
+    monkeypatch.setattr(events, "listen", listen)
+    events.start()
+    thread = events._thread
+    events.start()
+    assert events._thread is thread
+    assert chamadas.wait(2)
+    events.stop()
+    thread.join(2)
+    assert not thread.is_alive()
+
+    monkeypatch.setattr(events, "STORAGE_EVENTS", False)
+    events.start()
+    assert events._thread is None
+
+
+def test_read_older_than_announced_version_is_revalidated_until_it_catches_up(storage):
+    client_cache.set_events_connected(True)
+    # Evento da versão 2; o storage ainda responde a 1 (réplica atrasada)
+    events.handle({"cliente_id": 1, "entidade": "cliente", "versao": 2})
+    assert client_cache.get(storage, 1).dados["versao"] == 1
+    chamadas = storage.chamadas
+    client_cache.get(storage, 1)
+    assert storage.chamadas == chamadas + 1
+
+    storage.versao = 2
+    assert client_cache.get(storage, 1).dados["versao"] == 2
+    chamadas = storage.chamadas
+    client_cache.get(storage, 1)
+    assert storage.chamadas == chamadas
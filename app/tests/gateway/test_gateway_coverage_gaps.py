@@ -4,6 +4,7 @@ from unittest.mock import Mock, patch, MagicMock
 from fastapi.testclient import TestClient
 from gateway.main import app
 from gateway import client as client_module
+from gateway.static_pages import FrontendFiles
 import httpx
 
 
@@ -60,50 +61,45 @@ def test_post_login_invalid_credentials():
 
 
 # ===== Tests for frontend pages when files don't exist =====
-@patch("gateway.main.Path.exists")
-def test_index_page_not_found(mock_exists):
+def test_index_page_not_found(monkeypatch, tmp_path):
     """Testa index page quando arquivo não existe"""
-    mock_exists.return_value = False
+    monkeypatch.setattr("gateway.main.FRONTEND", FrontendFiles(tmp_path))
     
     response = client.get("/")
     assert response.status_code == 200
     assert "não disponível" in response.json()["message"]
 
 
-@patch("gateway.main.Path.exists")
-def test_login_page_html_not_found(mock_exists):
+def test_login_page_html_not_found(monkeypatch, tmp_path):
     """Testa login.html quando arquivo não existe"""
-    mock_exists.return_value = False
+    monkeypatch.setattr("gateway.main.FRONTEND", FrontendFiles(tmp_path))
     
     response = client.get("/login.html")
     assert response.status_code == 200
     assert "não disponível" in response.json()["message"]
 
 
-@patch("gateway.main.Path.exists")
-def test_register_page_html_not_found(mock_exists):
+def test_register_page_html_not_found(monkeypatch, tmp_path):
     """Testa register.html quando arquivo não existe"""
-    mock_exists.return_value = False
+    monkeypatch.setattr("gateway.main.FRONTEND", FrontendFiles(tmp_path))
     
     response = client.get("/register.html")
     assert response.status_code == 200
     assert "não disponível" in response.json()["message"]
 
 
-@patch("gateway.main.Path.exists")
-def test_response_page_not_found(mock_exists):
+def test_response_page_not_found(monkeypatch, tmp_path):
     """Testa response page quando arquivo não existe"""
-    mock_exists.return_value = False
+    monkeypatch.setattr("gateway.main.FRONTEND", FrontendFiles(tmp_path))
     
     response = client.get("/response")
     assert response.status_code == 200
     assert "não disponível" in response.json()["message"]
 
 
-@patch("gateway.main.Path.exists")
-def test_dashboard_page_not_found(mock_exists):
+def test_dashboard_page_not_found(monkeypatch, tmp_path):
     """Testa dashboard page quando arquivo não existe"""
-    mock_exists.return_value = False
+    monkeypatch.setattr("gateway.main.FRONTEND", FrontendFiles(tmp_path))
     
     response = client.get("/dashboard")
     assert response.status_code == 200
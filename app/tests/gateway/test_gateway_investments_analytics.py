@@ -1,16 +1,21 @@
+import httpx
 import pytest
-from unittest.mock import patch, MagicMock, Mock
+from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 
 from gateway.main import app, MARKET_CACHE, CACHE_TTL_SECONDS
+from gateway.static_pages import FrontendFiles
 
 
 client = TestClient(app)
 
 
-@patch("gateway.main.FileResponse", side_effect=lambda path, media_type=None: {"path": str(path)})
-@patch("gateway.main.Path.exists", return_value=True)
-def test_frontend_pages_available(mock_exists, mock_file_response):
+def _resposta(status_code, dados=None):
+    """Resposta do storage como o httpx entrega ao gateway."""
+    return httpx.Response(status_code, json=dados, request=httpx.Request("GET", "http://storage"))
+
+
+def test_frontend_pages_available():
     routes = [
         "/",
         "/login",
@@ -27,10 +32,9 @@ def test_frontend_pages_available(mock_exists, mock_file_response):
         assert resp.status_code == 200
 
 
-@patch("gateway.main.Path.exists")
-def test_investments_pages_not_found(mock_exists):
+def test_investments_pages_not_found(monkeypatch, tmp_path):
     """Cover /investments-page and /investments.html when files are missing."""
-    mock_exists.return_value = False
+    monkeypatch.setattr("gateway.main.FRONTEND", FrontendFiles(tmp_path))
 
     resp_page = client.get("/investments-page")
     resp_html = client.get("/investments.html")
@@ -47,9 +51,7 @@ def test_investments_list_and_get(mock_get_client):
     mock_http_client = MagicMock()
     mock_get_client.return_value = mock_http_client
 
-    list_resp = Mock()
-    list_resp.status_code = 200
-    list_resp.json.return_value = [
+    list_resp = _resposta(200, [
         {
             "id": 1,
             "cliente_id": 1,
@@ -59,10 +61,8 @@ def test_investments_list_and_get(mock_get_client):
             "data_aplicacao": "2024-01-01T00:00:00",
             "rentabilidade": 0.0,
         },
-    ]
-    get_resp = Mock()
-    get_resp.status_code = 200
-    get_resp.json.return_value = list_resp.json.return_value[0]
+    ])
+    get_resp = _resposta(200, list_resp.json()[0])
     mock_http_client.get.side_effect = [list_resp, get_resp]
 
     response_list = client.get("/investments")
@@ -79,8 +79,7 @@ def test_investments_get_not_found(mock_get_client):
     mock_http_client = MagicMock()
     mock_get_client.return_value = mock_http_client
 
-    not_found = Mock()
-    not_found.status_code = 404
+    not_found = _resposta(404)
     mock_http_client.get.return_value = not_found
 
     resp = client.get("/investments/99")
@@ -94,8 +93,7 @@ def test_create_and_update_investment(mock_validar, mock_get_client):
     mock_http_client = MagicMock()
     mock_get_client.return_value = mock_http_client
 
-    create_resp = Mock(status_code=201)
-    create_resp.json.return_value = {
+    create_resp = _resposta(201, {
         "id": 10,
         "cliente_id": 1,
         "ticker": "AAPL",
@@ -104,9 +102,8 @@ def test_create_and_update_investment(mock_validar, mock_get_client):
         "rentabilidade": 0.0,
         "ativo": True,
         "data_aplicacao": "2024-01-01T00:00:00",
-    }
-    update_resp = Mock(status_code=200)
-    update_resp.json.return_value = {
+    })
+    update_resp = _resposta(200, {
         "id": 10,
         "cliente_id": 1,
         "ticker": "MSFT",
@@ -115,7 +112,7 @@ def test_create_and_update_investment(mock_validar, mock_get_client):
         "rentabilidade": 0.0,
         "ativo": True,
         "data_aplicacao": "2024-01-01T00:00:00",
-    }
+    })
     mock_http_client.post.return_value = create_resp
     mock_http_client.put.return_value = update_resp
 
@@ -151,7 +148,7 @@ def test_create_investment_ticker_invalido(mock_validar, mock_get_client):
 def test_update_investment_not_found(mock_get_client):
     """Update investment 404 propagates."""
     mock_http_client = MagicMock()
-    not_found = Mock(status_code=404)
+    not_found = _resposta(404)
     mock_http_client.put.return_value = not_found
     mock_get_client.return_value = mock_http_client
 
@@ -165,8 +162,8 @@ def test_delete_investment(mock_get_client):
     mock_http_client = MagicMock()
     mock_get_client.return_value = mock_http_client
 
-    ok_resp = Mock(status_code=204)
-    not_found_resp = Mock(status_code=404)
+    ok_resp = _resposta(204)
+    not_found_resp = _resposta(404)
     mock_http_client.delete.side_effect = [ok_resp, not_found_resp]
 
     resp_ok = client.delete("/investments/1")
@@ -182,15 +179,13 @@ def test_projecao_retorno_com_total(mock_get_client):
     mock_http_client = MagicMock()
     mock_get_client.return_value = mock_http_client
 
-    client_resp = Mock(status_code=200)
-    client_resp.json.return_value = {
+    client_resp = _resposta(200, {
         "id": 1,
         "nome": "João",
         "saldo_cc": 1000.0,
         "perfil_investidor": "MODERADO",
-    }
-    total_resp = Mock(status_code=200)
-    total_resp.json.return_value = {"total_investido": 500.0}
+    })
+    total_resp = _resposta(200, {"total_investido": 500.0})
     mock_http_client.get.side_effect = [client_resp, total_resp]
 
     resp = client.get("/calculos/projecao/1")
@@ -207,14 +202,13 @@ def test_projecao_retorno_sem_total(mock_get_client):
     mock_http_client = MagicMock()
     mock_get_client.return_value = mock_http_client
 
-    client_resp = Mock(status_code=200)
-    client_resp.json.return_value = {
+    client_resp = _resposta(200, {
         "id": 1,
         "nome": "João",
         "saldo_cc": 0.0,
         "perfil_investidor": "CONSERVADOR",
-    }
-    total_resp = Mock(status_code=404)
+    })
+    total_resp = _resposta(404)
     mock_http_client.get.side_effect = [client_resp, total_resp]
 
     resp = client.get("/calculos/projecao/1")
@@ -228,10 +222,8 @@ def test_calcular_patrimonio(mock_get_client):
     mock_http_client = MagicMock()
     mock_get_client.return_value = mock_http_client
 
-    client_resp = Mock(status_code=200)
-    client_resp.json.return_value = {"id": 1, "nome": "João", "saldo_cc": 100.0}
-    total_resp = Mock(status_code=200)
-    total_resp.json.return_value = {"total_investido": 900.0}
+    client_resp = _resposta(200, {"id": 1, "nome": "João", "saldo_cc": 100.0})
+    total_resp = _resposta(200, {"total_investido": 900.0})
     mock_http_client.get.side_effect = [client_resp, total_resp]
 
     resp = client.get("/calculos/patrimonio/1")
@@ -245,14 +237,12 @@ def test_analise_carteira(mock_get_client):
     mock_http_client = MagicMock()
     mock_get_client.return_value = mock_http_client
 
-    client_resp = Mock(status_code=200)
-    client_resp.json.return_value = {"id": 1, "nome": "João"}
-    inv_resp = Mock(status_code=200)
-    inv_resp.json.return_value = [
+    client_resp = _resposta(200, {"id": 1, "nome": "João"})
+    inv_resp = _resposta(200, [
         {"tipo_investimento": "ACAO", "valor_investido": 100.0, "ativo": True},
         {"tipo_investimento": "ACAO", "valor_investido": 300.0, "ativo": False},
         {"tipo_investimento": "FII", "valor_investido": 600.0, "ativo": True},
-    ]
+    ])
     mock_http_client.get.side_effect = [client_resp, inv_resp]
 
     resp = client.get("/analises/carteira/1")
@@ -297,3 +287,191 @@ def test_analise_mercado_excecao(mock_get_info):
     data = resp.json()
     assert data["historico_disponivel"] is False
     assert data["preco_atual"] == 0.0
+
+
+BATCH_PAYLOAD = {
+    "cliente_id": 1,
+    "investimentos": [
+        {"tipo_investimento": "ACOES", "ticker": "AAPL", "valor_investido": 100.0},
+        {"tipo_investimento": "ACOES", "ticker": "AAPL", "valor_investido": 50.0},
+        {"tipo_investimento": "RENDA_FIXA", "valor_investido": 25.0},
+    ],
+}
+
+
+@patch("gateway.main.get_dynamic_http_client")
+@patch("gateway.yahoo_finance_service.YahooFinanceService.validar_tickers", return_value={"AAPL": True})
+def test_create_investments_batch(mock_validar, mock_get_client):
+    """Batch validates tickers in one call and forwards once to storage."""
+    mock_http_client = MagicMock()
+    mock_get_client.return_value = mock_http_client
+    criado = {
+        "id": 1, "cliente_id": 1, "ticker": "AAPL", "tipo_investimento": "ACOES",
+        "valor_investido": 100.0, "rentabilidade": 0.0, "ativo": True, "data_aplicacao": "2024-01-01T00:00:00",
+    }
+    mock_http_client.post.return_value = _resposta(201, [criado, {**criado, "id": 2}])
+
+    resp = client.post("/investments/batch", json=BATCH_PAYLOAD)
+
+    assert resp.status_code == 201
+    assert len(resp.json()) == 2
+    mock_validar.assert_called_once_with(["AAPL", "AAPL"])
+    assert mock_http_client.post.call_args[0][0] == "/investments/batch"
+
+
+@patch("gateway.main.get_dynamic_http_client")
+@patch("gateway.yahoo_finance_service.YahooFinanceService.validar_tickers", return_value={"AAPL": True, "XXXX": False})
+def test_create_investments_batch_invalid_ticker(mock_validar, mock_get_client):
+    resp = client.post("/investments/batch", json=BATCH_PAYLOAD)
+    assert resp.status_code == 400
+    assert "XXXX" in resp.json()["detail"]
+    assert not mock_get_client.return_value.post.called
+
+
+@patch("gateway.main.get_dynamic_http_client")
+@patch("gateway.yahoo_finance_service.YahooFinanceService.validar_tickers", return_value={"AAPL": True})
+def test_create_investments_batch_storage_errors(mock_validar, mock_get_client):
+    mock_http_client = MagicMock()
+    mock_get_client.return_value = mock_http_client
+
+    mock_http_client.post.return_value = _resposta(400, {"detail": "Patrimônio insuficiente"})
+    resp = client.post("/investments/batch", json=BATCH_PAYLOAD)
+    assert resp.status_code == 400
+    assert "insuficiente" in resp.json()["detail"]
+
+    mock_http_client.post.return_value = _resposta(404)
+    resp = client.post("/investments/batch", json=BATCH_PAYLOAD)
+    assert resp.status_code == 404
+
+
+@patch("gateway.main.get_dynamic_http_client")
+def test_calculos_use_total_from_client_row(mock_get_client):
+    """Com total_investido_ativo no cliente, não há chamada ao endpoint /total."""
+    mock_http_client = MagicMock()
+    mock_get_client.return_value = mock_http_client
+
+    client_resp = _resposta(200, {
+        "id": 1, "nome": "João", "saldo_cc": 100.0, "patrimonio_investimento": 50.0,
+        "perfil_investidor": "ARROJADO", "total_investido_ativo": 850.0,
+    })
+    mock_http_client.get.return_value = client_resp
+
+    assert client.get("/calculos/patrimonio/1").json()["patrimonio_total"] == 1000.0
+    assert client.get("/calculos/projecao/1").json()["projecao_anual"] == pytest.approx(850.0 * 0.18)
+    chamadas = [c.args[0] for c in mock_http_client.get.call_args_list]
+    # A segunda rota reaproveita o cliente do cache do gateway
+    assert chamadas == ["/clients/1"]
+
+
+def _storage_response(corpo: bytes):
+    import httpx
+    return httpx.Response(
+        200,
+        content=corpo,
+        headers={"content-type": "application/json", "etag": '"v1"', "x-interno": "1", "cache-control": "max-age=60"},
+        request=httpx.Request("GET", "http://storage/"),
+    )
+
+
+@patch("gateway.main.get_dynamic_http_client")
+def test_pure_forward_routes_pass_storage_bytes_through(mock_get_client):
+    corpo = b'[{"id":1,"cliente_id":1,"tipo_investimento":"ACOES","ticker":null,"valor_investido":10.0,' \
+            b'"rentabilidade":0.0,"ativo":true,"data_aplicacao":"2024-01-01T00:00:00","extra":1}]'
+    mock_http_client = MagicMock()
+    mock_http_client.get.return_value = _storage_response(corpo)
+    mock_get_client.return_value = mock_http_client
+
+    with patch("gateway.main.client_module.parse_json", side_effect=AssertionError("não deveria decodificar")):
+        resp = client.get("/investments/cliente/1")
+    assert resp.content == corpo
+    assert resp.headers["etag"] == '"v1"'
+    assert "x-interno" not in resp.headers
+    # Cabeçalhos da rota sobrepõem os do storage, sem duplicar
+    assert resp.headers.get_list("cache-control") == ["no-cache"]
+
+    mock_http_client.get.return_value = _storage_response(corpo)
+    assert client.get("/investments").content == corpo
+    mock_http_client.get.return_value = _storage_response(b'{"id":1}')
+    assert client.get("/clients/1").content == b'{"id":1}'
+    assert client.get("/investments/1").content == b'{"id":1}'
+    mock_http_client.get.return_value = _storage_response(b'[]')
+    assert client.get("/clients").content == b"[]"
+
+
+@patch("gateway.main.get_dynamic_http_client")
+def test_passthrough_disabled_validates_against_response_model(mock_get_client, monkeypatch):
+    monkeypatch.setattr("gateway.main.GATEWAY_PASSTHROUGH", False)
+    corpo = b'{"id":1,"cliente_id":1,"tipo_investimento":"ACOES","ticker":null,"valor_investido":10.0,' \
+            b'"rentabilidade":0.0,"ativo":true,"data_aplicacao":"2024-01-01T00:00:00","extra":1}'
+    mock_http_client = MagicMock()
+    mock_http_client.get.return_value = _storage_response(corpo)
+    mock_get_client.return_value = mock_http_client
+
+    resp = client.get("/investments/1")
+    assert resp.status_code == 200
+    assert "extra" not in resp.json()
+
+
+def _storage_cliente(status=200, etag='W/"c1v7"'):
+    import httpx
+    corpo = b'{"id":1,"nome":"Jo\xc3\xa3o","saldo_cc":100.0,"patrimonio_investimento":50.0,' \
+            b'"perfil_investidor":"ARROJADO","total_investido_ativo":850.0}' if status == 200 else b""
+    return httpx.Response(status, content=corpo, headers={"content-type": "application/json", "etag": etag},
+                          request=httpx.Request("GET", "http://storage/"))
+
+
+@pytest.mark.parametrize("rota,recurso", [("/calculos/projecao/1", "projecao"), ("/calculos/patrimonio/1", "patrimonio")])
+@patch("gateway.main.get_dynamic_http_client")
+def test_calculations_carry_etag_derived_from_client_version(mock_get_client, rota, recurso):
+    mock_http_client = MagicMock()
+    mock_http_client.get.return_value = _storage_cliente()
+    mock_get_client.return_value = mock_http_client
+
+    resp = client.get(rota)
+    assert resp.status_code == 200
+    assert resp.headers["etag"] == f'W/"c1v7-{recurso}"'
+    assert resp.headers["cache-control"] == "no-cache"
+
+    # Revalidação do navegador contra o cliente em cache: 304 sem recalcular nem chamar o storage
+    revalidada = client.get(rota, headers={"If-None-Match": resp.headers["etag"]})
+    assert revalidada.status_code == 304
+    assert revalidada.headers["etag"] == f'W/"c1v7-{recurso}"'
+    assert mock_http_client.get.call_count == 1
+    # ETag do cliente ou de outro recurso não vale para este
+    assert client.get(rota, headers={"If-None-Match": 'W/"c1v7"'}).status_code == 200
+    assert client.get(rota, headers={"If-None-Match": 'W/"c1v7-outro"'}).status_code == 200
+
+
+@patch("gateway.main.get_dynamic_http_client")
+def test_get_client_answers_304_from_cache(mock_get_client, monkeypatch):
+    mock_http_client = MagicMock()
+    mock_http_client.get.return_value = _storage_cliente()
+    mock_get_client.return_value = mock_http_client
+
+    resp = client.get("/clients/1", headers={"If-None-Match": 'W/"c1v7"'})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == 'W/"c1v7"'
+    completa = client.get("/clients/1")
+    assert completa.headers["etag"] == 'W/"c1v7"'
+    assert completa.headers["cache-control"] == "no-cache"
+    # Casa também sem o prefixo fraco
+    assert client.get("/clients/1", headers={"If-None-Match": '"x", "c1v7"'}).status_code == 304
+
+    monkeypatch.setattr("gateway.main.GATEWAY_PASSTHROUGH", False)
+    validada = client.get("/clients/1")
+    assert validada.json()["id"] == 1
+    assert validada.headers["etag"] == 'W/"c1v7"'
+    assert validada.headers["cache-control"] == "no-cache"
+
+
+@patch("gateway.main.get_dynamic_http_client")
+def test_list_by_cliente_forwards_if_none_match_and_304(mock_get_client):
+    mock_http_client = MagicMock()
+    mock_http_client.get.return_value = _storage_cliente(304)
+    mock_get_client.return_value = mock_http_client
+
+    resp = client.get("/investments/cliente/1", headers={"If-None-Match": 'W/"c1v7"'})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == 'W/"c1v7"'
+    assert mock_http_client.get.call_args.kwargs["headers"]["If-None-Match"] == 'W/"c1v7"'
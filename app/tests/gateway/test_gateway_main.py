@@ -10,6 +10,11 @@ import httpx
 client = TestClient(app)
 
 
+def _resposta(status_code, dados=None):
+    """Resposta do storage como o httpx entrega ao gateway."""
+    return httpx.Response(status_code, json=dados, request=httpx.Request("GET", "http://storage"))
+
+
 # ===== GET / (Index) =====
 def test_index_arquivo_existe():
     """Testa retorno da página inicial quando arquivo existe"""
@@ -72,12 +77,10 @@ def test_health():
 def test_list_clients_sucesso(mock_get_client):
     """Testa listar clientes com sucesso"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = [
+    mock_response = _resposta(200, [
         {"id": 1, "nome": "João", "email": "joao@test.com", "data_nascimento": "2000-01-01", "score_credito": None, "saldo_cc": None},
         {"id": 2, "nome": "Maria", "email": "maria@test.com", "data_nascimento": "2000-01-02", "score_credito": None, "saldo_cc": None},
-    ]
+    ])
     mock_http_client.get.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -92,9 +95,7 @@ def test_list_clients_sucesso(mock_get_client):
 def test_list_clients_erro_status(mock_get_client):
     """Testa erro ao listar clientes"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 500
-    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError("500", request=Mock(), response=mock_response)
+    mock_response = _resposta(500)
     mock_http_client.get.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -107,12 +108,10 @@ def test_list_clients_erro_status(mock_get_client):
 def test_get_client_sucesso(mock_get_client):
     """Testa buscar cliente por ID com sucesso"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response = _resposta(200, {
         "id": 1, "nome": "João", "email": "joao@test.com", 
         "data_nascimento": "2000-01-01", "score_credito": None, "saldo_cc": None
-    }
+    })
     mock_http_client.get.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -125,8 +124,7 @@ def test_get_client_sucesso(mock_get_client):
 def test_get_client_nao_encontrado(mock_get_client):
     """Testa buscar cliente inexistente (404)"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 404
+    mock_response = _resposta(404)
     mock_http_client.get.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -140,12 +138,10 @@ def test_get_client_nao_encontrado(mock_get_client):
 def test_create_client_sucesso(mock_get_client):
     """Testa criar cliente com sucesso"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 201
-    mock_response.json.return_value = {
+    mock_response = _resposta(201, {
         "id": 1, "nome": "João", "email": "joao@test.com",
         "data_nascimento": "2000-01-01", "score_credito": None, "saldo_cc": None
-    }
+    })
     mock_http_client.post.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -177,12 +173,10 @@ def test_create_client_validacao_fallha(mock_get_client):
 def test_register_sucesso(mock_get_client):
     """Testa registro de novo cliente com sucesso"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 201
-    mock_response.json.return_value = {
+    mock_response = _resposta(201, {
         "id": 1, "nome": "João", "email": "joao@test.com",
         "data_nascimento": "2000-01-01", "score_credito": None, "saldo_cc": None
-    }
+    })
     mock_http_client.post.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -200,9 +194,7 @@ def test_register_sucesso(mock_get_client):
 def test_register_erro_400(mock_get_client):
     """Testa registro com erro 400 (email duplicado)"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 400
-    mock_response.json.return_value = {"detail": "Email já existe"}
+    mock_response = _resposta(400, {"detail": "Email já existe"})
     mock_http_client.post.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -221,9 +213,7 @@ def test_register_erro_400(mock_get_client):
 def test_register_http_status_error(mock_get_client):
     """Testa register com HTTPStatusError 400"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 400
-    mock_response.json.return_value = {"detail": "Erro genérico"}
+    mock_response = _resposta(400, {"detail": "Erro genérico"})
     error = httpx.HTTPStatusError("400", request=Mock(), response=mock_response)
     mock_http_client.post.side_effect = error
     mock_get_client.return_value = mock_http_client
@@ -243,12 +233,10 @@ def test_register_http_status_error(mock_get_client):
 def test_login_sucesso(mock_get_client):
     """Testa login com sucesso"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response = _resposta(200, {
         "id": 1, "nome": "João", "email": "joao@test.com",
         "data_nascimento": "2000-01-01", "score_credito": None, "saldo_cc": None
-    }
+    })
     mock_http_client.post.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -261,8 +249,7 @@ def test_login_sucesso(mock_get_client):
 def test_login_credenciais_invalidas(mock_get_client):
     """Testa login com credenciais inválidas (401)"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 401
+    mock_response = _resposta(401)
     mock_http_client.post.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -276,8 +263,7 @@ def test_login_credenciais_invalidas(mock_get_client):
 def test_login_http_status_error_401(mock_get_client):
     """Testa login com HTTPStatusError 401"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 401
+    mock_response = _resposta(401)
     error = httpx.HTTPStatusError("401", request=Mock(), response=mock_response)
     mock_http_client.post.side_effect = error
     mock_get_client.return_value = mock_http_client
@@ -292,12 +278,10 @@ def test_login_http_status_error_401(mock_get_client):
 def test_update_client_sucesso(mock_get_client):
     """Testa atualizar cliente com sucesso"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response = _resposta(200, {
         "id": 1, "nome": "João Atualizado", "email": "joao@test.com",
         "data_nascimento": "2000-01-01", "score_credito": None, "saldo_cc": None
-    }
+    })
     mock_http_client.put.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -311,8 +295,7 @@ def test_update_client_sucesso(mock_get_client):
 def test_update_client_nao_encontrado(mock_get_client):
     """Testa atualizar cliente inexistente"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 404
+    mock_response = _resposta(404)
     mock_http_client.put.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -325,18 +308,18 @@ def test_update_client_nao_encontrado(mock_get_client):
 def test_update_client_com_data(mock_get_client):
     """Testa atualizar cliente com data_nascimento"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response = _resposta(200, {
         "id": 1, "nome": "João", "email": "joao@test.com",
         "data_nascimento": "2000-01-01", "score_credito": None, "saldo_cc": None
-    }
+    })
     mock_http_client.put.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
     payload = {"data_nascimento": "2000-01-01"}
     response = client.put("/clients/1", json=payload)
     assert response.status_code == 200
+    # Data serializada pelo pydantic, sem conversão manual
+    assert mock_http_client.put.call_args.kwargs["json"] == {"data_nascimento": "2000-01-01"}
 
 
 # ===== DELETE /clients/{client_id} =====
@@ -344,8 +327,7 @@ def test_update_client_com_data(mock_get_client):
 def test_delete_client_sucesso(mock_get_client):
     """Testa deletar cliente com sucesso"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 204
+    mock_response = _resposta(204)
     mock_http_client.delete.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -357,8 +339,7 @@ def test_delete_client_sucesso(mock_get_client):
 def test_delete_client_nao_encontrado(mock_get_client):
     """Testa deletar cliente inexistente"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 404
+    mock_response = _resposta(404)
     mock_http_client.delete.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -371,12 +352,10 @@ def test_delete_client_nao_encontrado(mock_get_client):
 def test_update_password_sucesso(mock_get_client):
     """Testa atualizar senha com sucesso"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response = _resposta(200, {
         "id": 1, "nome": "João", "email": "joao@test.com",
         "data_nascimento": "2000-01-01", "score_credito": None, "saldo_cc": None
-    }
+    })
     mock_http_client.put.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -389,8 +368,7 @@ def test_update_password_sucesso(mock_get_client):
 def test_update_password_cliente_nao_encontrado(mock_get_client):
     """Testa atualizar senha de cliente inexistente"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 404
+    mock_response = _resposta(404)
     mock_http_client.put.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -403,8 +381,7 @@ def test_update_password_cliente_nao_encontrado(mock_get_client):
 def test_update_password_http_error_404(mock_get_client):
     """Testa atualizar senha com HTTPStatusError 404"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 404
+    mock_response = _resposta(404)
     error = httpx.HTTPStatusError("404", request=Mock(), response=mock_response)
     mock_http_client.put.side_effect = error
     mock_get_client.return_value = mock_http_client
@@ -419,12 +396,10 @@ def test_update_password_http_error_404(mock_get_client):
 def test_score_credito_sucesso(mock_get_client):
     """Testa calcular score de crédito com sucesso"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response = _resposta(200, {
         "id": 1, "nome": "João", "email": "joao@test.com",
         "data_nascimento": "2000-01-01", "score_credito": 100, "saldo_cc": 1000
-    }
+    })
     mock_http_client.get.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -439,12 +414,10 @@ def test_score_credito_sucesso(mock_get_client):
 def test_score_credito_saldo_nulo(mock_get_client):
     """Testa score de crédito quando saldo é nulo"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response = _resposta(200, {
         "id": 1, "nome": "João", "email": "joao@test.com",
         "data_nascimento": "2000-01-01", "score_credito": None, "saldo_cc": None
-    }
+    })
     mock_http_client.get.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
@@ -458,10 +431,29 @@ def test_score_credito_saldo_nulo(mock_get_client):
 def test_score_credito_cliente_nao_encontrado(mock_get_client):
     """Testa score de cliente inexistente"""
     mock_http_client = MagicMock()
-    mock_response = Mock()
-    mock_response.status_code = 404
+    mock_response = _resposta(404)
     mock_http_client.get.return_value = mock_response
     mock_get_client.return_value = mock_http_client
     
     response = client.get("/clients/999/score")
     assert response.status_code == 404
+
+
+# ===== Storage sobrecarregado (fila de bcrypt cheia) =====
+@pytest.mark.parametrize("metodo,rota,payload", [
+    ("post", "/login", {"email": "ana@test.com", "senha": "Senha@123"}),
+    ("post", "/register", {"nome": "Ana", "email": "ana@test.com", "data_nascimento": "2000-01-01", "senha": "senhaSegura123!"}),
+    ("put", "/password", {"email": "ana@test.com", "senha_nova": "senhaSegura123!"}),
+])
+@patch("gateway.main.get_dynamic_http_client")
+def test_storage_503_is_forwarded_with_retry_after(mock_get_client, metodo, rota, payload):
+    mock_http_client = MagicMock()
+    getattr(mock_http_client, metodo).return_value = httpx.Response(
+        503, json={"detail": "Serviço de autenticação sobrecarregado, tente novamente"},
+        headers={"Retry-After": "1"}, request=httpx.Request(metodo.upper(), f"http://storage{rota}"),
+    )
+    mock_get_client.return_value = mock_http_client
+    response = getattr(client, metodo)(rota, json=payload)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert "sobrecarregado" in response.json()["detail"]
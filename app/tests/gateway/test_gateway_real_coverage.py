@@ -1,20 +1,17 @@
 import httpx
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import MagicMock, patch
 
 from gateway.main import app
 import gateway.client as client_module
+from gateway.static_pages import FrontendFiles
 
 client = TestClient(app)
 
 
 def _mock_response(status_code=200, json_data=None):
-    resp = MagicMock()
-    resp.status_code = status_code
-    resp.json.return_value = json_data or {}
-    resp.raise_for_status = MagicMock()
-    return resp
+    return httpx.Response(status_code, json=json_data or {}, request=httpx.Request("GET", "http://storage"))
 
 
 def test_get_http_client_factory():
@@ -26,15 +23,15 @@ def test_get_http_client_factory():
         mock_cls.assert_called_once()
 
 
-@patch("gateway.main.Path.exists", return_value=False)
-def test_login_route_not_found(mock_exists):
+def test_login_route_not_found(monkeypatch, tmp_path):
+    monkeypatch.setattr("gateway.main.FRONTEND", FrontendFiles(tmp_path))
     response = client.get("/login")
     assert response.status_code == 200
     assert "dispon" in response.json()["message"].lower()
 
 
-@patch("gateway.main.Path.exists", return_value=False)
-def test_register_route_not_found(mock_exists):
+def test_register_route_not_found(monkeypatch, tmp_path):
+    monkeypatch.setattr("gateway.main.FRONTEND", FrontendFiles(tmp_path))
     response = client.get("/register")
     assert response.status_code == 200
     assert "dispon" in response.json()["message"].lower()
@@ -0,0 +1,92 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from gateway import sessions
+from gateway.main import app
+
+
+client = TestClient(app)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    anterior = sessions.get_store()
+    novo = sessions.MemorySessionStore() if request.param == "memory" else sessions.SqliteSessionStore(str(tmp_path / "sessions.db"))
+    sessions.set_store(novo)
+    yield novo
+    sessions.set_store(anterior)
+
+
+def test_issue_and_verify(store):
+    token, sessao = sessions.issue(42)
+    verificada = sessions.verify(token)
+    assert verificada == sessao
+    assert verificada.cliente_id == 42
+
+
+def test_verify_rejects_tampered_or_malformed(store):
+    token, _ = sessions.issue(42)
+    sid, cid, exp, sig = token.split(".")
+    assert sessions.verify(f"{sid}.43.{exp}.{sig}") is None
+    assert sessions.verify("abc") is None
+    assert sessions.verify(None) is None
+
+
+def test_verify_rejects_expired(store):
+    token, _ = sessions.issue(7, ttl_seconds=1)
+    with patch("gateway.sessions.time.time", return_value=time.time() + 5):
+        assert sessions.verify(token) is None
+
+
+def test_revoke(store):
+    token, _ = sessions.issue(7)
+    sessions.revoke(token)
+    assert sessions.verify(token) is None
+
+
+def test_token_from_headers():
+    assert sessions.token_from_headers("Bearer abc", "cookie") == "abc"
+    assert sessions.token_from_headers(None, "cookie") == "cookie"
+
+
+@patch("gateway.main.get_dynamic_http_client")
+def test_login_issues_session_and_logout_revokes(mock_get_client, store):
+    mock_http_client = MagicMock()
+    mock_get_client.return_value = mock_http_client
+    mock_http_client.post.return_value = httpx.Response(200, json={
+        "id": 5, "nome": "Ana", "email": "ana@test.com", "telefone": 1, "correntista": True,
+        "data_nascimento": "1990-01-01", "score_credito": None, "saldo_cc": 0,
+    }, request=httpx.Request("POST", "http://storage/login"))
+    http = TestClient(app)
+
+    resp = http.post("/login", json={"email": "ana@test.com", "senha": "Senha@123"})
+    assert resp.status_code == 200
+    token = resp.headers["X-Session-Token"]
+    assert http.cookies.get(sessions.SESSION_COOKIE) == token
+
+    # Cookie e Bearer autenticam sem nova chamada ao storage
+    chamadas = mock_http_client.post.call_count
+    assert http.get("/session").json()["cliente_id"] == 5
+    assert client.get("/session", headers={"Authorization": f"Bearer {token}"}).json()["cliente_id"] == 5
+    assert mock_http_client.post.call_count == chamadas
+
+    assert http.post("/logout").status_code == 204
+    assert client.get("/session", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+
+
+def test_session_requires_token():
+    assert client.get("/session").status_code == 401
+
+
+def test_session_is_verified_only_on_routes_that_require_it(store):
+    token, _ = sessions.issue(9)
+    with patch("gateway.main.sessions.verify", wraps=sessions.verify) as verify:
+        assert client.get("/health", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+        assert client.get("/login.html", cookies={sessions.SESSION_COOKIE: token}).status_code == 200
+        assert verify.call_count == 0
+        assert client.get("/session", headers={"Authorization": f"Bearer {token}"}).json()["cliente_id"] == 9
+        assert verify.call_count == 1
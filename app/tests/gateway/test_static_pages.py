@@ -0,0 +1,141 @@
+import gzip
+import os
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from gateway import compression, static_pages
+from gateway.main import FRONTEND, app as gateway_app
+from gateway.static_pages import FrontendFiles
+
+PAGINA = '<html><link href="/static/style.css"><script src="/static/app.js"></script>' + "<p>javer</p>" * 300 + "</html>"
+
+
+@pytest.fixture
+def frontend(tmp_path):
+    (tmp_path / "pagina.html").write_text(PAGINA)
+    (tmp_path / "app.js").write_text("console.log('javer');" * 100)
+    (tmp_path / "style.css").write_text("a{}")
+    return tmp_path
+
+
+def _cliente(arquivos: FrontendFiles) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/pagina")
+    def pagina(request: Request):
+        return arquivos.response(request, "pagina.html")
+
+    @app.get("/static/{nome:path}")
+    def estatico(nome: str, request: Request):
+        return arquivos.static_response(request, nome) or {"message": "não encontrado"}
+
+    return TestClient(app)
+
+
+def test_page_has_strong_etag_and_revalidates(frontend):
+    client = _cliente(FrontendFiles(frontend))
+    resp = client.get("/pagina", headers={"Accept-Encoding": "identity"})
+    assert resp.status_code == 200
+    assert resp.headers["cache-control"] == "no-cache"
+    etag = resp.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    revalidada = client.get("/pagina", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert revalidada.status_code == 304
+    assert revalidada.content == b""
+    assert revalidada.headers["etag"] == etag
+    # Comparação fraca: o ETag enfraquecido por um proxy também vale
+    assert client.get("/pagina", headers={"If-None-Match": f'"outro", W/{etag}'}).status_code == 304
+    assert client.get("/pagina", headers={"If-None-Match": '"outro"'}).status_code == 200
+
+
+def test_page_served_gzipped_from_memory(frontend):
+    arquivos = FrontendFiles(frontend)
+    client = _cliente(arquivos)
+    resp = client.get("/pagina", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert resp.headers["etag"] != arquivos.files["pagina.html"].etag
+    assert "<p>javer</p>" in resp.text
+    # O ETag da versão gzip também revalida
+    assert client.get("/pagina", headers={"Accept-Encoding": "gzip", "If-None-Match": resp.headers["etag"]}).status_code == 304
+
+
+def test_assets_get_content_hashed_immutable_urls(frontend):
+    arquivos = FrontendFiles(frontend)
+    client = _cliente(arquivos)
+    url = arquivos.asset_url("app.js")
+    assert url.startswith("/static/app.") and url.endswith(".js") and url != "/static/app.js"
+    assert arquivos.asset_url("inexistente.js") == "/static/inexistente.js"
+
+    imutavel = client.get(url)
+    assert imutavel.headers["cache-control"] == static_pages.CACHE_IMUTAVEL
+    assert imutavel.headers["content-type"].startswith("text/javascript")
+    assert imutavel.text == "console.log('javer');" * 100
+
+    original = client.get("/static/app.js")
+    assert original.headers["cache-control"] == "no-cache"
+    assert original.text == imutavel.text
+
+    # As páginas referenciam os assets pelo nome com hash
+    pagina = client.get("/pagina").text
+    assert f'src="{url}"' in pagina
+    assert f'href="{arquivos.asset_url("style.css")}"' in pagina
+
+
+def test_hashed_url_changes_with_content(frontend):
+    antes = FrontendFiles(frontend).asset_url("app.js")
+    (frontend / "app.js").write_text("console.log('nova versão');")
+    assert FrontendFiles(frontend).asset_url("app.js") != antes
+
+
+def test_missing_files_and_directory(frontend, tmp_path):
+    assert _cliente(FrontendFiles(frontend)).get("/static/nada.js").json() == {"message": "não encontrado"}
+    vazio = FrontendFiles(tmp_path / "nao-existe")
+    assert vazio.files == {}
+    assert vazio.asset_url("app.js") == "/static/app.js"
+
+
+def test_uses_build_variants_only_when_fresh(frontend):
+    compression.precompress(frontend)
+    gz = frontend / "app.js.gz"
+    gz.write_bytes(gzip.compress(b"do build"))
+    assert FrontendFiles(frontend).files["app.js"].variantes["gzip"][0] == gz.read_bytes()
+    # Mais antigo que o original: comprimido de novo na carga
+    os.utime(gz, (1, 1))
+    variante = FrontendFiles(frontend).files["app.js"].variantes["gzip"][0]
+    assert gzip.decompress(variante) == (frontend / "app.js").read_bytes()
+    # Páginas reescritas nunca usam o .gz do build (é do conteúdo original)
+    pagina = FrontendFiles(frontend).files["pagina.html"]
+    assert gzip.decompress(pagina.variantes["gzip"][0]) == pagina.conteudo
+
+
+def test_gateway_pages_revalidate_with_304():
+    client = TestClient(gateway_app)
+    primeira = client.get("/investments-page")
+    assert primeira.status_code == 200
+    assert primeira.headers["cache-control"] == "no-cache"
+    segunda = client.get("/investments-page", headers={"If-None-Match": primeira.headers["etag"]})
+    assert segunda.status_code == 304
+
+
+def test_gateway_static_assets():
+    from gateway.main import FRONTEND
+
+    client = TestClient(gateway_app)
+    assert client.get(FRONTEND.asset_url("style.css")).headers["cache-control"] == static_pages.CACHE_IMUTAVEL
+    assert client.get("/static/style.css").status_code == 200
+    assert client.get("/static/nada.css").status_code == 404
+
+
+def test_real_pages_load_their_assets_from_immutable_urls():
+    client = TestClient(gateway_app)
+    for rota, pagina in (("/dashboard", "dashboard"), ("/investments.html", "investments"), ("/login", "login"),
+                         ("/register", "register"), ("/response", "response")):
+        html = client.get(rota).text
+        for asset in (f"{pagina}.css", f"{pagina}.js"):
+            url = FRONTEND.asset_url(asset)
+            assert url != f"/static/{asset}" and url in html
+            assert client.get(url).headers["cache-control"] == static_pages.CACHE_IMUTAVEL
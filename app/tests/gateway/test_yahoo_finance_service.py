@@ -122,3 +122,19 @@ def test_get_multiple_tickers_calls_each():
         mock_info.side_effect = ["i1", "i2"]
         result = YahooFinanceService.get_multiple_tickers(["A", "B"])
     assert result == {"A": "i1", "B": "i2"}
+
+
+def test_validar_tickers_single_download():
+    close = pd.DataFrame({("MSFT", "Close"): [10.0], ("ZZZZ", "Close"): [float("nan")]})
+    with patch("gateway.yahoo_finance_service.yf.download", return_value=close) as mock_download:
+        resultado = YahooFinanceService.validar_tickers(["MSFT", "ZZZZ", "MSFT"])
+    mock_download.assert_called_once()
+    assert mock_download.call_args[0][0] == ["MSFT", "ZZZZ"]
+    assert resultado == {"MSFT": True, "ZZZZ": False}
+
+
+def test_validar_tickers_offline_uses_allowlist():
+    with patch("gateway.yahoo_finance_service.yf.download", side_effect=RuntimeError("offline")):
+        resultado = YahooFinanceService.validar_tickers(["AAPL", "INVALID"])
+    assert resultado == {"AAPL": True, "INVALID": False}
+    assert YahooFinanceService.validar_tickers([]) == {}
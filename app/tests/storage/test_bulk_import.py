@@ -0,0 +1,126 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from storage import db
+from storage import bulk_import
+from storage import manage
+from storage import repository as repo
+from storage.main import app
+
+
+client = TestClient(app)
+
+CSV_OK = """nome,telefone,email,data_nascimento,correntista,saldo_cc,senha
+Ana,1001,ana@bulk.com,1990-01-01,true,100.0,Senha@123
+Bruno,1002,bruno@bulk.com,1985-05-05,false,,Senha@456
+"""
+
+
+@pytest.fixture(autouse=True)
+def force_sqlite(monkeypatch):
+    if hasattr(db.get_connection, "_test_cache"):
+        del db.get_connection._test_cache
+    def _raise_operational_error(*args, **kwargs):
+        raise db.psycopg2.OperationalError("fail")
+    monkeypatch.setattr(db.psycopg2, "connect", _raise_operational_error)
+    conn = db.get_connection()
+    conn.execute("DELETE FROM clients")
+    conn.commit()
+    yield conn
+    conn.execute("DELETE FROM clients")
+    conn.commit()
+    if hasattr(db.get_connection, "_test_cache"):
+        del db.get_connection._test_cache
+
+
+def test_parse_csv_empty_cells_become_none():
+    rows = list(bulk_import.parse_csv(CSV_OK))
+    assert len(rows) == 2
+    assert rows[1]["saldo_cc"] is None
+    assert rows[0]["email"] == "ana@bulk.com"
+
+
+def test_parse_ndjson_skips_blank_and_flags_invalid():
+    rows = list(bulk_import.parse_ndjson('{"nome": "A"}\n\n{invalido\n'))
+    assert rows[0] == {"nome": "A"}
+    assert "__erro__" in rows[1]
+
+
+def test_import_clients_inserts_and_logs_in(force_sqlite):
+    relatorio = bulk_import.import_clients(bulk_import.parse_csv(CSV_OK), chunk_size=1, workers=0)
+
+    assert relatorio["total"] == 2
+    assert relatorio["importados"] == 2
+    assert relatorio["erros"] == []
+    assert relatorio["linhas_por_segundo"] > 0
+    assert repo.login_client("ana@bulk.com", "Senha@123") is not None
+    assert repo.login_client("bruno@bulk.com", "Senha@456")["correntista"] is False
+
+
+def test_import_clients_reports_row_errors(force_sqlite):
+    repo.create_client({
+        "nome": "Existente", "telefone": 2000, "email": "existe@bulk.com",
+        "data_nascimento": "1990-01-01", "correntista": True,
+    })
+    registros = [
+        {"nome": "Ok", "telefone": 2001, "email": "ok@bulk.com", "data_nascimento": "1990-01-01", "senha": "Senha@123"},
+        {"nome": "Dup", "telefone": 2002, "email": "existe@bulk.com", "data_nascimento": "1990-01-01", "senha": "Senha@123"},
+        {"nome": "Menor", "telefone": 2003, "email": "menor@bulk.com", "data_nascimento": "2020-01-01", "senha": "Senha@123"},
+        {"nome": "Fraca", "telefone": 2004, "email": "fraca@bulk.com", "data_nascimento": "1990-01-01", "senha": "password"},
+        {"nome": "Repetido", "telefone": 2001, "email": "outro@bulk.com", "data_nascimento": "1990-01-01", "senha": "Senha@123"},
+    ]
+
+    relatorio = bulk_import.import_clients(registros, chunk_size=10, workers=0)
+
+    assert relatorio["importados"] == 1
+    assert [e["linha"] for e in relatorio["erros"]] == [2, 3, 4, 5]
+    assert "já cadastrado" in relatorio["erros"][0]["erro"]
+    assert "data_nascimento" in relatorio["erros"][1]["erro"]
+
+
+def test_import_clients_with_process_pool(force_sqlite):
+    registros = [
+        {"nome": f"P{i}", "telefone": 3000 + i, "email": f"p{i}@bulk.com", "data_nascimento": "1990-01-01", "senha": "Senha@123"}
+        for i in range(3)
+    ]
+    relatorio = bulk_import.import_clients(registros, chunk_size=2, workers=2)
+    assert relatorio["importados"] == 3
+    assert len(repo.list_clients()) == 3
+
+    # A importação seguinte reaproveita os mesmos processos
+    pool = bulk_import._pools[2]
+    assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+    outro = [dict(r, telefone=r["telefone"] + 100, email=f"q{i}@bulk.com") for i, r in enumerate(registros)]
+    assert bulk_import.import_clients(outro, chunk_size=2, workers=2)["importados"] == 3
+    assert bulk_import._pools[2] is pool
+    bulk_import.shutdown()
+    assert bulk_import._pools == {}
+
+
+def test_import_endpoint_ndjson(force_sqlite):
+    body = "\n".join(json.dumps({
+        "nome": f"N{i}", "telefone": 4000 + i, "email": f"n{i}@bulk.com",
+        "data_nascimento": "1990-01-01", "senha": "Senha@123",
+    }) for i in range(2))
+    with patch.object(bulk_import, "BULK_IMPORT_WORKERS", 0):
+        resp = client.post("/clients/import", content=body, headers={"content-type": "application/x-ndjson"})
+    assert resp.status_code == 200
+    assert resp.json()["importados"] == 2
+
+
+def test_import_endpoint_invalid_format():
+    resp = client.post("/clients/import?formato=xml", content="x")
+    assert resp.status_code == 400
+
+
+def test_manage_import_clients(force_sqlite, tmp_path, capsys):
+    arquivo = tmp_path / "clientes.csv"
+    arquivo.write_text(CSV_OK, encoding="utf-8")
+
+    code = manage.main(["import-clients", str(arquivo), "--workers", "0"])
+
+    assert code == 0
+    assert json.loads(capsys.readouterr().out)["importados"] == 2
@@ -0,0 +1,26 @@
+from fastapi.testclient import TestClient
+
+from storage import compression
+from storage.main import app
+
+
+def test_storage_compresses_large_lists(monkeypatch):
+    from storage.investment_repository import InvestmentRepository
+    from storage.models import InvestimentoCreate
+
+    for i in range(30):
+        InvestmentRepository.create(InvestimentoCreate(cliente_id=1, tipo_investimento="ACOES", ticker=f"TICK{i}",
+                                                       valor_investido=100.0 + i, rentabilidade=1.5))
+    client = TestClient(app)
+
+    resp = client.get("/investments", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert len(resp.json()) == 30
+
+    monkeypatch.setattr(compression, "COMPRESSION_ENABLED", False)
+    assert "content-encoding" not in client.get("/investments", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_storage_skips_small_responses():
+    resp = TestClient(app).get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resp.headers
@@ -0,0 +1,110 @@
+import datetime
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from storage import migrations
+from storage.investment_repository import InvestmentRepository
+from storage.main import _if_none_match, app
+from storage.models import InvestimentoBatchCreate, InvestimentoCreate, InvestimentoUpdate
+from storage.repository import create_client, get_client_version, update_client
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def cliente_id():
+    unique = int(datetime.datetime.now().timestamp() * 1000)
+    data = {
+        "nome": "Versionado",
+        "telefone": unique,
+        "email": f"versao{unique}@example.com",
+        "data_nascimento": datetime.date(1990, 1, 1),
+        "correntista": True,
+        "score_credito": 100.0,
+        "saldo_cc": 500.0,
+        "patrimonio_investimento": 10000.0,
+        "senha": "senhaBoa123",
+    }
+    with patch("storage.repository._is_password_pwned", return_value=False):
+        return create_client(data)["id"]
+
+
+def _investir(cliente_id, valor=100.0):
+    return InvestmentRepository.create(InvestimentoCreate(cliente_id=cliente_id, tipo_investimento="ACOES",
+                                                          ticker="PETR4.SA", valor_investido=valor))
+
+
+def test_migration_adds_versao_column():
+    assert any(m.descricao == "clients.versao" for m in migrations.MIGRATIONS)
+
+
+def test_new_client_starts_at_version_one(cliente_id):
+    assert get_client_version(cliente_id) == 1
+    assert get_client_version(987654) is None
+
+
+def test_every_write_bumps_version(cliente_id):
+    versoes = [get_client_version(cliente_id)]
+    update_client(cliente_id, {"nome": "Outro Nome"})
+    versoes.append(get_client_version(cliente_id))
+    inv = _investir(cliente_id)
+    versoes.append(get_client_version(cliente_id))
+    InvestmentRepository.update(inv.id, InvestimentoUpdate(valor_investido=150.0))
+    versoes.append(get_client_version(cliente_id))
+    InvestmentRepository.create_batch(InvestimentoBatchCreate(
+        cliente_id=cliente_id, investimentos=[{"tipo_investimento": "ACOES", "valor_investido": 10.0}]))
+    versoes.append(get_client_version(cliente_id))
+    InvestmentRepository.delete(inv.id)
+    versoes.append(get_client_version(cliente_id))
+    assert versoes == sorted(set(versoes))
+
+
+@pytest.mark.parametrize("rota", ["/clients/{id}", "/investments/cliente/{id}", "/investments/cliente/{id}/total"])
+def test_reads_revalidate_with_304_until_a_write(cliente_id, rota):
+    url = rota.format(id=cliente_id)
+    primeira = client.get(url)
+    assert primeira.status_code == 200
+    etag = primeira.headers["etag"]
+    assert etag == f'W/"c{cliente_id}v1"'
+
+    with patch("storage.main.get_client") as get_client, \
+         patch("storage.main.InvestmentRepository.get_by_cliente") as get_by_cliente:
+        segunda = client.get(url, headers={"If-None-Match": etag})
+    assert segunda.status_code == 304
+    assert segunda.content == b""
+    assert segunda.headers["etag"] == etag
+    # 304 só com a leitura da versão
+    get_client.assert_not_called()
+    get_by_cliente.assert_not_called()
+
+    _investir(cliente_id)
+    terceira = client.get(url, headers={"If-None-Match": etag})
+    assert terceira.status_code == 200
+    assert terceira.headers["etag"] != etag
+
+
+def test_missing_client_has_no_etag():
+    resp = client.get("/clients/987654", headers={"If-None-Match": "*"})
+    assert resp.status_code == 404
+    assert "etag" not in resp.headers
+
+
+@pytest.mark.parametrize("valor,casa", [
+    (None, False),
+    ('W/"c1v2"', True),
+    ('"c1v2"', True),
+    ('"c1v1", W/"c1v2"', True),
+    ("*", True),
+    ('W/"c1v1"', False),
+])
+def test_if_none_match_weak_comparison(valor, casa):
+    assert _if_none_match(valor, 'W/"c1v2"') is casa
+
+
+def test_delete_investment_reports_owner(cliente_id):
+    inv = _investir(cliente_id)
+    resp = client.delete(f"/investments/{inv.id}")
+    assert resp.status_code == 204
+    assert resp.headers["x-cliente-id"] == str(cliente_id)
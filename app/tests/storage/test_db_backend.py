@@ -0,0 +1,77 @@
+import pytest
+
+from storage import db
+
+
+@pytest.mark.parametrize("url,kind,alvo", [
+    ("sqlite://", "sqlite", ":memory:"),
+    ("sqlite:///dados/javer.db", "sqlite", "dados/javer.db"),
+    ("sqlite:////var/lib/javer.db", "sqlite", "/var/lib/javer.db"),
+    ("postgres://u:segredo@db:5433/javer", "postgres", "postgres:db:5433/javer"),
+])
+def test_parse_database_url(url, kind, alvo):
+    backend = db.parse_database_url(url)
+    assert backend.kind == kind
+    if backend.is_sqlite:
+        assert backend.path == alvo
+    else:
+        assert backend.describe() == alvo
+        assert "segredo" not in backend.describe()
+
+
+def test_parse_database_url_rejects_unknown_scheme():
+    with pytest.raises(ValueError):
+        db.parse_database_url("mysql://u:p@h/db")
+
+
+def test_backend_from_env(monkeypatch):
+    monkeypatch.setattr(db, "DATABASE_URL", None)
+    monkeypatch.setattr(db, "SQLITE_PATH", None)
+    monkeypatch.delenv("DB_HOST", raising=False)
+    assert db._backend_from_env() == db.Backend("sqlite", path=":memory:")
+
+    monkeypatch.setenv("DB_HOST", "postgres")
+    monkeypatch.setattr(db, "DB_HOST", "postgres")
+    assert db._backend_from_env().describe() == "postgres:postgres:5432/javer_db"
+
+    monkeypatch.setattr(db, "SQLITE_PATH", "/tmp/x.db")
+    assert db._backend_from_env() == db.Backend("sqlite", path="/tmp/x.db")
+
+    monkeypatch.setattr(db, "DATABASE_URL", "sqlite://")
+    assert db._backend_from_env().path == ":memory:"
+
+
+def test_postgres_down_fails_fast_without_sqlite_fallback(monkeypatch):
+    from fastapi.testclient import TestClient
+    from storage.main import app
+
+    chamadas = []
+
+    def _recusa(**kwargs):
+        chamadas.append(kwargs)
+        raise db.psycopg2.OperationalError("connection refused")
+
+    monkeypatch.setattr(db, "_backend", db.Backend("postgres", dsn="host=db dbname=javer"))
+    monkeypatch.setattr(db.psycopg2, "connect", _recusa)
+
+    with pytest.raises(db.psycopg2.OperationalError):
+        db.get_connection()
+    assert chamadas[0]["connect_timeout"] == db.DB_CONNECT_TIMEOUT
+
+    resp = TestClient(app).get("/health/db")
+    assert resp.status_code == 503
+    assert resp.json()["ok"] is False
+    assert resp.json()["backend"] == "postgres:db:5432/javer"
+
+    with pytest.raises(RuntimeError, match="Banco indisponível"):
+        with TestClient(app):
+            pass
+
+
+def test_health_db_ok():
+    from fastapi.testclient import TestClient
+    from storage.main import app
+
+    resp = TestClient(app).get("/health/db")
+    assert resp.status_code == 200
+    assert resp.json()["ok"] is True
@@ -0,0 +1,95 @@
+import pytest
+
+from storage import db
+
+
+class _FakeCursor:
+    def execute(self, *args):
+        pass
+
+    def fetchone(self):
+        return (1,)
+
+
+class _FakeConn:
+    def __init__(self, host):
+        self.host = host
+        self.autocommit = False
+        self.readonly = False
+
+    def cursor(self):
+        return _FakeCursor()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    fora = set()
+
+    def _connect(dsn, connect_timeout):
+        host = db.psycopg2.extensions.parse_dsn(dsn)["host"]
+        if host in fora:
+            raise db.psycopg2.OperationalError(f"{host} fora")
+        return _FakeConn(host)
+
+    monkeypatch.setattr(db.psycopg2, "connect", _connect)
+    db.configure("postgresql://u:p@primario/javer", replicas=["postgresql://u:p@r1/javer", "postgresql://u:p@r2/javer"])
+    yield fora
+    db.configure("sqlite://", replicas=[])
+
+
+def test_reads_round_robin_and_writes_go_to_primary(replicas):
+    lidos = [db.get_connection(read_only=True) for _ in range(4)]
+    assert sorted(c.host for c in lidos) == ["r1", "r1", "r2", "r2"]
+    assert lidos[0].host != lidos[1].host
+    assert all(c.readonly and c.autocommit for c in lidos)
+
+    escrita = db.get_connection()
+    assert escrita.host == "primario"
+    assert not escrita.readonly
+
+
+def test_read_your_writes_window(replicas, monkeypatch):
+    db.mark_write(("cliente", 1))
+    assert db.get_connection(read_only=True, chave=("cliente", 1)).host == "primario"
+    assert db.get_connection(read_only=True, chave=("cliente", 2)).host in ("r1", "r2")
+
+    monkeypatch.setattr(db, "READ_YOUR_WRITES_SECONDS", 0)
+    db.mark_write(("cliente", 3))
+    assert db.get_connection(read_only=True, chave=("cliente", 3)).host in ("r1", "r2")
+
+
+def test_down_replica_leaves_rotation_and_falls_back_to_primary(replicas):
+    replicas.add("r1")
+    assert {db.get_connection(read_only=True).host for _ in range(4)} == {"r2"}
+
+    replicas.add("r2")
+    assert db.get_connection(read_only=True).host == "primario"
+
+
+def test_health_check_reports_and_restores_replicas(replicas):
+    replicas.add("r1")
+    saude = db.check_health()
+    assert saude["ok"] is True
+    assert [(r["backend"], r["ok"]) for r in saude["replicas"]] == [
+        ("postgres:r1:5432/javer", False),
+        ("postgres:r2:5432/javer", True),
+    ]
+    assert {db.get_connection(read_only=True).host for _ in range(4)} == {"r2"}
+
+    replicas.discard("r1")
+    assert all(r["ok"] for r in db.check_health()["replicas"])
+    assert {db.get_connection(read_only=True).host for _ in range(4)} == {"r1", "r2"}
+
+
+def test_sqlite_primary_ignores_read_only():
+    db.configure("sqlite://", replicas=[])
+    assert db.get_connection(read_only=True) is db.get_connection()
+
+
+def test_replicas_must_be_postgres():
+    with pytest.raises(ValueError):
+        db.configure("postgresql://u:p@primario/javer", replicas=["sqlite:///replica.db"])
+    assert db.get_backend().is_sqlite
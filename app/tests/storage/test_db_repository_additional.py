@@ -4,7 +4,7 @@ from unittest.mock import patch
 
 import pytest
 
-from storage import db
+from storage import db, pwned_passwords
 from storage import repository as repo
 
 
@@ -56,6 +56,7 @@ def test_init_db_postgres_branch(monkeypatch):
     fake_conn = FakeConn()
     if hasattr(db.get_connection, "_test_cache"):
         del db.get_connection._test_cache
+    monkeypatch.setattr(db, "_backend", db.Backend("postgres", dsn="host=fake dbname=javer_db"))
     monkeypatch.setattr(db.psycopg2, "connect", lambda **kwargs: fake_conn)
 
     db.init_db()
@@ -82,6 +83,7 @@ def test_create_investments_table_postgres(monkeypatch):
     fake_conn = FakeConn()
     if hasattr(db.get_connection, "_test_cache"):
         del db.get_connection._test_cache
+    monkeypatch.setattr(db, "_backend", db.Backend("postgres", dsn="host=fake dbname=javer_db"))
     monkeypatch.setattr(db.psycopg2, "connect", lambda **kwargs: fake_conn)
 
     db.create_investments_table()
@@ -99,6 +101,7 @@ def test_validate_password_strength():
 
 
 def test_is_password_pwned_branches(monkeypatch):
+    monkeypatch.setattr(pwned_passwords, "HIBP_CACHE_DIR", None)
     pwd = "senhaSegura"
     sha1 = hashlib.sha1(pwd.encode("utf-8")).hexdigest().upper()
     prefix, suffix = sha1[:5], sha1[5:]
@@ -108,17 +111,17 @@ def test_is_password_pwned_branches(monkeypatch):
             self.status_code = status_code
             self.text = text
     # Found in dataset
-    monkeypatch.setattr(repo.requests, "get", lambda url, timeout: Resp(200, f"{suffix}:5\nOTHER:1"))
+    monkeypatch.setattr(pwned_passwords._session, "get", lambda url, timeout: Resp(200, f"{suffix}:5\nOTHER:1"))
     assert repo._is_password_pwned(pwd) is True
 
     # Non-200 status -> False
-    monkeypatch.setattr(repo.requests, "get", lambda url, timeout: Resp(503, ""))
+    monkeypatch.setattr(pwned_passwords._session, "get", lambda url, timeout: Resp(503, ""))
     assert repo._is_password_pwned(pwd) is False
 
     # Exception path -> False
     def boom(url, timeout):
         raise RuntimeError("net down")
-    monkeypatch.setattr(repo.requests, "get", boom)
+    monkeypatch.setattr(pwned_passwords._session, "get", boom)
     assert repo._is_password_pwned(pwd) is False
 
 
@@ -241,3 +244,75 @@ def test_update_password_validation(force_sqlite, monkeypatch):
 
 def test_delete_client_missing(force_sqlite):
     assert repo.delete_client(9999) is False
+
+
+def test_login_rehashes_stale_cost(force_sqlite, monkeypatch):
+    from storage import password_pool
+    conn = force_sqlite
+    conn.execute(
+        "INSERT INTO clients (nome, telefone, email, data_nascimento, correntista, senha_hash) VALUES (?, ?, ?, ?, ?, ?)",
+        ("Rita", 777, "rita@test.com", "1990-01-01", 1, password_pool._bcrypt_hash("Senha@123", 4)),
+    )
+    conn.commit()
+    monkeypatch.setattr(password_pool, "BCRYPT_ROUNDS", 5)
+
+    assert repo.login_client("rita@test.com", "Senha@123") is not None
+
+    novo_hash = conn.execute("SELECT senha_hash FROM clients WHERE email = 'rita@test.com'").fetchone()[0]
+    assert password_pool.hash_cost(novo_hash) == 5
+    assert repo.login_client("rita@test.com", "Senha@123") is not None
+
+
+def test_login_ignores_rehash_failure(force_sqlite, monkeypatch):
+    from storage import password_pool
+    conn = force_sqlite
+    antigo = password_pool._bcrypt_hash("Senha@123", 4)
+    conn.execute(
+        "INSERT INTO clients (nome, telefone, email, data_nascimento, correntista, senha_hash) VALUES (?, ?, ?, ?, ?, ?)",
+        ("Rui", 778, "rui@test.com", "1990-01-01", 1, antigo),
+    )
+    conn.commit()
+    monkeypatch.setattr(password_pool, "BCRYPT_ROUNDS", 5)
+    def _overloaded(senha):
+        raise password_pool.PasswordPoolOverloaded("cheio")
+    monkeypatch.setattr(repo, "_hash_password", _overloaded)
+
+    assert repo.login_client("rui@test.com", "Senha@123") is not None
+    assert conn.execute("SELECT senha_hash FROM clients WHERE email = 'rui@test.com'").fetchone()[0] == antigo
+
+
+def test_client_record_is_a_slotted_mapping():
+    c = repo._row_to_client((1, "Ana", "21999999999", "ana@test.com", "1990-05-15", 1, None, 50.0))
+    assert not hasattr(c, "__dict__")
+    assert c == {
+        "id": 1, "nome": "Ana", "telefone": 21999999999, "email": "ana@test.com",
+        "data_nascimento": "1990-05-15", "correntista": True, "score_credito": repo._compute_score(50.0),
+        "saldo_cc": 50.0, "patrimonio_investimento": 0.0, "total_investido_ativo": None,
+    }
+    assert {**c, "nome": "Bia"}["nome"] == "Bia"
+    assert c.get("inexistente") is None and "get" not in c
+    with pytest.raises(KeyError):
+        c["get"]
+    with pytest.raises(AttributeError):
+        c.extra = 1
+
+
+@patch("storage.repository._is_password_pwned", return_value=False)
+def test_list_clients_trusted_serialization_matches_validation(mock_pwned, force_sqlite):
+    import warnings
+    from fastapi.testclient import TestClient
+    from storage.main import app
+    from storage.models import ClientOut
+
+    for i in range(3):
+        repo.create_client({
+            "nome": f"Cli {i}", "telefone": 2100000000 + i, "email": f"cli{i}@test.com",
+            "data_nascimento": "1990-01-0%d" % (i + 1), "correntista": bool(i % 2), "saldo_cc": 10.0 * i,
+        })
+    esperado = [ClientOut.model_validate(dict(c)).model_dump(mode="json") for c in repo.list_clients()]
+
+    client = TestClient(app)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert client.get("/clients").json() == esperado
+        assert client.get(f"/clients/{esperado[0]['id']}").json() == esperado[0]
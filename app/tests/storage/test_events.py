@@ -0,0 +1,158 @@
+import asyncio
+import datetime
+import threading
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from storage import events
+from storage.investment_repository import InvestmentRepository
+from storage.main import app
+from storage.models import InvestimentoBatchCreate, InvestimentoCreate, InvestimentoUpdate
+from storage.repository import create_client, delete_client, update_client
+
+
+@pytest.fixture
+def fila():
+    fila = events.subscribe()
+    yield fila
+    events.unsubscribe(fila)
+
+
+def _eventos(fila):
+    recebidos = []
+    while not fila.empty():
+        recebidos.append(fila.get_nowait())
+    return recebidos
+
+
+def _cliente():
+    unique = int(datetime.datetime.now().timestamp() * 1000)
+    with patch("storage.repository._is_password_pwned", return_value=False):
+        return create_client({
+            "nome": "Eventos", "telefone": unique, "email": f"eventos{unique}@example.com",
+            "data_nascimento": datetime.date(1990, 1, 1), "correntista": True,
+            "saldo_cc": 0.0, "patrimonio_investimento": 10000.0, "senha": "senhaBoa123",
+        })["id"]
+
+
+def test_client_writes_publish_events_with_version(fila):
+    cliente_id = _cliente()
+    update_client(cliente_id, {"nome": "Outro Nome"})
+    delete_client(cliente_id)
+    delete_client(cliente_id)
+    assert _eventos(fila) == [
+        {"cliente_id": cliente_id, "entidade": "cliente", "versao": 1},
+        {"cliente_id": cliente_id, "entidade": "cliente", "versao": 2},
+        {"cliente_id": cliente_id, "entidade": "cliente", "versao": None},
+    ]
+
+
+def test_investment_writes_publish_events(fila):
+    cliente_id = _cliente()
+    _eventos(fila)
+    inv = InvestmentRepository.create(InvestimentoCreate(cliente_id=cliente_id, tipo_investimento="ACOES",
+                                                         valor_investido=100.0))
+    InvestmentRepository.update(inv.id, InvestimentoUpdate(valor_investido=150.0))
+    InvestmentRepository.create_batch(InvestimentoBatchCreate(
+        cliente_id=cliente_id, investimentos=[{"tipo_investimento": "ACOES", "valor_investido": 10.0}]))
+    InvestmentRepository.delete(inv.id)
+    InvestmentRepository.delete(inv.id)
+    recebidos = _eventos(fila)
+    assert [(e["cliente_id"], e["entidade"]) for e in recebidos] == [(cliente_id, "investimento")] * 4
+    versoes = [e["versao"] for e in recebidos]
+    assert versoes == sorted(set(versoes))
+
+
+def test_repair_totals_publishes_todos(fila):
+    from storage.repository import get_connection
+
+    cliente_id = _cliente()
+    conn = get_connection()
+    conn.execute("UPDATE clients SET total_investido_ativo = 999 WHERE id = ?", (cliente_id,))
+    conn.commit()
+    _eventos(fila)
+    assert InvestmentRepository.repair_totals() >= 1
+    assert _eventos(fila) == [events.TODOS]
+    assert InvestmentRepository.repair_totals() == 0
+    assert _eventos(fila) == []
+
+
+def test_full_queue_collapses_into_todos(monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_QUEUE_SIZE", 2)
+    fila = events.subscribe()
+    try:
+        for i in range(3):
+            events.deliver({"cliente_id": i, "entidade": "cliente", "versao": 1})
+        assert _eventos(fila) == [events.TODOS]
+    finally:
+        events.unsubscribe(fila)
+
+
+def test_publish_disabled_or_failing_never_raises(fila, monkeypatch):
+    conn = MagicMock()
+    conn.cursor.side_effect = RuntimeError("sem conexão")
+    events.publish(conn, 1, "cliente")
+    monkeypatch.setattr(events, "EVENTS_ENABLED", False)
+    events.publish(conn, 1, "cliente")
+    assert _eventos(fila) == []
+
+
+def test_stream_yields_sse_events_and_heartbeats():
+    async def cenario():
+        corpo = events.stream(heartbeat=0.01)
+        assert await corpo.__anext__() == b": conectado\n\n"
+        assert await corpo.__anext__() == b": ping\n\n"
+        # Entrega de outra thread (como as escritas) chega pelo loop
+        thread = threading.Thread(target=events.deliver, args=({"cliente_id": 7, "entidade": "cliente", "versao": 3},))
+        thread.start()
+        thread.join()
+        linha = await corpo.__anext__()
+        while linha == b": ping\n\n":
+            linha = await corpo.__anext__()
+        assert linha.startswith(b"data: ") and linha.endswith(b"\n\n")
+        assert orjson.loads(linha[6:]) == {"cliente_id": 7, "entidade": "cliente", "versao": 3}
+        await corpo.aclose()
+
+    asyncio.run(cenario())
+    # Fechar o stream remove o assinante
+    assert len(events._assinantes) == 0
+
+
+def test_stream_full_queue_collapses_and_stops_when_disconnected(monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_QUEUE_SIZE", 2)
+    desconectou = []
+
+    async def desconectado():
+        return bool(desconectou)
+
+    async def cenario():
+        corpo = events.stream(desconectado, heartbeat=5)
+        assert await corpo.__anext__() == b": conectado\n\n"
+        for i in range(3):
+            events.deliver({"cliente_id": i, "entidade": "cliente", "versao": 1})
+        assert orjson.loads((await corpo.__anext__())[6:]) == events.TODOS
+        desconectou.append(True)
+        events.deliver({"cliente_id": 9, "entidade": "cliente", "versao": 1})
+        # Na volta seguinte o stream vê a desconexão e termina
+        with pytest.raises(StopAsyncIteration):
+            await corpo.__anext__()
+
+    asyncio.run(cenario())
+    assert len(events._assinantes) == 0
+
+
+def test_events_endpoint_is_an_uncompressed_event_stream(monkeypatch):
+    monkeypatch.setattr(events, "stream", lambda desconectado: iter([b": conectado\n\n", b"data: {}\n\n" * 200]))
+    resp = TestClient(app).get("/events", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    assert "content-encoding" not in resp.headers
+    assert resp.text.startswith(": conectado")
+
+
+def test_listener_only_for_postgres():
+    events.start_listener()
+    assert events._listener is None
+    events.stop_listener()
@@ -96,3 +96,159 @@ def test_delete_and_total(sqlite_conn):
 
     assert InvestmentRepository.delete(created1.id) is True
     assert InvestmentRepository.delete(9999) is False
+
+
+def test_create_batch_debits_once(sqlite_conn):
+    from storage.models import InvestimentoBatchCreate, InvestimentoBatchItem
+    sqlite_conn.execute("UPDATE clients SET patrimonio_investimento = 1000.0 WHERE id = 1")
+    sqlite_conn.commit()
+
+    lote = InvestimentoBatchCreate(cliente_id=1, investimentos=[
+        InvestimentoBatchItem(tipo_investimento=TipoInvestimento.ACOES, ticker="AAPL", valor_investido=300.0),
+        InvestimentoBatchItem(tipo_investimento=TipoInvestimento.RENDA_FIXA, valor_investido=200.0),
+    ])
+    criados = InvestmentRepository.create_batch(lote)
+
+    assert [c.valor_investido for c in criados] == [300.0, 200.0]
+    assert all(c.cliente_id == 1 and c.id is not None for c in criados)
+    patrimonio = sqlite_conn.execute("SELECT patrimonio_investimento FROM clients WHERE id = 1").fetchone()[0]
+    assert patrimonio == 500.0
+    assert InvestmentRepository.get_total_investido_cliente(1) == 500.0
+
+
+def test_create_batch_insufficient_funds_rolls_back(sqlite_conn):
+    from storage.models import InvestimentoBatchCreate, InvestimentoBatchItem
+    sqlite_conn.execute("UPDATE clients SET patrimonio_investimento = 100.0 WHERE id = 1")
+    sqlite_conn.commit()
+
+    lote = InvestimentoBatchCreate(cliente_id=1, investimentos=[
+        InvestimentoBatchItem(tipo_investimento=TipoInvestimento.ACOES, valor_investido=80.0),
+        InvestimentoBatchItem(tipo_investimento=TipoInvestimento.ACOES, valor_investido=80.0),
+    ])
+    with pytest.raises(ValueError):
+        InvestmentRepository.create_batch(lote)
+
+    assert InvestmentRepository.get_by_cliente(1) == []
+    patrimonio = sqlite_conn.execute("SELECT patrimonio_investimento FROM clients WHERE id = 1").fetchone()[0]
+    assert patrimonio == 100.0
+
+
+def test_create_batch_missing_client(sqlite_conn):
+    from storage.models import InvestimentoBatchCreate, InvestimentoBatchItem
+    lote = InvestimentoBatchCreate(cliente_id=999, investimentos=[
+        InvestimentoBatchItem(tipo_investimento=TipoInvestimento.ACOES, valor_investido=10.0),
+    ])
+    assert InvestmentRepository.create_batch(lote) is None
+
+
+def _patrimonio(conn):
+    return conn.execute("SELECT patrimonio_investimento FROM clients WHERE id = 1").fetchone()[0]
+
+
+def test_create_and_delete_move_patrimonio_relative_to_stored_value(sqlite_conn):
+    sqlite_conn.execute("UPDATE clients SET patrimonio_investimento = 100.0 WHERE id = 1")
+    sqlite_conn.commit()
+    inv = InvestmentRepository.create(InvestimentoCreate(cliente_id=1, tipo_investimento=TipoInvestimento.ACOES,
+                                                         valor_investido=60.0), debitar_patrimonio=True)
+    assert _patrimonio(sqlite_conn) == 40.0
+
+    # Escrita concorrente no saldo: débito e crédito somam ao valor gravado, não a uma leitura anterior
+    sqlite_conn.execute("UPDATE clients SET patrimonio_investimento = patrimonio_investimento + 10 WHERE id = 1")
+    sqlite_conn.commit()
+    with pytest.raises(ValueError):
+        InvestmentRepository.create(InvestimentoCreate(cliente_id=1, tipo_investimento=TipoInvestimento.ACOES,
+                                                       valor_investido=51.0), debitar_patrimonio=True)
+    assert _patrimonio(sqlite_conn) == 50.0
+    assert len(InvestmentRepository.get_by_cliente(1)) == 1
+
+    assert InvestmentRepository.delete(inv.id, creditar_patrimonio=True) is True
+    assert _patrimonio(sqlite_conn) == 110.0
+    assert InvestmentRepository.delete(inv.id, creditar_patrimonio=True) is False
+    assert _patrimonio(sqlite_conn) == 110.0
+
+    assert InvestmentRepository.create(InvestimentoCreate(cliente_id=999, tipo_investimento=TipoInvestimento.ACOES,
+                                                          valor_investido=1.0), debitar_patrimonio=True) is None
+
+
+def _total_registrado(conn):
+    return conn.execute("SELECT total_investido_ativo FROM clients WHERE id = 1").fetchone()[0]
+
+
+def test_total_investido_ativo_follows_every_write(sqlite_conn):
+    base = dict(cliente_id=1, tipo_investimento=TipoInvestimento.ACOES)
+    a = InvestmentRepository.create(InvestimentoCreate(**base, valor_investido=100.0, ativo=True))
+    InvestmentRepository.create(InvestimentoCreate(**base, valor_investido=40.0, ativo=False))
+    assert _total_registrado(sqlite_conn) == 100.0
+
+    InvestmentRepository.update(a.id, InvestimentoUpdate(valor_investido=150.0))
+    assert _total_registrado(sqlite_conn) == 150.0
+    InvestmentRepository.update(a.id, InvestimentoUpdate(ativo=False))
+    assert _total_registrado(sqlite_conn) == 0.0
+    InvestmentRepository.update(a.id, InvestimentoUpdate(ativo=True))
+    assert _total_registrado(sqlite_conn) == 150.0
+
+    InvestmentRepository.delete(a.id)
+    assert _total_registrado(sqlite_conn) == 0.0
+    assert InvestmentRepository.check_totals() == []
+
+
+def test_total_investido_reads_column_and_falls_back_to_sum(sqlite_conn):
+    InvestmentRepository.create(InvestimentoCreate(cliente_id=1, tipo_investimento=TipoInvestimento.ACOES, valor_investido=70.0))
+    sqlite_conn.execute("UPDATE clients SET total_investido_ativo = 999 WHERE id = 1")
+    sqlite_conn.commit()
+    assert InvestmentRepository.get_total_investido_cliente(1) == 999.0
+
+    sqlite_conn.execute("UPDATE clients SET total_investido_ativo = NULL WHERE id = 1")
+    sqlite_conn.commit()
+    assert InvestmentRepository.get_total_investido_cliente(1) == 70.0
+
+
+def test_check_and_repair_totals(sqlite_conn, capsys):
+    from storage import manage
+
+    InvestmentRepository.create(InvestimentoCreate(cliente_id=1, tipo_investimento=TipoInvestimento.ACOES, valor_investido=70.0))
+    sqlite_conn.execute("UPDATE clients SET total_investido_ativo = 5 WHERE id = 1")
+    sqlite_conn.commit()
+
+    assert InvestmentRepository.check_totals() == [{"cliente_id": 1, "registrado": 5.0, "esperado": 70.0}]
+    assert manage.main(["repair-totals", "--check"]) == 1
+    assert manage.main(["repair-totals"]) == 0
+    assert "1 cliente(s) corrigido(s)" in capsys.readouterr().out
+    assert _total_registrado(sqlite_conn) == 70.0
+    assert manage.main(["repair-totals", "--check"]) == 0
+
+
+def test_schema_backfills_total_for_existing_sqlite_table():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE clients (id INTEGER PRIMARY KEY, nome TEXT, telefone INTEGER, email TEXT, "
+                 "data_nascimento DATE, correntista INTEGER, score_credito REAL, saldo_cc REAL, "
+                 "senha_hash TEXT, patrimonio_investimento REAL)")
+    conn.execute("CREATE TABLE investments (id INTEGER PRIMARY KEY, cliente_id INTEGER, tipo_investimento TEXT, "
+                 "ticker TEXT, valor_investido REAL, rentabilidade REAL, ativo INTEGER, data_aplicacao TIMESTAMP)")
+    conn.execute("INSERT INTO clients (id, nome) VALUES (1, 'Cli')")
+    conn.executemany("INSERT INTO investments (cliente_id, valor_investido, ativo) VALUES (1, ?, ?)", [(10.0, 1), (5.0, 0), (20.0, 1)])
+
+    db._ensure_sqlite_schema(conn)
+
+    assert conn.execute("SELECT total_investido_ativo FROM clients WHERE id = 1").fetchone()[0] == 30.0
+
+
+def test_fast_row_mapping_matches_validated_model(sqlite_conn):
+    from fastapi.testclient import TestClient
+    from storage.main import app
+    from storage.models import InvestimentoOut
+
+    criados = [
+        InvestmentRepository.create(InvestimentoCreate(cliente_id=1, tipo_investimento=tipo, ticker=None, valor_investido=10, ativo=ativo))
+        for tipo, ativo in ((TipoInvestimento.CRIPTO, True), (TipoInvestimento.RENDA_FIXA, False))
+    ]
+    for inv in InvestmentRepository.get_by_cliente(1):
+        validado = InvestimentoOut.model_validate(inv.model_dump())
+        assert inv.model_dump() == validado.model_dump()
+        assert type(inv.tipo_investimento) is TipoInvestimento
+        assert isinstance(inv.valor_investido, float)
+
+    client = TestClient(app)
+    esperado = sorted((InvestimentoOut.model_validate(i.model_dump()).model_dump(mode="json") for i in criados), key=lambda i: i["id"])
+    assert sorted(client.get("/investments/cliente/1").json(), key=lambda i: i["id"]) == esperado
+    assert client.get(f"/investments/{criados[0].id}").json() == esperado[0]
@@ -0,0 +1,108 @@
+import sqlite3
+
+import pytest
+
+from storage import db
+from storage import manage
+from storage import migrations
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    yield conn
+    conn.close()
+
+
+def test_fresh_database_applies_all_migrations_once(conn):
+    versoes = [m.versao for m in migrations.MIGRATIONS]
+    assert versoes == sorted(versoes) == list(range(1, len(versoes) + 1))
+
+    assert migrations.migrate(conn) == versoes
+    assert migrations.current_version(conn) == versoes[-1]
+    assert migrations.pending(conn) == []
+    tabelas = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"clients", "investments", "schema_version"} <= tabelas
+
+    assert migrations.migrate(conn) == []
+
+
+def test_restart_only_reads_schema_version(conn):
+    migrations.migrate(conn)
+    executadas = []
+    conn.set_trace_callback(executadas.append)
+    migrations.migrate(conn)
+    conn.set_trace_callback(None)
+
+    assert executadas
+    assert all("schema_version" in sql for sql in executadas), executadas
+
+
+def test_migrate_up_to_target(conn):
+    assert migrations.migrate(conn, alvo=1) == [1]
+    assert [m.versao for m in migrations.pending(conn)] == [m.versao for m in migrations.MIGRATIONS[1:]]
+    assert migrations.migrate(conn) == [m.versao for m in migrations.MIGRATIONS[1:]]
+
+
+def test_failed_migration_is_not_recorded(conn, monkeypatch):
+    def quebra(cur):
+        cur.execute("INSERT INTO clients (nome) VALUES ('x')")
+        raise RuntimeError("falhou")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [
+        migrations.Migration(99, "quebrada", quebra, quebra),
+    ])
+    with pytest.raises(RuntimeError):
+        migrations.migrate(conn)
+    assert migrations.current_version(conn) == migrations.MIGRATIONS[-2].versao
+    assert conn.execute("SELECT COUNT(*) FROM clients").fetchone()[0] == 0
+
+
+def test_manage_migrate_status(monkeypatch, capsys):
+    if hasattr(db.get_connection, "_test_cache"):
+        del db.get_connection._test_cache
+    def _raise_operational_error(*args, **kwargs):
+        raise db.psycopg2.OperationalError("fail")
+    monkeypatch.setattr(db.psycopg2, "connect", _raise_operational_error)
+
+    assert manage.main(["migrate", "--status"]) == 0
+    assert f"versão atual: {migrations.MIGRATIONS[-1].versao}" in capsys.readouterr().out
+    assert manage.main(["migrate"]) == 0
+    assert "aplicadas: nenhuma" in capsys.readouterr().out
+
+
+class _RecordingCursor:
+    def __init__(self):
+        self.sql = []
+
+    def execute(self, query, params=None):
+        self.sql.append(" ".join(query.split()))
+
+
+@pytest.mark.parametrize("particoes", [0, 4])
+def test_investments_postgres_ddl(particoes):
+    cur = _RecordingCursor()
+    migrations.investments_postgres(cur, particoes)
+
+    tabela = cur.sql[0]
+    particionadas = [q for q in cur.sql if "PARTITION OF investments" in q]
+    if particoes:
+        assert tabela.endswith("PARTITION BY HASH (cliente_id)")
+        assert "PRIMARY KEY (id, cliente_id)" in tabela
+        assert particionadas == [
+            f"CREATE TABLE IF NOT EXISTS investments_p{r} PARTITION OF investments "
+            f"FOR VALUES WITH (MODULUS 4, REMAINDER {r})"
+            for r in range(4)
+        ]
+    else:
+        assert "id SERIAL PRIMARY KEY" in tabela and "PARTITION" not in tabela
+        assert particionadas == []
+    indices = {q.split()[5] for q in cur.sql if q.startswith("CREATE INDEX")}
+    assert indices == set(migrations.INDEXES) | set(migrations.POSTGRES_INDEXES)
+
+
+def test_partition_investments_requires_postgres(conn):
+    with pytest.raises(ValueError):
+        migrations.partition_investments(conn, 8)
+    with pytest.raises(ValueError):
+        manage.main(["partition-investments", "--particoes", "8"])
@@ -0,0 +1,92 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from storage import password_pool
+from storage.main import app
+
+
+client = TestClient(app)
+
+
+def test_inline_pool_hash_and_verify():
+    pool = password_pool.PasswordPool(workers=0, max_pending=2, timeout=5)
+    senha_hash = pool.run(password_pool._bcrypt_hash, "Senha@123")
+    assert pool.run(password_pool._bcrypt_check, "Senha@123", senha_hash) is True
+    assert pool.run(password_pool._bcrypt_check, "errada", senha_hash) is False
+    assert pool.pending == 0
+
+
+def test_process_pool_hash_and_verify():
+    pool = password_pool.PasswordPool(workers=1, max_pending=2, timeout=30)
+    try:
+        senha_hash = pool.run(password_pool._bcrypt_hash, "Senha@123")
+        assert pool.run(password_pool._bcrypt_check, "Senha@123", senha_hash) is True
+        # Processos nunca nascem de fork do serviço com threads
+        assert pool._get_executor()._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        pool.shutdown()
+
+
+def test_pool_rejects_when_queue_is_full():
+    pool = password_pool.PasswordPool(workers=0, max_pending=1, timeout=5)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "ok"
+
+    worker = threading.Thread(target=pool.run, args=(slow,))
+    worker.start()
+    started.wait(5)
+    try:
+        assert pool.pending == 1
+        with pytest.raises(password_pool.PasswordPoolOverloaded):
+            pool.run(lambda: "nunca")
+    finally:
+        release.set()
+        worker.join()
+    assert pool.run(lambda: "livre") == "livre"
+
+
+def test_timeout_is_overload_and_keeps_slot_until_worker_finishes():
+    pool = password_pool.PasswordPool(workers=1, max_pending=1, timeout=30)
+    try:
+        # Sobe o processo antes de medir o timeout
+        pool.run(abs, -1)
+        pool.timeout = 0.05
+        with pytest.raises(password_pool.PasswordPoolOverloaded):
+            pool.run(time.sleep, 0.5)
+        # O bcrypt ainda roda no processo: o lugar na fila continua ocupado
+        assert pool.pending == 1
+        with pytest.raises(password_pool.PasswordPoolOverloaded):
+            pool.run(abs, -1)
+        limite = time.monotonic() + 10
+        while pool.pending and time.monotonic() < limite:
+            time.sleep(0.01)
+        assert pool.pending == 0
+        pool.timeout = 10
+        assert pool.run(abs, -2) == 2
+    finally:
+        pool.shutdown()
+
+
+@patch("storage.main.login_client", side_effect=password_pool.PasswordPoolOverloaded("sobrecarregado"))
+def test_login_returns_503_when_pool_overloaded(mock_login):
+    resp = client.post("/login", json={"email": "a@test.com", "senha": "Senha@123"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+def test_hash_cost_and_needs_rehash(monkeypatch):
+    monkeypatch.setattr(password_pool, "BCRYPT_ROUNDS", 5)
+    senha_hash = password_pool._bcrypt_hash("Senha@123")
+    assert password_pool.hash_cost(senha_hash) == 5
+    assert password_pool.needs_rehash(senha_hash) is False
+    assert password_pool.needs_rehash(password_pool._bcrypt_hash("Senha@123", 4)) is True
+    assert password_pool.hash_cost("invalido") is None
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import threading
+import time
+
+import pytest
+
+from storage import manage
+from storage import pwned_passwords
+
+
+class Resp:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+
+def _sha1(senha):
+    return hashlib.sha1(senha.encode("utf-8")).hexdigest().upper()
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    monkeypatch.setattr(pwned_passwords, "HIBP_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(pwned_passwords, "HIBP_OFFLINE_FILE", None)
+    monkeypatch.setattr(pwned_passwords, "HIBP_OFFLINE_ONLY", False)
+    yield
+    pwned_passwords.reset()
+
+
+@pytest.fixture
+def offline_file(tmp_path):
+    senhas = ["123456", "password", "Senha@123", "qwerty"]
+    linhas = sorted(f"{_sha1(s)}:{i + 10}" for i, s in enumerate(senhas))
+    # CRLF como no arquivo gerado pelo downloader oficial
+    path = tmp_path / "pwned.txt"
+    path.write_bytes(("\r\n".join(linhas) + "\r\n").encode())
+    return str(path)
+
+
+def test_range_is_cached_on_disk(monkeypatch):
+    sha1 = _sha1("senhaSegura")
+    chamadas = []
+
+    def fake_get(url, timeout):
+        chamadas.append(url)
+        return Resp(200, f"{sha1[5:]}:5\nOTHER:1")
+
+    monkeypatch.setattr(pwned_passwords._session, "get", fake_get)
+    assert pwned_passwords.pwned_count("senhaSegura") == 5
+    assert pwned_passwords.is_pwned("senhaSegura") is True
+    assert len(chamadas) == 1
+    assert chamadas[0].endswith(sha1[:5])
+
+
+def test_expired_cache_hits_network_again(monkeypatch):
+    chamadas = []
+
+    def fake_get(url, timeout):
+        chamadas.append(url)
+        return Resp(200, "")
+
+    monkeypatch.setattr(pwned_passwords._session, "get", fake_get)
+    assert pwned_passwords.is_pwned("x") is False
+    path = pwned_passwords._cache_path(_sha1("x")[:5])
+    antigo = time.time() - pwned_passwords.HIBP_CACHE_TTL_SECONDS - 10
+    os.utime(path, (antigo, antigo))
+    assert pwned_passwords.is_pwned("x") is False
+    assert len(chamadas) == 2
+
+
+def test_error_status_is_not_cached(monkeypatch):
+    monkeypatch.setattr(pwned_passwords._session, "get", lambda url, timeout: Resp(503, ""))
+    assert pwned_passwords.is_pwned("x") is False
+    assert pwned_passwords._read_cached_range(_sha1("x")[:5]) is None
+
+
+def test_offline_only_never_calls_network(monkeypatch):
+    monkeypatch.setattr(pwned_passwords, "HIBP_OFFLINE_ONLY", True)
+
+    def boom(url, timeout):
+        raise AssertionError("rede não deveria ser usada")
+
+    monkeypatch.setattr(pwned_passwords._session, "get", boom)
+    assert pwned_passwords.is_pwned("x") is False
+
+
+@pytest.mark.parametrize("com_indice", [False, True])
+def test_offline_file_lookup(monkeypatch, offline_file, com_indice):
+    if com_indice:
+        assert manage.main(["hibp-index", offline_file]) == 0
+        assert os.path.getsize(offline_file + ".idx") == 8 * (16 ** 5 + 1)
+    monkeypatch.setattr(pwned_passwords, "HIBP_OFFLINE_FILE", offline_file)
+    monkeypatch.setattr(pwned_passwords._session, "get", lambda url, timeout: pytest.fail("rede"))
+
+    assert pwned_passwords.pwned_count("123456") == 10
+    assert pwned_passwords.pwned_count("qwerty") == 13
+    assert pwned_passwords.is_pwned("Senha@123") is True
+    assert pwned_passwords.is_pwned("nao-vazada-XYZ") is False
+
+
+def test_latency_histogram_and_metrics_endpoint(monkeypatch):
+    from fastapi.testclient import TestClient
+    from storage.main import app
+
+    pwned_passwords.reset_latency()
+    monkeypatch.setattr(pwned_passwords._session, "get", lambda url, timeout: Resp(200, ""))
+    pwned_passwords.is_pwned("a")
+    monkeypatch.setattr(pwned_passwords._session, "get", lambda url, timeout: Resp(503, ""))
+    pwned_passwords.is_pwned("b")
+
+    metricas = TestClient(app).get("/metrics/hibp").json()
+    assert metricas["count"] == 2
+    assert metricas["errors"] == 1
+    assert sum(metricas["buckets_ms"].values()) == 2
+    assert metricas["in_flight"] == 0
+
+
+def test_concurrency_limit_gives_up(monkeypatch):
+    monkeypatch.setattr(pwned_passwords, "HIBP_TIMEOUT_SECONDS", 0.01)
+    monkeypatch.setattr(pwned_passwords, "_http_slots", threading.BoundedSemaphore(1))
+    pwned_passwords._http_slots.acquire()
+    with pytest.raises(TimeoutError):
+        pwned_passwords.fetch_range("00000")
+
+
+def test_check_runs_alongside_hash_and_discards_it(monkeypatch):
+    from storage import repository as repo
+
+    hashes = []
+    monkeypatch.setattr(repo, "_hash_password", lambda senha: hashes.append(senha) or "hash")
+    monkeypatch.setattr(repo, "_is_password_pwned", lambda senha: True)
+    with pytest.raises(ValueError, match="comprometida"):
+        repo._check_and_hash_password("Senha@123")
+    assert hashes == ["Senha@123"]
+
+    monkeypatch.setattr(repo, "_is_password_pwned", lambda senha: False)
+    assert repo._check_and_hash_password("Senha@123") == "hash"
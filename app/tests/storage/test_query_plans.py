@@ -0,0 +1,44 @@
+import sqlite3
+
+import pytest
+
+from storage import db
+
+
+# Consultas quentes (dialeto SQLite) e os parâmetros usados no plano
+HOT_QUERIES = [
+    ("login", "SELECT id, nome, telefone, email, data_nascimento, correntista, score_credito, saldo_cc, senha_hash FROM clients WHERE email = ?", ("a@test.com",)),
+    ("troca de senha", "SELECT id FROM clients WHERE email = ?", ("a@test.com",)),
+    ("unicidade email", "SELECT id FROM clients WHERE email = ? AND id <> ? LIMIT 1", ("a@test.com", 1)),
+    ("unicidade telefone", "SELECT id FROM clients WHERE telefone = ? AND id <> ? LIMIT 1", (123, 1)),
+    ("cliente por id", "SELECT id, nome FROM clients WHERE id = ?", (1,)),
+    ("investimentos do cliente", "SELECT id FROM investments WHERE cliente_id = ?", (1,)),
+    ("total investido", "SELECT COALESCE(SUM(valor_investido), 0) FROM investments WHERE cliente_id = ? AND ativo = 1", (1,)),
+]
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    db._ensure_sqlite_schema(conn)
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("nome,query,params", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_hot_query_does_not_scan(conn, nome, query, params):
+    plano = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+    assert plano, nome
+    scans = [passo for passo in plano if passo.startswith("SCAN ")]
+    assert not scans, f"{nome}: {plano}"
+
+
+def test_index_set_is_created(conn):
+    nomes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert set(db.INDEXES) | set(db.SQLITE_INDEXES) <= nomes
+
+
+def test_total_investido_reads_only_the_covering_index(conn):
+    query = HOT_QUERIES[-1][1]
+    plano = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", (1,))]
+    assert any("COVERING INDEX idx_investments_cliente_ativo" in passo for passo in plano), plano
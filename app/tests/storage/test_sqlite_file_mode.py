@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+
+from storage import db
+from storage import repository as repo
+from storage.investment_repository import InvestmentRepository
+from storage.models import InvestimentoBatchCreate, InvestimentoCreate, TipoInvestimento
+
+
+@pytest.fixture
+def sqlite_file(monkeypatch, tmp_path):
+    path = str(tmp_path / "javer.db")
+    monkeypatch.setattr(db, "_backend", db.Backend("sqlite", path=path))
+    monkeypatch.setattr(repo, "_is_password_pwned", lambda senha: False)
+    yield path
+    conn = getattr(db._sqlite_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        db._sqlite_local.conn = None
+
+
+def _cliente(email, telefone):
+    return {
+        "nome": "Ana", "telefone": telefone, "email": email, "data_nascimento": "1990-01-01",
+        "correntista": True, "saldo_cc": 10.0,
+    }
+
+
+def test_file_mode_pragmas(sqlite_file):
+    conn = db.get_connection()
+    assert conn is db.get_connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == db.SQLITE_BUSY_TIMEOUT_MS
+    assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    assert repo._should_close_connection(conn) is False
+
+
+def test_file_mode_connection_per_thread_and_shared_data(sqlite_file):
+    criado = repo.create_client(_cliente("ana@file.com", 5001))
+    principal = db.get_connection()
+
+    resultados = {}
+
+    def ler(nome):
+        conn = db.get_connection()
+        resultados[nome] = (conn, repo.get_client(criado["id"]))
+
+    threads = [threading.Thread(target=ler, args=(f"t{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    conexoes = {id(c) for c, _ in resultados.values()} | {id(principal)}
+    assert len(conexoes) == 5
+    assert all(cliente["email"] == "ana@file.com" for _, cliente in resultados.values())
+
+
+def test_file_mode_persists_across_connections(sqlite_file):
+    criado = repo.create_client(_cliente("bia@file.com", 5002))
+    InvestmentRepository.create(InvestimentoCreate(
+        cliente_id=criado["id"], tipo_investimento=TipoInvestimento.ACOES, valor_investido=25.0,
+    ))
+    db._sqlite_local.conn.close()
+    db._sqlite_local.conn = None
+
+    assert repo.get_client(criado["id"])["total_investido_ativo"] == 25.0
+
+
+def _investir_unitario(cliente_id):
+    InvestmentRepository.create(InvestimentoCreate(
+        cliente_id=cliente_id, tipo_investimento=TipoInvestimento.ACOES, valor_investido=80.0,
+    ), debitar_patrimonio=True)
+
+
+def _investir_lote(cliente_id):
+    InvestmentRepository.create_batch(InvestimentoBatchCreate(cliente_id=cliente_id, investimentos=[
+        {"tipo_investimento": "ACOES", "valor_investido": 50.0},
+        {"tipo_investimento": "RENDA_FIXA", "valor_investido": 30.0},
+    ]))
+
+
+@pytest.mark.parametrize("investir", [_investir_unitario, _investir_lote])
+def test_file_mode_concurrent_investments_never_overdraw(sqlite_file, monkeypatch, investir):
+    from storage import investment_repository
+
+    debitar = investment_repository._debitar_patrimonio
+
+    def debitar_devagar(*args):
+        debitado = debitar(*args)
+        # Segura a transação aberta depois do débito: as outras threads disputam o mesmo saldo
+        time.sleep(0.02)
+        return debitado
+
+    monkeypatch.setattr(investment_repository, "_debitar_patrimonio", debitar_devagar)
+    criado = repo.create_client({**_cliente("caio@file.com", 5003), "patrimonio_investimento": 100.0})
+    barreira = threading.Barrier(8)
+    resultados = []
+
+    def tentar():
+        # Conexão da thread aberta antes: a disputa fica só entre as escritas
+        db.get_connection()
+        barreira.wait()
+        try:
+            investir(criado["id"])
+            resultados.append("ok")
+        except ValueError:
+            resultados.append("insuficiente")
+
+    threads = [threading.Thread(target=tentar) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(resultados) == ["insuficiente"] * 7 + ["ok"]
+    cliente = repo.get_client(criado["id"], read_only=False)
+    assert cliente["patrimonio_investimento"] == 20.0
+    assert cliente["total_investido_ativo"] == 80.0
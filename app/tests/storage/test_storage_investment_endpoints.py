@@ -3,6 +3,7 @@ from unittest.mock import patch
 from fastapi.testclient import TestClient
 
 from storage.main import app
+from storage.models import InvestimentoOut
 
 
 client = TestClient(app)
@@ -34,8 +35,8 @@ def test_api_get_investment_not_found(mock_repo):
     assert resp.status_code == 404
 
 
-@patch("storage.main.get_client", return_value=None)
-def test_api_create_investment_client_missing(mock_get_client):
+@patch("storage.main.InvestmentRepository.create", return_value=None)
+def test_api_create_investment_client_missing(mock_create):
     payload = {
         "cliente_id": 10,
         "tipo_investimento": "ACOES",
@@ -45,9 +46,8 @@ def test_api_create_investment_client_missing(mock_get_client):
     assert resp.status_code == 404
 
 
-@patch("storage.main.get_client", return_value={"id": 1, "patrimonio_investimento": 500.0})
-@patch("storage.main.InvestmentRepository.create", return_value=make_inv())
-def test_api_create_investment_success(mock_create, mock_get_client):
+@patch("storage.main.InvestmentRepository.create", return_value=InvestimentoOut.model_validate(make_inv()))
+def test_api_create_investment_success(mock_create):
     payload = {
         "cliente_id": 1,
         "tipo_investimento": "ACOES",
@@ -56,11 +56,12 @@ def test_api_create_investment_success(mock_create, mock_get_client):
     resp = client.post("/investments", json=payload)
     assert resp.status_code == 201
     assert resp.json()["id"] == 1
+    mock_create.assert_called_once()
+    assert mock_create.call_args.kwargs == {"debitar_patrimonio": True}
 
 
-@patch("storage.main.get_client", return_value={"id": 1})
 @patch("storage.main.InvestmentRepository.create", side_effect=ValueError("Erro"))
-def test_api_create_investment_value_error(mock_create, mock_get_client):
+def test_api_create_investment_value_error(mock_create):
     payload = {
         "cliente_id": 1,
         "tipo_investimento": "ACOES",
@@ -101,3 +102,37 @@ def test_api_get_total_investido_cliente_success(mock_total, mock_get_client):
     resp = client.get("/investments/cliente/1/total")
     assert resp.status_code == 200
     assert resp.json()["total_investido"] == 500.0
+
+
+BATCH_PAYLOAD = {
+    "cliente_id": 1,
+    "investimentos": [
+        {"tipo_investimento": "ACOES", "ticker": "AAPL", "valor_investido": 100.0},
+        {"tipo_investimento": "RENDA_FIXA", "valor_investido": 50.0},
+    ],
+}
+
+
+@patch("storage.main.InvestmentRepository.create_batch", return_value=[make_inv(id=1), make_inv(id=2)])
+def test_api_create_investments_batch(mock_batch):
+    resp = client.post("/investments/batch", json=BATCH_PAYLOAD)
+    assert resp.status_code == 201
+    assert [i["id"] for i in resp.json()] == [1, 2]
+
+
+@patch("storage.main.InvestmentRepository.create_batch", return_value=None)
+def test_api_create_investments_batch_client_not_found(mock_batch):
+    resp = client.post("/investments/batch", json=BATCH_PAYLOAD)
+    assert resp.status_code == 404
+
+
+@patch("storage.main.InvestmentRepository.create_batch", side_effect=ValueError("Patrimônio insuficiente"))
+def test_api_create_investments_batch_insufficient(mock_batch):
+    resp = client.post("/investments/batch", json=BATCH_PAYLOAD)
+    assert resp.status_code == 400
+    assert "insuficiente" in resp.json()["detail"]
+
+
+def test_api_create_investments_batch_empty_rejected():
+    resp = client.post("/investments/batch", json={"cliente_id": 1, "investimentos": []})
+    assert resp.status_code == 422
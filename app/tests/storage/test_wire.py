@@ -0,0 +1,53 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from storage import wire
+
+
+@pytest.mark.parametrize("accept,esperado", [
+    (None, False),
+    ("application/json", False),
+    ("*/*", False),
+    ("application/msgpack", True),
+    ("application/msgpack, application/json;q=0.5", True),
+    ("application/json, application/msgpack;q=0.5", False),
+    ("application/msgpack;q=0", False),
+    ("application/msgpack;q=abc, */*", False),
+])
+def test_accepts_msgpack(monkeypatch, accept, esperado):
+    monkeypatch.setattr(wire, "msgpack", object())
+    assert wire.accepts_msgpack(accept) is esperado
+
+
+def test_msgpack_negotiation_disabled(monkeypatch):
+    monkeypatch.setattr(wire, "msgpack", object())
+    monkeypatch.setattr(wire, "STORAGE_MSGPACK", False)
+    assert wire.accepts_msgpack("application/msgpack") is False
+    monkeypatch.setattr(wire, "STORAGE_MSGPACK", True)
+    monkeypatch.setattr(wire, "msgpack", None)
+    assert wire.accepts_msgpack("application/msgpack") is False
+
+
+def test_json_stays_default_and_varies_on_accept():
+    from storage.main import app
+
+    resp = TestClient(app).get("/investments")
+    assert resp.headers["content-type"] == "application/json"
+    assert [v.strip() for v in resp.headers["vary"].split(",")] == ["Accept", "Accept-Encoding"]
+
+
+def test_msgpack_response_matches_json():
+    msgpack = pytest.importorskip("msgpack")
+    from storage.main import app
+    from storage.repository import create_client
+
+    client = TestClient(app)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("storage.repository._is_password_pwned", lambda senha: False)
+        c = create_client({"nome": "Ana", "telefone": 21900000001, "email": "ana.wire@test.com",
+                           "data_nascimento": "1990-05-15", "correntista": True, "saldo_cc": 10.0})
+    for rota in ("/clients", f"/clients/{c['id']}", f"/investments/cliente/{c['id']}", f"/investments/cliente/{c['id']}/total"):
+        em_json = client.get(rota).json()
+        resp = client.get(rota, headers={"Accept": "application/msgpack"})
+        assert resp.headers["content-type"] == wire.MSGPACK
+        assert msgpack.unpackb(resp.content) == em_json
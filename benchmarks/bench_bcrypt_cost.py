@@ -0,0 +1,73 @@
+"""Latência de login por custo bcrypt.
+
+Para cada custo, cria um cliente com hash nesse custo e mede `login_client`
+(consulta + verificação bcrypt no pool de senhas) N vezes, reportando
+p50/p95/p99. Serve para escolher um BCRYPT_ROUNDS que caiba no orçamento de
+p99 do login.
+
+Uso:
+    python benchmarks/bench_bcrypt_cost.py --custos 10 11 12 13 --amostras 30
+"""
+import argparse
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from storage import password_pool  # noqa: E402
+from storage.db import get_connection, init_db  # noqa: E402
+from storage.repository import login_client  # noqa: E402
+
+
+def _percentil(amostras, p):
+    ordenadas = sorted(amostras)
+    idx = min(len(ordenadas) - 1, max(0, round(p / 100 * len(ordenadas)) - 1))
+    return ordenadas[idx]
+
+
+def medir_custo(custo: int, amostras: int, senha: str = "Bench@123"):
+    email = f"bench-cost-{custo}@bench.local"
+    conn = get_connection()
+    ph = "?" if isinstance(conn, sqlite3.Connection) else "%s"
+    cur = conn.cursor()
+    cur.execute(f"DELETE FROM clients WHERE email = {ph}", (email,))
+    cur.execute(
+        f"INSERT INTO clients (nome, telefone, email, data_nascimento, correntista, senha_hash) VALUES ({', '.join([ph] * 6)})",
+        ("Bench", 9_000_000_000 + custo, email, "1990-01-01", True, password_pool._bcrypt_hash(senha, custo)),
+    )
+    conn.commit()
+
+    # O custo configurado acompanha o hash: o login não dispara rehash durante a medição
+    password_pool.BCRYPT_ROUNDS = custo
+    latencias = []
+    for _ in range(amostras):
+        inicio = time.perf_counter()
+        assert login_client(email, senha) is not None
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return latencias
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--custos", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--amostras", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    init_db()
+    print(f"{'custo':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'média ms':>9}")
+    try:
+        for custo in args.custos:
+            lat = medir_custo(custo, args.amostras)
+            print(
+                f"{custo:>5} {_percentil(lat, 50):>9.1f} {_percentil(lat, 95):>9.1f} "
+                f"{_percentil(lat, 99):>9.1f} {statistics.mean(lat):>9.1f}"
+            )
+    finally:
+        password_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Eventos de mudança: custo na escrita e latência até o assinante.
+
+Com SQLite em memória (entrega local, ver storage/events.py):
+
+- escritas/s de `update_client` com eventos desligados, ligados sem
+  assinantes e ligados com `--assinantes` filas (cada `GET /events` é uma);
+- latência entre a escrita e o evento chegar a um assinante em outra thread
+  (o caminho do SSE até o gateway soma a isso um salto de rede).
+
+No PostgreSQL o custo na escrita é um `SELECT pg_notify(...)` na mesma
+conexão, e a entrega passa pelo LISTEN de cada instância do storage.
+
+Uso:
+    python benchmarks/bench_change_events.py --escritas 2000 --assinantes 10
+"""
+import argparse
+import logging
+import sys
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from storage import db, events  # noqa: E402
+
+
+def preparar() -> int:
+    db.configure("sqlite://")
+    db.init_db()
+    from storage.repository import create_client
+
+    with patch("storage.repository._is_password_pwned", return_value=False):
+        return create_client({
+            "nome": "Bench", "telefone": 11999990000, "email": "bench@example.com",
+            "data_nascimento": date(1990, 1, 1), "correntista": True, "saldo_cc": 0.0, "senha": "senhaBoa123",
+        })["id"]
+
+
+def escritas_por_segundo(cliente_id: int, n: int) -> float:
+    from storage.repository import update_client
+
+    inicio = time.perf_counter()
+    for i in range(n):
+        update_client(cliente_id, {"saldo_cc": float(i)})
+    return n / (time.perf_counter() - inicio)
+
+
+def latencia_ms(cliente_id: int, n: int) -> float:
+    from storage.repository import update_client
+
+    fila = events.subscribe()
+    tempos = []
+    try:
+        for i in range(n):
+            recebido = threading.Event()
+            threading.Thread(target=lambda: (fila.get(), recebido.set()), daemon=True).start()
+            inicio = time.perf_counter()
+            update_client(cliente_id, {"saldo_cc": float(i)})
+            recebido.wait()
+            tempos.append(time.perf_counter() - inicio)
+    finally:
+        events.unsubscribe(fila)
+    tempos.sort()
+    return tempos[len(tempos) // 2] * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escritas", type=int, default=2000)
+    parser.add_argument("--assinantes", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    cliente_id = preparar()
+
+    print(f"{'modo':>24} {'escritas/s':>12}")
+    with patch.object(events, "EVENTS_ENABLED", False):
+        print(f"{'eventos desligados':>24} {escritas_por_segundo(cliente_id, args.escritas):>12,.0f}")
+    print(f"{'sem assinantes':>24} {escritas_por_segundo(cliente_id, args.escritas):>12,.0f}")
+    with patch.object(events, "EVENTS_QUEUE_SIZE", args.escritas + 1):
+        filas = [events.subscribe() for _ in range(args.assinantes)]
+        print(f"{f'{args.assinantes} assinantes':>24} {escritas_por_segundo(cliente_id, args.escritas):>12,.0f}")
+    for fila in filas:
+        events.unsubscribe(fila)
+    print(f"\nlatência escrita → assinante (mediana): {latencia_ms(cliente_id, 200):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
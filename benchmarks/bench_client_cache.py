@@ -0,0 +1,79 @@
+"""Cache de clientes do gateway: chamadas ao storage e tempo por carga de página.
+
+Pelo TestClient do gateway, com um storage simulado que responde
+`GET /clients/{id}` com ETag após `--latencia-ms`, repete a sequência de rotas
+que a página de investimentos usa para um cliente (`/clients/{id}`,
+`/clients/{id}/score`, `/calculos/patrimonio/{id}`, `/calculos/projecao/{id}`):
+
+- sem cache (`CLIENT_CACHE_SIZE=0`): uma ida ao storage por rota;
+- com cache: entradas frescas não vão ao storage;
+- com cache e TTL 0: toda leitura revalida com If-None-Match (304).
+
+Uso:
+    python benchmarks/bench_client_cache.py --paginas 200 --latencia-ms 2
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import httpx  # noqa: E402
+import orjson  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from gateway import client_cache  # noqa: E402
+from gateway.main import app, get_dynamic_http_client  # noqa: E402
+
+CLIENTE = {"id": 1, "nome": "Bench", "saldo_cc": 100.0, "patrimonio_investimento": 50.0,
+           "perfil_investidor": "MODERADO", "total_investido_ativo": 850.0}
+ROTAS = ("/clients/1", "/clients/1/score", "/calculos/patrimonio/1", "/calculos/projecao/1")
+ETAG = 'W/"c1v1"'
+
+
+class Storage:
+    def __init__(self, latencia: float):
+        self.latencia = latencia
+        self.chamadas = 0
+
+    def get(self, path, headers=None):
+        self.chamadas += 1
+        time.sleep(self.latencia)
+        pedido = httpx.Request("GET", f"http://storage{path}")
+        if (headers or {}).get("If-None-Match") == ETAG:
+            return httpx.Response(304, headers={"etag": ETAG}, request=pedido)
+        return httpx.Response(200, content=orjson.dumps(CLIENTE),
+                              headers={"content-type": "application/json", "etag": ETAG}, request=pedido)
+
+
+def medir(paginas: int, latencia: float, tamanho: int, ttl: float):
+    storage = Storage(latencia)
+    client_cache.reset()
+    app.dependency_overrides[get_dynamic_http_client] = lambda: storage
+    with patch.object(client_cache, "CLIENT_CACHE_SIZE", tamanho), \
+         patch.object(client_cache, "CLIENT_CACHE_TTL_SECONDS", ttl):
+        http = TestClient(app)
+        inicio = time.perf_counter()
+        for _ in range(paginas):
+            for rota in ROTAS:
+                http.get(rota)
+        duracao = time.perf_counter() - inicio
+    return duracao / paginas * 1000, storage.chamadas / paginas, client_cache.stats()["hit_ratio"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paginas", type=int, default=200)
+    parser.add_argument("--latencia-ms", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    print(f"{'modo':>14} {'ms/página':>10} {'storage/página':>15} {'acerto':>7}")
+    for nome, tamanho, ttl in (("sem cache", 0, 0.0), ("cache", 1024, 5.0), ("cache ttl=0", 1024, 0.0)):
+        ms, chamadas, acerto = medir(args.paginas, args.latencia_ms / 1000, tamanho, ttl)
+        print(f"{nome:>14} {ms:>10.2f} {chamadas:>15.2f} {acerto:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
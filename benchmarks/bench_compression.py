@@ -0,0 +1,78 @@
+"""Compressão das respostas: tamanho e custo por nível (gzip e, se instalado, brotli).
+
+Payloads medidos:
+
+- listagem de investimentos em JSON (como `GET /investments` do storage e do gateway);
+- `frontend/investments.html`, a maior página do frontend.
+
+O nível usado nas respostas dinâmicas (COMPRESSION_GZIP_LEVEL /
+COMPRESSION_BROTLI_QUALITY) deve ficar onde o ganho de tamanho ainda compensa
+o tempo; os arquivos estáticos são comprimidos uma vez no build com o nível
+máximo (`python -m gateway.compression`).
+
+Uso:
+    python benchmarks/bench_compression.py --itens 1000
+"""
+import argparse
+import gzip
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import orjson  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def investimentos_json(n: int) -> bytes:
+    base = datetime(2024, 1, 1)
+    return orjson.dumps([
+        {"id": i, "cliente_id": i % 500 + 1, "tipo_investimento": "ACOES", "ticker": "PETR4.SA",
+         "valor_investido": 100.0 + i, "rentabilidade": 1.5, "ativo": i % 5 != 0,
+         "data_aplicacao": (base + timedelta(seconds=i)).isoformat()}
+        for i in range(n)
+    ])
+
+
+def melhor(fn, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--itens", type=int, default=1000)
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    payloads = {
+        f"{args.itens} investimentos": investimentos_json(args.itens),
+        "investments.html": (Path(__file__).resolve().parents[1] / "app/gateway/frontend/investments.html").read_bytes(),
+    }
+    formatos = [(f"gzip {nivel}", lambda d, n=nivel: gzip.compress(d, compresslevel=n, mtime=0)) for nivel in (1, 6, 9)]
+    if brotli is not None:
+        formatos += [(f"br {q}", lambda d, q=q: brotli.compress(d, quality=q)) for q in (4, 11)]
+    else:
+        print("brotli não instalado: só gzip\n")
+
+    print(f"{'payload':>22} {'formato':>8} {'bytes':>10} {'razão':>7} {'ms':>8}")
+    for nome, dados in payloads.items():
+        print(f"{nome:>22} {'-':>8} {len(dados):>10} {1:>7.2f} {0:>8.2f}")
+        for formato, comprimir in formatos:
+            tamanho = len(comprimir(dados))
+            ms = melhor(lambda: comprimir(dados), args.repeticoes) * 1000
+            print(f"{nome:>22} {formato:>8} {tamanho:>10} {len(dados) / tamanho:>7.2f} {ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
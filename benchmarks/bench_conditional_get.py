@@ -0,0 +1,75 @@
+"""Leituras por cliente no storage: resposta completa vs. 304 com If-None-Match.
+
+Pelo TestClient do storage (SQLite em memória), com um cliente de N
+investimentos, mede requisições/s de:
+
+- `GET /clients/{id}` e `GET /investments/cliente/{id}` sem If-None-Match
+  (leitura da versão + consulta + serialização);
+- as mesmas com o ETag atual: só `SELECT versao FROM clients` e 304 sem corpo.
+
+Uso:
+    python benchmarks/bench_conditional_get.py --investimentos 200
+"""
+import argparse
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from storage import db  # noqa: E402
+
+
+def preparar(investimentos: int) -> int:
+    db.configure("sqlite://")
+    db.init_db()
+    from storage.investment_repository import InvestmentRepository
+    from storage.models import InvestimentoBatchCreate
+    from storage.repository import create_client
+
+    with patch("storage.repository._is_password_pwned", return_value=False):
+        cliente = create_client({
+            "nome": "Bench", "telefone": 11999990000, "email": "bench@example.com",
+            "data_nascimento": date(1990, 1, 1), "correntista": True, "score_credito": 700.0,
+            "saldo_cc": 0.0, "patrimonio_investimento": 1e9, "senha": "senhaBoa123",
+        })
+    for inicio in range(0, investimentos, 500):
+        InvestmentRepository.create_batch(InvestimentoBatchCreate(cliente_id=cliente["id"], investimentos=[
+            {"tipo_investimento": "ACOES", "ticker": "PETR4.SA", "valor_investido": 100.0 + i}
+            for i in range(inicio, min(inicio + 500, investimentos))
+        ]))
+    return cliente["id"]
+
+
+def medir(client: TestClient, url: str, headers: dict, n: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(n):
+        client.get(url, headers=headers)
+    return n / (time.perf_counter() - inicio)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--investimentos", type=int, default=200)
+    parser.add_argument("--requisicoes", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    cliente_id = preparar(args.investimentos)
+    from storage.main import app
+
+    client = TestClient(app)
+    identidade = {"Accept-Encoding": "identity"}
+    print(f"{'rota':>28} {'caminho':>8} {'req/s':>10} {'bytes':>8}")
+    for url in (f"/clients/{cliente_id}", f"/investments/cliente/{cliente_id}"):
+        etag = client.get(url).headers["etag"]
+        for nome, headers in (("200", identidade), ("304", {**identidade, "If-None-Match": etag})):
+            tamanho = len(client.get(url, headers=headers).content)
+            print(f"{url:>28} {nome:>8} {medir(client, url, headers, args.requisicoes):>10,.0f} {tamanho:>8}")
+
+
+if __name__ == "__main__":
+    main()
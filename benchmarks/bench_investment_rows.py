@@ -0,0 +1,81 @@
+"""Vazão (linhas/s) do mapeamento linha -> JSON das listagens de investimentos.
+
+Compara, para listas grandes como as de `GET /investments`:
+
+- validado: `InvestimentoOut(...)` validado por linha (Enum, fromisoformat) e,
+  como o FastAPI faz com `response_model`, dump + revalidação + serialização;
+- rápido: `_row_to_investimento` (model_construct) e `TypeAdapter.dump_json`,
+  o caminho usado hoje pelas rotas de leitura do storage.
+
+Uso:
+    python benchmarks/bench_investment_rows.py --linhas 100000
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from storage.investment_repository import _row_to_investimento  # noqa: E402
+from storage.models import InvestimentoOut, TipoInvestimento  # noqa: E402
+
+_lista = TypeAdapter(list[InvestimentoOut])
+
+
+def gerar_linhas(n: int):
+    """Linhas como o SQLite devolve (TIMESTAMP em texto)."""
+    base = datetime(2024, 1, 1)
+    tipos = [t.value for t in TipoInvestimento]
+    return [
+        (i, i % 5000 + 1, tipos[i % len(tipos)], "PETR4", 100.0 + i % 997, 1.5, i % 5 != 0,
+         (base + timedelta(seconds=i)).isoformat(sep=" "))
+        for i in range(1, n + 1)
+    ]
+
+
+def validado(linhas) -> bytes:
+    modelos = [
+        InvestimentoOut(
+            id=r[0], cliente_id=r[1], tipo_investimento=TipoInvestimento(r[2]), ticker=r[3],
+            valor_investido=r[4], rentabilidade=r[5], ativo=bool(r[6]),
+            data_aplicacao=datetime.fromisoformat(str(r[7])),
+        )
+        for r in linhas
+    ]
+    # O que o FastAPI faz com response_model: dump, revalidação e jsonable_encoder
+    revalidados = _lista.validate_python([m.model_dump() for m in modelos])
+    return json.dumps(jsonable_encoder(revalidados)).encode()
+
+
+def rapido(linhas) -> bytes:
+    return _lista.dump_json([_row_to_investimento(r) for r in linhas])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    linhas = gerar_linhas(args.linhas)
+    assert json.loads(validado(linhas[:100])) == json.loads(rapido(linhas[:100]))
+
+    print(f"{'caminho':>10} {'melhor s':>10} {'linhas/s':>12}")
+    for nome, fn in (("validado", validado), ("rápido", rapido)):
+        tempos = []
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            fn(linhas)
+            tempos.append(time.perf_counter() - inicio)
+        melhor = min(tempos)
+        print(f"{nome:>10} {melhor:>10.3f} {args.linhas / melhor:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
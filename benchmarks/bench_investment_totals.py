@@ -0,0 +1,95 @@
+"""Latência do total investido por cliente conforme a tabela cresce.
+
+Popula `investments` (SQLite em memória, schema de `storage.db`) com volumes
+crescentes, mantendo fixo o número de posições por cliente, e mede a consulta
+de `InvestmentRepository.get_total_investido_cliente` com cada conjunto de
+índices. Com o índice de cobertura `idx_investments_cliente_ativo` o tempo
+depende só das posições do cliente, não do tamanho da tabela.
+
+Uso:
+    python benchmarks/bench_investment_totals.py --linhas 100000 1000000 3000000
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from storage import db  # noqa: E402
+
+QUERY = "SELECT COALESCE(SUM(valor_investido), 0) FROM investments WHERE cliente_id = ? AND ativo = 1"
+
+CENARIOS = {
+    "sem índice": [],
+    "cliente_id": ["idx_investments_cliente_id"],
+    "cobertura": ["idx_investments_cliente_id", "idx_investments_cliente_ativo"],
+}
+
+
+def popular(linhas: int, posicoes_por_cliente: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    db._ensure_sqlite_schema(conn)
+    for nome in list(db.INDEXES) + list(db.SQLITE_INDEXES):
+        conn.execute(f"DROP INDEX IF EXISTS {nome}")
+    rnd = random.Random(42)
+    clientes = max(1, linhas // posicoes_por_cliente)
+    lote = (
+        (i % clientes + 1, "ACOES", "PETR4", rnd.uniform(10, 10_000), 0.0, 1 if rnd.random() < 0.8 else 0)
+        for i in range(linhas)
+    )
+    conn.executemany(
+        "INSERT INTO investments (cliente_id, tipo_investimento, ticker, valor_investido, rentabilidade, ativo) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        lote,
+    )
+    conn.commit()
+    return conn
+
+
+def medir(conn: sqlite3.Connection, clientes: int, amostras: int):
+    rnd = random.Random(7)
+    latencias = []
+    for _ in range(amostras):
+        cliente_id = rnd.randint(1, clientes)
+        inicio = time.perf_counter()
+        conn.execute(QUERY, (cliente_id,)).fetchone()
+        latencias.append((time.perf_counter() - inicio) * 1_000_000)
+    return latencias
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--posicoes", type=int, default=20, help="posições por cliente")
+    parser.add_argument("--amostras", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    indices = {**db.INDEXES, **db.SQLITE_INDEXES}
+    print(f"{'linhas':>10} {'cenário':>12} {'p50 µs':>10} {'p95 µs':>10} {'média µs':>10}")
+    for linhas in args.linhas:
+        conn = popular(linhas, args.posicoes)
+        clientes = max(1, linhas // args.posicoes)
+        for cenario, nomes in CENARIOS.items():
+            for nome in indices:
+                conn.execute(f"DROP INDEX IF EXISTS {nome}")
+            for nome in nomes:
+                conn.execute(f"CREATE INDEX {nome} ON {indices[nome]}")
+            conn.execute("ANALYZE")
+            # Sem índice a varredura completa é lenta demais para muitas amostras
+            amostras = args.amostras if nomes else max(3, args.amostras // 50)
+            lat = sorted(medir(conn, clientes, amostras))
+            print(
+                f"{linhas:>10} {cenario:>12} {lat[len(lat) // 2]:>10.1f} "
+                f"{lat[int(len(lat) * 0.95) - 1]:>10.1f} {statistics.mean(lat):>10.1f}"
+            )
+        plano = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {QUERY}", (1,))]
+        print(f"{'':>10} plano: {'; '.join(plano)}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
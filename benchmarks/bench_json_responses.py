@@ -0,0 +1,95 @@
+"""JSON nas respostas do gateway e do storage: stdlib `json` vs. orjson.
+
+Mede, para listas de clientes/investimentos do tamanho informado:
+
+- render: `JSONResponse.render` (antes) vs. `ORJSONResponse.render` (default
+  dos dois serviços), sobre o conteúdo já convertido pelo FastAPI;
+- parse: `httpx.Response.json()` (antes) vs. `client.parse_json` (orjson),
+  como o gateway lê as respostas do storage;
+- datas: `model_dump()` + `.isoformat()` manual vs. `model_dump(mode="json")`.
+
+Uso:
+    python benchmarks/bench_json_responses.py --itens 10000
+"""
+import argparse
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import httpx  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+
+from gateway import client as client_module  # noqa: E402
+from gateway.models import ClientRegister  # noqa: E402
+
+
+def clientes(n: int):
+    return [
+        {"id": i, "nome": f"Cliente {i}", "telefone": 21_900_000_000 + i, "email": f"cliente{i}@example.com",
+         "data_nascimento": "1990-05-15", "correntista": bool(i % 2), "score_credito": 120.5 + i,
+         "saldo_cc": 1205.0 + i, "patrimonio_investimento": 300.25, "total_investido_ativo": 999.99}
+        for i in range(n)
+    ]
+
+
+def investimentos(n: int):
+    base = datetime(2024, 1, 1)
+    return [
+        {"id": i, "cliente_id": i % 500, "tipo_investimento": "ACOES", "ticker": "PETR4.SA",
+         "valor_investido": 100.0 + i, "rentabilidade": 1.5, "ativo": True,
+         "data_aplicacao": (base + timedelta(seconds=i)).isoformat()}
+        for i in range(n)
+    ]
+
+
+def melhor(fn, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--itens", type=int, default=10_000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"{'medida':>28} {'antes ms':>10} {'depois ms':>10} {'ganho':>7}")
+
+    def linha(nome, antes, depois):
+        a, d = melhor(antes, args.repeticoes), melhor(depois, args.repeticoes)
+        print(f"{nome:>28} {a * 1000:>10.2f} {d * 1000:>10.2f} {a / d:>6.1f}x")
+
+    for nome, dados in (("clientes", clientes(args.itens)), ("investimentos", investimentos(args.itens))):
+        corpo = JSONResponse(dados).body
+        assert ORJSONResponse(dados).body.decode() == corpo.decode()
+        resposta = httpx.Response(200, content=corpo, headers={"content-type": "application/json"})
+        linha(f"render {nome}", lambda: JSONResponse(dados), lambda: ORJSONResponse(dados))
+        linha(f"parse {nome}", resposta.json, lambda: client_module.parse_json(resposta))
+
+    cadastros = [
+        ClientRegister(nome="Ana", telefone=21999999999, email="ana@example.com", senha="Senha@Forte123",
+                       data_nascimento=date(1990, 5, 15), correntista=True)
+        for _ in range(args.itens // 10 or 1)
+    ]
+
+    def isoformat_manual():
+        for c in cadastros:
+            data = c.model_dump()
+            data["data_nascimento"] = data["data_nascimento"].isoformat()
+
+    def modo_json():
+        for c in cadastros:
+            c.model_dump(mode="json")
+
+    linha("model_dump com datas", isoformat_manual, modo_json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Memória e vazão de `list_clients` -> JSON: dict por linha vs. ClientRecord.
+
+- dict: um dict de 10 chaves por linha e, como o FastAPI faz com
+  `response_model=list[ClientOut]`, validação completa (inclusive EmailStr)
+  seguida de serialização;
+- record: `ClientRecord` (`__slots__`) e o caminho confiável do storage
+  (`to_model` + `TypeAdapter.dump_json`), sem revalidar.
+
+Uso:
+    python benchmarks/bench_list_clients.py --linhas 100000
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from storage.models import ClientOut  # noqa: E402
+from storage.repository import _CLIENT_FIELDS, _row_to_client  # noqa: E402
+
+_lista = TypeAdapter(list[ClientOut])
+
+
+def gerar_linhas(n: int):
+    """Linhas como o SQLite devolve (DATE em texto)."""
+    return [
+        (i, f"Cliente {i}", 21_900_000_000 + i, f"cliente{i}@example.com", f"19{50 + i % 50}-0{1 + i % 9}-1{i % 9}",
+         i % 2, None, 100.0 * (i % 50), 10.0 * (i % 7), 5.0 * (i % 11))
+        for i in range(1, n + 1)
+    ]
+
+
+def como_dict(row):
+    return dict(zip(_CLIENT_FIELDS, _row_to_client(row).values()))
+
+
+def json_dict(clientes) -> bytes:
+    return json.dumps(jsonable_encoder(_lista.validate_python(clientes))).encode()
+
+
+def json_record(clientes) -> bytes:
+    return _lista.dump_json([c.to_model() for c in clientes])
+
+
+def memoria(mapear, linhas) -> int:
+    gc.collect()
+    tracemalloc.start()
+    objetos = [mapear(r) for r in linhas]
+    usado, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objetos
+    return usado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    linhas = gerar_linhas(args.linhas)
+    amostra = linhas[:100]
+    assert json.loads(json_dict([como_dict(r) for r in amostra])) == json.loads(json_record([_row_to_client(r) for r in amostra]))
+
+    print(f"{'caminho':>8} {'MiB':>8} {'B/linha':>8} {'melhor s':>9} {'linhas/s':>10}")
+    for nome, mapear, serializar in (("dict", como_dict, json_dict), ("record", _row_to_client, json_record)):
+        usado = memoria(mapear, linhas)
+        tempos = []
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            serializar([mapear(r) for r in linhas])
+            tempos.append(time.perf_counter() - inicio)
+        melhor = min(tempos)
+        print(
+            f"{nome:>8} {usado / 2**20:>8.1f} {usado / args.linhas:>8.0f} "
+            f"{melhor:>9.3f} {args.linhas / melhor:>10,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
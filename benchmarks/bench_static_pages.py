@@ -0,0 +1,64 @@
+"""Custo de servir uma página do frontend: disco vs. memória vs. 304.
+
+Pelo TestClient do gateway, mede requisições/s de `GET /investments-page`:
+
+- disco: `Path.exists` + `FileResponse` a cada requisição (como antes);
+- memória: `FRONTEND` (gateway/static_pages.py), corpo completo;
+- 304: revalidação com `If-None-Match`, o caso comum depois da primeira visita.
+
+Uso:
+    python benchmarks/bench_static_pages.py --requisicoes 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import FileResponse  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from gateway.main import app  # noqa: E402
+
+PAGINA = Path(__file__).resolve().parents[1] / "app/gateway/frontend/investments.html"
+
+disco = FastAPI()
+
+
+@disco.get("/investments-page")
+def investments_page():
+    if PAGINA.exists():
+        return FileResponse(str(PAGINA), media_type="text/html")
+    return {"message": "Página de investimentos não disponível"}
+
+
+def medir(client: TestClient, headers: dict, n: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(n):
+        client.get("/investments-page", headers=headers)
+    return n / (time.perf_counter() - inicio)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    gateway = TestClient(app)
+    identidade = {"Accept-Encoding": "identity"}
+    etag = gateway.get("/investments-page", headers=identidade).headers["etag"]
+
+    print(f"{'caminho':>8} {'req/s':>10} {'bytes':>8}")
+    for nome, client, headers in (
+        ("disco", TestClient(disco), identidade),
+        ("memória", gateway, identidade),
+        ("304", gateway, {**identidade, "If-None-Match": etag}),
+    ):
+        tamanho = len(client.get("/investments-page", headers=headers).content)
+        print(f"{nome:>8} {medir(client, headers, args.requisicoes):>10,.0f} {tamanho:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Formato de fio gateway<->storage: JSON vs. msgpack.
+
+Para uma listagem de investimentos, uma de clientes e o resumo de total por
+cliente, mede tamanho do payload, custo de codificar no storage (como
+`storage.main._resposta_confiavel` faz em cada formato) e de decodificar no
+gateway (`gateway.client.parse_json`).
+
+Requer o pacote msgpack.
+
+Uso:
+    python benchmarks/bench_wire_format.py --itens 10000
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import msgpack  # noqa: E402
+import orjson  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from storage.models import ClientOut, InvestimentoOut, TipoInvestimento  # noqa: E402
+
+
+def investimentos(n: int):
+    base = datetime(2024, 1, 1)
+    tipos = list(TipoInvestimento)
+    return [
+        InvestimentoOut.model_construct(
+            id=i, cliente_id=i % 500 + 1, tipo_investimento=tipos[i % len(tipos)], ticker="PETR4.SA",
+            valor_investido=100.0 + i, rentabilidade=1.5, ativo=i % 5 != 0, data_aplicacao=base + timedelta(seconds=i),
+        )
+        for i in range(n)
+    ]
+
+
+def clientes(n: int):
+    return [
+        ClientOut.model_construct(
+            id=i, nome=f"Cliente {i}", telefone=21_900_000_000 + i, email=f"cliente{i}@example.com",
+            data_nascimento=None, correntista=bool(i % 2), score_credito=120.5, saldo_cc=1205.0,
+            patrimonio_investimento=300.25, total_investido_ativo=999.99,
+        )
+        for i in range(n)
+    ]
+
+
+def melhor(fn, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--itens", type=int, default=10_000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    cenarios = {
+        "investimentos": (TypeAdapter(list[InvestimentoOut]), investimentos(args.itens)),
+        "clientes": (TypeAdapter(list[ClientOut]), clientes(args.itens)),
+        "resumo total": (TypeAdapter(dict), {"cliente_id": 42, "total_investido": 12345.67}),
+    }
+    # O resumo é minúsculo: repete para ter tempo mensurável
+    vezes = {"resumo total": args.itens}
+
+    print(f"{'payload':>14} {'formato':>8} {'bytes':>10} {'codificar ms':>13} {'decodificar ms':>15}")
+    for nome, (adapter, dados) in cenarios.items():
+        n = vezes.get(nome, 1)
+        em_json = adapter.dump_json(dados)
+        em_msgpack = msgpack.packb(adapter.dump_python(dados, mode="json"))
+        assert msgpack.unpackb(em_msgpack) == orjson.loads(em_json)
+        for formato, corpo, codificar, decodificar in (
+            ("json", em_json, lambda: adapter.dump_json(dados), lambda: orjson.loads(em_json)),
+            ("msgpack", em_msgpack, lambda: msgpack.packb(adapter.dump_python(dados, mode="json")),
+             lambda: msgpack.unpackb(em_msgpack)),
+        ):
+            cod = melhor(lambda: [codificar() for _ in range(n)], args.repeticoes)
+            dec = melhor(lambda: [decodificar() for _ in range(n)], args.repeticoes)
+            print(f"{nome:>14} {formato:>8} {len(corpo):>10} {cod * 1000:>13.2f} {dec * 1000:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()